@@ -6,6 +6,7 @@ import json
 # --- Import Project Modules ---
 from config import API_BASE_URL
 from modules.database import DatabaseManager
+from modules.cache_maintenance import CacheMaintenance
 from modules.dataforseo_client import DataForSeoClient
 
 # --- Import UI Modules ---
@@ -73,6 +74,15 @@ if loaded_data is None:
 
 locations, languages, locations_map, languages_map, db_manager, client = loaded_data
 
+@st.cache_resource
+def start_cache_maintenance(_db_manager):
+    # One background maintenance timer per server process, shared by all sessions.
+    maintenance = CacheMaintenance(_db_manager)
+    maintenance.start()
+    return maintenance
+
+cache_maintenance = start_cache_maintenance(db_manager)
+
 if not client or not client.login or not client.password:
     st.error("DataForSEO credentials are not configured. Please add them to your `.streamlit/secrets.toml` file.")
     st.stop()
@@ -100,4 +110,4 @@ with tab4:
 
 # == TAB 5: DEBUG & CACHE ==
 with tab5:
-    tab_debug_cache.render(db_manager)
+    tab_debug_cache.render(db_manager, cache_maintenance)
@@ -0,0 +1,172 @@
+# benchmarks/bench_cache_backends.py
+"""
+Measures read and write throughput of the cache backends (modules/cache_backends.py) on
+synthetic SERP responses and writes the results as JSON, so backends and versions can be compared.
+
+Every backend stores the same records, encoded once up front with the configured codec, so only
+storage is timed. Each run starts from an empty store in a temporary directory.
+
+Usage (from the project root):
+    python -m benchmarks.bench_cache_backends --sizes 10000 100000
+    python -m benchmarks.bench_cache_backends --backends sqlite lmdb --compare benchmarks/results/previous.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.bench_clustering import git_revision
+from benchmarks.synthetic_serp import generate_keyword_serp_data
+from modules.cache_backends import BACKENDS, LMDB_AVAILABLE, CacheRecord, create_cache_backend
+from modules.cache_codec import PayloadCodec
+from modules.cache_projections import build_cache_key
+from modules.database import ConnectionPool, DatabaseManager
+
+def build_records(size, seed, codec):
+    """Encodes one DataForSEO-shaped SERP response per synthetic keyword."""
+    serp_data, _ = generate_keyword_serp_data(size, seed=seed)
+    timestamp = datetime.utcnow().isoformat()
+    records = []
+    for keyword, urls in serp_data.items():
+        response = {"tasks": [{"result": [{"keyword": keyword, "items": [
+            {"type": "organic", "rank_absolute": rank, "url": url,
+             "title": f"{keyword} - result {rank}", "description": f"About {keyword} on {url}"}
+            for rank, url in enumerate(urls, start=1)
+        ]}]}]}
+        key = build_cache_key("serp", keyword, 2840, "en", "desktop")
+        records.append(CacheRecord(key, *codec.encode(response), timestamp))
+    return records
+
+def open_backend(name, directory):
+    """Opens an empty backend; SQLite gets its cache table from DatabaseManager as in the app."""
+    if name == "sqlite":
+        pool = ConnectionPool(os.path.join(directory, "cache.db"))
+        backend = create_cache_backend("sqlite", pool)
+        DatabaseManager(pool.db_path, pool=pool, backend=backend)
+        return backend, pool
+    return create_cache_backend(name, None, os.path.join(directory, "cache.lmdb"), lmdb_map_size_mb=65536), None
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def measure(name, records, args):
+    """Returns records per second for batched writes, batched and single random reads, and a full scan."""
+    rng = random.Random(args.seed)
+    keys = [record.key for record in records]
+    read_batches = [rng.sample(keys, min(args.read_batch, len(keys))) for _ in range(args.reads // args.read_batch)]
+    single_reads = [rng.choice(keys) for _ in range(args.single_reads)]
+
+    with tempfile.TemporaryDirectory(prefix="bench-cache-") as directory:
+        backend, pool = open_backend(name, directory)
+        try:
+            write_seconds = timed(lambda: [
+                backend.put_many(records[i:i + args.write_batch]) for i in range(0, len(records), args.write_batch)
+            ])
+            batch_read_seconds = timed(lambda: [backend.get_many(batch) for batch in read_batches])
+            single_read_seconds = timed(lambda: [backend.get_many([key]) for key in single_reads])
+
+            def full_scan():
+                page = backend.scan(limit=1000)
+                while len(page) == 1000:
+                    page = backend.scan(after_key=page[-1].key, limit=1000)
+            scan_seconds = timed(full_scan)
+            size_bytes = backend.size_bytes()
+        finally:
+            backend.close()
+            if pool is not None:
+                pool.close()
+
+    def rate(count, seconds):
+        return round(count / seconds) if seconds else None
+
+    return {
+        "writes_per_second": rate(len(records), write_seconds),
+        "batched_reads_per_second": rate(sum(len(batch) for batch in read_batches), batch_read_seconds),
+        "single_reads_per_second": rate(len(single_reads), single_read_seconds),
+        "scanned_per_second": rate(len(records), scan_seconds),
+        "size_mib": round(size_bytes / 2 ** 20, 1),
+    }
+
+def print_comparison(results, baseline_path):
+    """Prints the throughput ratio of every (size, backend) result against a previous JSON run."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {(r["records"], r["backend"]): r for r in baseline["results"]}
+
+    print(f"\nCompared with {baseline_path} ({baseline.get('git_revision')}):")
+    for result in results:
+        old = previous.get((result["records"], result["backend"]))
+        if old is None:
+            continue
+        ratios = "  ".join(
+            f"{metric.split('_per_second')[0]} x{result[metric] / old[metric]:.2f}"
+            for metric in ("writes_per_second", "batched_reads_per_second", "single_reads_per_second")
+            if result[metric] and old[metric]
+        )
+        print(f"{result['records']:>8} {result['backend']:<8} {ratios}")
+
+def main():
+    available = [name for name in BACKENDS if name != "lmdb" or LMDB_AVAILABLE]
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--backends", nargs="+", choices=list(BACKENDS), default=available)
+    parser.add_argument("--compression", choices=["none", "zlib", "zstd"], default="zlib")
+    parser.add_argument("--write-batch", type=int, default=500, help="Records per put_many call")
+    parser.add_argument("--reads", type=int, default=50000, help="Keys read in batched random reads")
+    parser.add_argument("--read-batch", type=int, default=500, help="Keys per get_many call")
+    parser.add_argument("--single-reads", type=int, default=10000, help="One-key random reads")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="JSON output path (default: benchmarks/results/cache-backends-<revision>-<time>.json)")
+    parser.add_argument("--compare", help="Previous JSON output to compare throughput against")
+    args = parser.parse_args()
+
+    if "lmdb" in args.backends and not LMDB_AVAILABLE:
+        parser.error("The lmdb backend needs the lmdb package (pip install lmdb).")
+
+    codec = PayloadCodec(args.compression)
+    revision = git_revision()
+    results = []
+    for size in args.sizes:
+        records = build_records(size, args.seed, codec)
+        for name in args.backends:
+            result = {"records": size, "backend": name, **measure(name, records, args)}
+            results.append(result)
+            print(f"{size:>8} {name:<8} write {result['writes_per_second']:>9,}/s  "
+                  f"batched read {result['batched_reads_per_second']:>9,}/s  "
+                  f"single read {result['single_reads_per_second']:>9,}/s  "
+                  f"scan {result['scanned_per_second']:>9,}/s  {result['size_mib']:8.1f} MiB")
+
+    output_path = args.output or os.path.join(
+        "benchmarks", "results", f"cache-backends-{revision or 'unknown'}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w") as f:
+        json.dump({
+            "git_revision": revision,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parameters": {
+                "seed": args.seed,
+                "compression": args.compression,
+                "write_batch": args.write_batch,
+                "reads": args.reads,
+                "read_batch": args.read_batch,
+                "single_reads": args.single_reads,
+            },
+            "results": results,
+        }, f, indent=2)
+    print(f"\nResults written to {output_path}")
+
+    if args.compare:
+        print_comparison(results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+# benchmarks/bench_clustering.py
+"""
+Times and memory-profiles the SERP clustering algorithms on synthetic datasets and writes the
+results as JSON, so runs from different versions can be compared.
+
+Usage (from the project root):
+    python -m benchmarks.bench_clustering --sizes 1000 10000 50000 200000
+    python -m benchmarks.bench_clustering --sizes 1000 10000 --compare benchmarks/results/previous.json
+    python -m benchmarks.bench_clustering --sizes 60000 --algorithms balanced_strict --sweep
+
+With --sweep, every size also times `sweep_serp_clustering` over the --sweep-* grid against
+running `perform_serp_clustering` once per setting, and checks both return the same clusters.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+
+from benchmarks.synthetic_serp import generate_keyword_serp_data
+from modules.clustering import (
+    ClusteringAlgorithms, SerpOverlapIndex, _legacy_clustering, cluster_statistics,
+    perform_serp_clustering, sweep_serp_clustering,
+)
+
+ALGORITHMS = {
+    "default": ClusteringAlgorithms.default_algorithm,
+    "strict": ClusteringAlgorithms.strict_algorithm,
+    "balanced_strict": ClusteringAlgorithms.balanced_strict_algorithm,
+    "legacy": None,
+}
+
+def run_algorithm(algorithm, serp_data, metrics, min_intersections, urls_to_check, strategy, backend):
+    """Runs one algorithm end to end, including building its overlap index."""
+    if algorithm == "legacy":
+        return _legacy_clustering(serp_data, min_intersections, urls_to_check)
+    index = SerpOverlapIndex(serp_data, urls_to_check, backend=backend)
+    return ALGORITHMS[algorithm](serp_data, metrics, min_intersections, urls_to_check, strategy, index=index)
+
+def measure(algorithm, serp_data, metrics, args):
+    """Best wall time over `args.repeat` runs, plus the traced peak memory of one extra run."""
+    settings = (args.min_intersections, args.urls_to_check, args.strategy, args.backend)
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        clusters = run_algorithm(algorithm, serp_data, metrics, *settings)
+        timings.append(time.perf_counter() - start)
+
+    peak_mib = None
+    if not args.no_memory:
+        tracemalloc.start()
+        run_algorithm(algorithm, serp_data, metrics, *settings)
+        peak_mib = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+
+    return {
+        "seconds": min(timings),
+        "all_seconds": timings,
+        "peak_memory_mib": peak_mib,
+        "stats": cluster_statistics(clusters),
+    }
+
+def measure_sweep(algorithms, serp_data, metrics, args):
+    """Times one sweep over the grid against one independent sequential run per setting."""
+    algorithms = [algorithm for algorithm in algorithms if algorithm != "legacy"]
+    start = time.perf_counter()
+    results = sweep_serp_clustering(
+        serp_data, args.sweep_min_intersections, args.sweep_urls_to_check, algorithms, [args.strategy], metrics
+    )
+    sweep_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    identical = all(
+        perform_serp_clustering(serp_data, r["min_intersections"], r["urls_to_check"], r["algorithm"],
+                                r["cluster_strategy"], metrics, backend=args.backend, max_workers=1) == r["clusters"]
+        for r in results
+    )
+    independent_seconds = time.perf_counter() - start
+
+    return {
+        "seconds": sweep_seconds,
+        "independent_seconds": independent_seconds,
+        "settings": len(results),
+        "identical_clusters": identical,
+        "stats": [r["stats"] for r in results],
+    }
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_comparison(results, baseline_path):
+    """Prints the time ratio of every (size, algorithm) result against a previous JSON run."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {(r["keywords"], r["algorithm"]): r for r in baseline["results"]}
+
+    print(f"\nCompared with {baseline_path} ({baseline.get('git_revision')}):")
+    for result in results:
+        old = previous.get((result["keywords"], result["algorithm"]))
+        if old is None:
+            continue
+        ratio = result["seconds"] / old["seconds"] if old["seconds"] else float("inf")
+        changed = "" if result["stats"] == old["stats"] else "  (cluster statistics differ!)"
+        print(f"{result['keywords']:>7} {result['algorithm']:<16} {old['seconds']:8.3f}s -> "
+              f"{result['seconds']:8.3f}s  x{ratio:.2f}{changed}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000, 200000])
+    parser.add_argument("--algorithms", nargs="+", choices=list(ALGORITHMS), default=list(ALGORITHMS))
+    parser.add_argument("--min-intersections", type=int, default=3)
+    parser.add_argument("--urls-to-check", type=int, default=10)
+    parser.add_argument("--strategy", choices=["volume", "cpc"], default="volume")
+    parser.add_argument("--backend", choices=list(SerpOverlapIndex.BACKENDS), default="python")
+    parser.add_argument("--repeat", type=int, default=1, help="Timed runs per measurement (best is reported)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc run")
+    parser.add_argument("--sweep", action="store_true", help="Also time a parameter sweep of the selected algorithms")
+    parser.add_argument("--sweep-min-intersections", type=int, nargs="+", default=[2, 3, 4])
+    parser.add_argument("--sweep-urls-to-check", type=int, nargs="+", default=[5, 10, 20])
+    parser.add_argument("--output", help="JSON output path (default: benchmarks/results/clustering-<revision>-<time>.json)")
+    parser.add_argument("--compare", help="Previous JSON output to compare timings against")
+    args = parser.parse_args()
+
+    revision = git_revision()
+    results = []
+    for size in args.sizes:
+        serp_data, metrics = generate_keyword_serp_data(size, seed=args.seed)
+        for algorithm in args.algorithms:
+            result = {"keywords": size, "algorithm": algorithm, **measure(algorithm, serp_data, metrics, args)}
+            results.append(result)
+
+            memory = f"{result['peak_memory_mib']:8.1f} MiB" if result["peak_memory_mib"] is not None else ""
+            print(f"{size:>7} {algorithm:<16} {result['seconds']:8.3f}s {memory}  "
+                  f"{result['stats']['cluster_count']} clusters")
+
+        if args.sweep:
+            result = {"keywords": size, "algorithm": "sweep", **measure_sweep(args.algorithms, serp_data, metrics, args)}
+            results.append(result)
+            print(f"{size:>7} {'sweep':<16} {result['seconds']:8.3f}s  vs {result['independent_seconds']:.3f}s "
+                  f"for {result['settings']} independent runs"
+                  f"{'' if result['identical_clusters'] else '  (clusters differ!)'}")
+
+    output_path = args.output or os.path.join(
+        "benchmarks", "results", f"clustering-{revision or 'unknown'}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w") as f:
+        json.dump({
+            "git_revision": revision,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parameters": {
+                "seed": args.seed,
+                "min_intersections": args.min_intersections,
+                "urls_to_check": args.urls_to_check,
+                "strategy": args.strategy,
+                "backend": args.backend,
+                "repeat": args.repeat,
+                "sweep_min_intersections": args.sweep_min_intersections if args.sweep else None,
+                "sweep_urls_to_check": args.sweep_urls_to_check if args.sweep else None,
+            },
+            "results": results,
+        }, f, indent=2)
+    print(f"\nResults written to {output_path}")
+
+    if args.compare:
+        print_comparison(results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# benchmarks/bench_legacy_clustering.py
+"""
+Checks that `_legacy_clustering` returns exactly what the original pandas implementation
+returned, and times both on synthetic SERP data.
+
+Usage (from the project root):
+    python -m benchmarks.bench_legacy_clustering --sizes 300 1000
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic_serp import generate_keyword_serp_data
+from modules.clustering import _legacy_clustering
+
+def reference_legacy_clustering(keyword_serp_data: dict, min_intersections: int = 3, urls_to_check: int = 10):
+    """The original DataFrame-backed `_legacy_clustering`, kept verbatim as the reference result."""
+    df = pd.DataFrame(list(keyword_serp_data.items()), columns=['keyword', 'urls'])
+    df['urls'] = df['urls'].apply(lambda x: x[:urls_to_check] if isinstance(x, list) else [])
+
+    unclustered_keywords = list(df['keyword'])
+    clusters = []
+
+    while unclustered_keywords:
+        seed_keyword = unclustered_keywords.pop(0)
+        new_cluster = [seed_keyword]
+        seed_urls = set(df.loc[df['keyword'] == seed_keyword, 'urls'].iloc[0])
+        candidates = unclustered_keywords[:]
+
+        for candidate_keyword in candidates:
+            candidate_urls = set(df.loc[df['keyword'] == candidate_keyword, 'urls'].iloc[0])
+            intersections = len(seed_urls.intersection(candidate_urls))
+
+            if intersections >= min_intersections:
+                potential_size = len(new_cluster) + 1
+                if 2 <= potential_size <= 5:
+                    threshold = 8
+                elif 6 <= potential_size <= 10:
+                    threshold = 6
+                else:
+                    threshold = 4
+
+                if intersections >= threshold:
+                    new_cluster.append(candidate_keyword)
+                    unclustered_keywords.remove(candidate_keyword)
+
+        clusters.append(new_cluster)
+
+    return clusters
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[300, 1000])
+    parser.add_argument("--min-intersections", type=int, default=3)
+    parser.add_argument("--urls-to-check", type=int, default=10)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        serp_data, _ = generate_keyword_serp_data(size)
+
+        start = time.perf_counter()
+        expected = reference_legacy_clustering(serp_data, args.min_intersections, args.urls_to_check)
+        reference_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = _legacy_clustering(serp_data, args.min_intersections, args.urls_to_check)
+        current_seconds = time.perf_counter() - start
+
+        status = "identical" if actual == expected else "MISMATCH"
+        print(f"{size:>7} keywords | pandas {reference_seconds:8.3f}s | current {current_seconds:8.3f}s | "
+              f"{len(actual)} clusters, {status}")
+        if actual != expected:
+            raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+# benchmarks/bench_task_polling.py
+"""
+Counts the API requests BulkDataFetcher needs to collect posted SERP tasks, per polling mode,
+against a local fake DataForSEO server that completes tasks after a delay. Writes the results
+as JSON, so polling changes can be compared, and exits with status 1 when a check fails:
+    - a scenario did not collect every keyword before the task timeout;
+    - tasks_ready mode sent more task_get requests than there are keywords in the normal scenario.
+Each result also reports the task_gets the old loop, which checked every task every 15 seconds,
+would have sent for the same task delays.
+
+Time is simulated: the fetcher's polling sleeps advance a shared clock instead of waiting, and
+the server completes each task once the clock passes its post time plus a random delay. A run
+over minutes of simulated queue time therefore finishes in seconds, with real HTTP requests.
+
+Scenarios:
+    normal   tasks_ready lists our finished tasks (plus one task of another account)
+    broken   tasks_ready fails with HTTP 500, so the fetcher must fall back to task_get
+    foreign  tasks_ready only lists other accounts' tasks, like sandbox sample data
+
+Usage (from the project root):
+    python -m benchmarks.bench_task_polling --keywords 150 --scenarios normal broken foreign
+    python -m benchmarks.bench_task_polling --median-delay 240 --compare benchmarks/results/previous.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import random
+import tempfile
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.bench_clustering import git_revision
+from config import SERP_TASK_TIMEOUT_SECONDS
+from modules.bulk_data_fetcher import BulkDataFetcher
+from modules.database import DatabaseManager
+from modules.dataforseo_client import (
+    DataForSeoClient, SERP_TASK_POST_PATH, SERP_TASK_GET_PATH, SERP_TASKS_READY_PATH,
+)
+
+SCENARIOS = ("normal", "broken", "foreign")
+FIXED_POLL_INTERVAL_SECONDS = 15
+
+class SimulatedClock:
+    """Monotonic time that only moves when `sleep` is called."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+class FakeDataForSeoServer:
+    """
+    Serves SERP task_post, task_get/advanced and tasks_ready on a local port. Each posted task
+    completes `delay()` simulated seconds after it was posted; tasks_ready lists completed,
+    not yet collected tasks like the real endpoint.
+    """
+
+    def __init__(self, clock, delay, scenario):
+        self.clock = clock
+        self.delay = delay
+        self.scenario = scenario
+        self.tasks = {}
+        self.requests = {"task_post": 0, "task_get": 0, "tasks_ready": 0}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, body, status=200):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                if self.path != SERP_TASK_POST_PATH:
+                    return self._send({"status_code": 40400}, 404)
+                self._send(server.post_tasks(payload))
+
+            def do_GET(self):
+                if self.path == SERP_TASKS_READY_PATH:
+                    if server.scenario == "broken":
+                        with server._lock:
+                            server.requests["tasks_ready"] += 1
+                        return self._send({"status_code": 50000}, 500)
+                    return self._send(server.tasks_ready())
+                if self.path.startswith(SERP_TASK_GET_PATH):
+                    return self._send(server.task_get(self.path[len(SERP_TASK_GET_PATH):]))
+                self._send({"status_code": 40400}, 404)
+
+        return Handler
+
+    def post_tasks(self, payload):
+        with self._lock:
+            self.requests["task_post"] += 1
+            tasks = []
+            for item in payload:
+                task_id = f"task-{len(self.tasks)}"
+                delay = self.delay()
+                self.tasks[task_id] = {
+                    "keyword": item["keyword"],
+                    "delay": delay,
+                    "ready_at": self.clock() + delay,
+                    "collected": False,
+                }
+                tasks.append({"id": task_id, "status_code": 20100})
+        return {"status_code": 20000, "tasks": tasks}
+
+    def tasks_ready(self):
+        with self._lock:
+            self.requests["tasks_ready"] += 1
+            ready = [{"id": "another-accounts-task"}]
+            if self.scenario == "normal":
+                ready += [
+                    {"id": task_id} for task_id, task in self.tasks.items()
+                    if task["ready_at"] <= self.clock() and not task["collected"]
+                ]
+        return {"status_code": 20000, "tasks": [{"result": ready}]}
+
+    def task_get(self, task_id):
+        with self._lock:
+            self.requests["task_get"] += 1
+            task = self.tasks.get(task_id)
+            if task is None or task["ready_at"] > self.clock():
+                return {"status_code": 20000, "tasks": [{"id": task_id, "result": None}]}
+            task["collected"] = True
+            items = [{"type": "organic", "rank_absolute": 1, "url": f"https://example.com/{task_id}"}]
+        return {"status_code": 20000, "tasks": [{"id": task_id, "result": [{"keyword": task["keyword"], "items": items}]}]}
+
+def measure(mode, scenario, args):
+    """Fetches `args.keywords` SERPs through the fake server and returns the request counts."""
+    rng = random.Random(args.seed)
+    clock = SimulatedClock()
+    # Log-normal queue times around the median, like the spread of a real task queue.
+    delay = lambda: args.median_delay * math.exp(rng.gauss(0, args.delay_spread))
+    keywords = [f"benchmark keyword {i}" for i in range(args.keywords)]
+
+    with tempfile.TemporaryDirectory(prefix="bench-polling-") as directory, \
+            FakeDataForSeoServer(clock, delay, scenario) as server:
+        db_manager = DatabaseManager(os.path.join(directory, "cache.db"))
+        client = DataForSeoClient("login", "password", server.base_url, max_retries=0, backoff_factor=0)
+        fetcher = BulkDataFetcher(client, db_manager, poll_mode=mode, serp_task_timeout=args.timeout,
+                                  clock=clock, sleep=clock.sleep)
+        logs = []
+        try:
+            # The client prints failed requests, which the broken scenario produces on purpose.
+            with contextlib.redirect_stdout(io.StringIO()):
+                results = fetcher.fetch_bulk_serp_data(
+                    keywords, 2840, "en", "desktop",
+                    log_callback=lambda msg, level="info": logs.append(msg),
+                    progress_callback=lambda *progress: None
+                )
+        finally:
+            client.close()
+            db_manager.close()
+
+    return {
+        "collected": len(results),
+        "task_get_requests": server.requests["task_get"],
+        "tasks_ready_requests": server.requests["tasks_ready"],
+        "total_get_requests": server.requests["task_get"] + server.requests["tasks_ready"],
+        "fixed_interval_task_gets": sum(
+            max(1, math.ceil(task["delay"] / FIXED_POLL_INTERVAL_SECONDS)) for task in server.tasks.values()
+        ),
+        "simulated_seconds": round(clock(), 1),
+        "polling_summary": [msg for msg in logs if " polling: " in msg],
+    }
+
+def check(result, args):
+    """Returns the reasons `result` fails the harness's checks (empty if it passes)."""
+    failures = []
+    if result["collected"] != args.keywords:
+        failures.append(f"collected {result['collected']} of {args.keywords} keywords within {args.timeout}s")
+    if result["mode"] == "tasks_ready" and result["scenario"] == "normal" and result["task_get_requests"] > args.keywords:
+        failures.append(f"{result['task_get_requests']} task_gets for {args.keywords} keywords")
+    return failures
+
+def print_comparison(results, baseline_path):
+    """Prints the GET request ratio of every (mode, scenario) result against a previous JSON run."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {(r["mode"], r["scenario"]): r for r in baseline["results"]}
+
+    print(f"\nCompared with {baseline_path} ({baseline.get('git_revision')}):")
+    for result in results:
+        old = previous.get((result["mode"], result["scenario"]))
+        if old is None or not old["total_get_requests"]:
+            continue
+        print(f"{result['mode']:<12} {result['scenario']:<8} {old['total_get_requests']:>6} -> "
+              f"{result['total_get_requests']:>6} GETs  x{result['total_get_requests'] / old['total_get_requests']:.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keywords", type=int, default=150)
+    parser.add_argument("--modes", nargs="+", choices=list(BulkDataFetcher.POLL_MODES),
+                        default=list(BulkDataFetcher.POLL_MODES))
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--median-delay", type=float, default=20, help="Median simulated seconds until a task completes")
+    parser.add_argument("--delay-spread", type=float, default=0.5, help="Sigma of the log-normal task delay")
+    parser.add_argument("--timeout", type=float, default=SERP_TASK_TIMEOUT_SECONDS, help="Simulated seconds before a task is given up")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="JSON output path (default: benchmarks/results/task-polling-<revision>-<time>.json)")
+    parser.add_argument("--compare", help="Previous JSON output to compare request counts against")
+    args = parser.parse_args()
+
+    revision = git_revision()
+    results = []
+    failures = []
+    for scenario in args.scenarios:
+        for mode in args.modes:
+            if mode == "task_get" and scenario != "normal":
+                continue # task_get never calls tasks_ready, so the scenarios do not differ.
+            result = {"mode": mode, "scenario": scenario, **measure(mode, scenario, args)}
+            results.append(result)
+            result_failures = check(result, args)
+            failures += [f"{mode} {scenario}: {failure}" for failure in result_failures]
+            print(f"{mode:<12} {scenario:<8} {result['collected']:>5}/{args.keywords} collected  "
+                  f"{result['task_get_requests']:>6} task_get  {result['tasks_ready_requests']:>4} tasks_ready  "
+                  f"(fixed {FIXED_POLL_INTERVAL_SECONDS}s loop: {result['fixed_interval_task_gets']:>5})  "
+                  f"{result['simulated_seconds']:>7.1f}s simulated  {'FAILED' if result_failures else 'ok'}")
+
+    output_path = args.output or os.path.join(
+        "benchmarks", "results", f"task-polling-{revision or 'unknown'}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w") as f:
+        json.dump({
+            "git_revision": revision,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parameters": {
+                "keywords": args.keywords,
+                "median_delay": args.median_delay,
+                "delay_spread": args.delay_spread,
+                "timeout": args.timeout,
+                "seed": args.seed,
+            },
+            "results": results,
+        }, f, indent=2)
+    print(f"\nResults written to {output_path}")
+
+    if args.compare:
+        print_comparison(results, args.compare)
+
+    if failures:
+        print("\nFailed checks:")
+        for failure in failures:
+            print(f"  {failure}")
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
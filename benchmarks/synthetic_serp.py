@@ -0,0 +1,81 @@
+# benchmarks/synthetic_serp.py
+"""
+Reproducible synthetic keyword -> SERP URL datasets for clustering benchmarks.
+
+Real keyword lists are a mix of topics of very different sizes. Within a topic, keywords fall
+into intents whose SERPs are nearly identical, neighbouring intents share part of their results,
+and a handful of hub domains (Wikipedia, Amazon, YouTube...) rank across unrelated topics. Most
+keyword pairs therefore share no URL at all, which is the distribution the overlap index is
+built for.
+"""
+
+import random
+
+HUB_URL_COUNT = 200
+
+def generate_keyword_serp_data(keyword_count: int, seed: int = 42, keywords_per_topic: int = 40,
+                               keywords_per_intent: int = 6, serp_depth: int = 20):
+    """
+    Generates a keyword -> SERP URLs mapping and matching keyword metrics.
+
+    Args:
+        keyword_count (int): Number of keywords to generate
+        seed (int): Random seed; the same arguments always produce the same dataset
+        keywords_per_topic (int): Average topic size (actual sizes are heavy-tailed)
+        keywords_per_intent (int): Average number of keywords sharing one search intent
+        serp_depth (int): Number of URLs per keyword
+
+    Returns:
+        tuple: (keyword_serp_data, keyword_metrics) dictionaries keyed by keyword
+    """
+    rng = random.Random(seed)
+    hub_urls = [f"https://hub{i}.example/wiki/{i}" for i in range(HUB_URL_COUNT)]
+
+    keyword_serp_data = {}
+    keyword_metrics = {}
+    topic_id = 0
+
+    while len(keyword_serp_data) < keyword_count:
+        # Heavy-tailed topic sizes: many small topics, a few very large ones
+        topic_size = min(keyword_count - len(keyword_serp_data),
+                         max(1, int(rng.paretovariate(1.5) * keywords_per_topic / 3)))
+        topic_urls = [f"https://site{topic_id}-{i}.example/topic" for i in range(serp_depth * 2)]
+        intent_count = max(1, round(topic_size / keywords_per_intent))
+
+        intents = []
+        for intent_id in range(intent_count):
+            # Each intent ranks a core of topic URLs plus pages specific to that intent
+            core = rng.sample(topic_urls, serp_depth // 2)
+            core += [f"https://site{topic_id}.example/intent-{intent_id}/{i}" for i in range(serp_depth - len(core))]
+            rng.shuffle(core)
+            intents.append(core)
+
+        for i in range(topic_size):
+            keyword = f"topic {topic_id} keyword {i}"
+            serp = list(rng.choice(intents))
+
+            # Per-keyword noise: a few positions swapped, some results replaced by long-tail
+            # pages, other topic pages or cross-topic hubs.
+            for _ in range(rng.randint(0, 4)):
+                a, b = rng.randrange(serp_depth), rng.randrange(serp_depth)
+                serp[a], serp[b] = serp[b], serp[a]
+            for _ in range(int(rng.expovariate(0.5))):
+                position = rng.randrange(serp_depth)
+                roll = rng.random()
+                if roll < 0.5:
+                    serp[position] = f"https://longtail.example/{topic_id}/{i}/{position}"
+                elif roll < 0.8:
+                    serp[position] = rng.choice(topic_urls)
+                else:
+                    serp[position] = hub_urls[min(int(rng.expovariate(0.05)), HUB_URL_COUNT - 1)]
+
+            keyword_serp_data[keyword] = serp
+            keyword_metrics[keyword] = {
+                'volume': int(rng.lognormvariate(4, 2)),
+                'cpc': round(rng.lognormvariate(0, 1), 2),
+                'kd': rng.randint(0, 100),
+            }
+
+        topic_id += 1
+
+    return keyword_serp_data, keyword_metrics
@@ -34,3 +34,103 @@ BULK_KD_LIVE = f"{API_BASE_URL}/v3/dataforseo_labs/google/bulk_keyword_difficult
 
 # Used for determining search intent for up to 1,000 keywords at once.
 SEARCH_INTENT_LIVE = f"{API_BASE_URL}/v3/dataforseo_labs/google/search_intent/live"
+
+# --- HTTP Client ---
+
+# Keep-alive connections the DataForSEO client keeps open to the API host. Raise this together
+# with any concurrency setting that sends requests in parallel.
+HTTP_POOL_SIZE = 10
+# Seconds to wait for a connection and for the response; live endpoints can take a while to answer.
+HTTP_CONNECT_TIMEOUT = 10
+HTTP_READ_TIMEOUT = 120
+# Retries of failed connections, and of GET requests answered with 429 or 5xx. Waits grow
+# exponentially (backoff factor x 1, 2, 4... seconds) and honour Retry-After headers.
+HTTP_MAX_RETRIES = 3
+HTTP_BACKOFF_FACTOR = 1.0
+# Requests the asyncio client (modules/async_dataforseo_client.py, needs httpx) keeps in flight
+# at once. DataForSEO allows up to 2000 calls per minute per account.
+HTTP_MAX_CONCURRENCY = 30
+
+# --- Bulk Fetching ---
+
+# task_get requests BulkDataFetcher sends in parallel per polling cycle. Requests beyond
+# HTTP_POOL_SIZE wait for a free connection, so keep this at or below it.
+TASK_POLL_CONCURRENCY = 10
+# How finished SERP tasks are found: "tasks_ready" asks the tasks_ready endpoint which tasks are
+# done and downloads only those; "task_get" requests each pending task when its next check is due.
+SERP_POLL_MODE = "tasks_ready"
+# In tasks_ready mode, every pending task is still requested directly once no task has completed
+# for this many seconds (or for the 90th percentile of observed completion times, if longer), e.g.
+# for sandbox accounts whose listing is sample data. Once such a sweep finds tasks the listing
+# missed, the rest of the batch is polled with task_get.
+TASKS_READY_FALLBACK_SECONDS = 120
+
+# Adaptive polling of posted tasks (modules/polling.py). Each task is first checked after the
+# initial interval, and then once its age has grown by the backoff factor (the wait is capped at
+# the maximum interval). Until one task completes, only the probe tasks are checked. Tasks still
+# unfinished after their timeout are given up on.
+POLL_INITIAL_INTERVAL_SECONDS = 2
+POLL_MAX_INTERVAL_SECONDS = 30
+POLL_BACKOFF_FACTOR = 1.5
+POLL_PROBE_TASKS = 3
+SERP_TASK_TIMEOUT_SECONDS = 300
+VOLUME_TASK_TIMEOUT_SECONDS = 180
+
+# --- Local Cache Database ---
+
+# Path of the SQLite file that caches every API response.
+CACHE_DB_PATH = "data/seo_app_cache.db"
+
+# Pragmas applied to every cache connection. WAL lets readers work while a fetch is writing,
+# and NORMAL synchronous is durable enough for a cache in WAL mode.
+SQLITE_PRAGMAS = {
+    "auto_vacuum": "INCREMENTAL", # Lets maintenance shrink the file. Only applies to new files; convert
+                                  # existing ones from the Debug & Cache tab.
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -64000,      # Negative values are KiB, so this is a 64 MB page cache per connection.
+    "mmap_size": 268435456,    # Memory-map up to 256 MB of the database file.
+    "busy_timeout": 5000,      # Milliseconds to wait on a locked database before failing.
+}
+
+# Upper bound on open cache connections shared by all sessions and fetcher threads, and how long
+# (in seconds) a caller waits for one to become free before giving up.
+SQLITE_POOL_SIZE = 8
+SQLITE_POOL_TIMEOUT = 30
+
+# Where cached API responses are stored: "sqlite" (the `cache` table of CACHE_DB_PATH) or "lmdb",
+# a memory-mapped key-value store that is faster for read-heavy caches (needs the lmdb package).
+# Projections and statistics stay in SQLite either way. Entries are not copied between backends.
+CACHE_BACKEND = "sqlite"
+CACHE_LMDB_PATH = "data/seo_app_cache.lmdb"
+# Upper bound on the LMDB file size; the file only grows as far as it is actually used.
+CACHE_LMDB_MAP_SIZE_MB = 16384
+
+# Compression for cached API responses: "zlib" (built in), "zstd" (needs the zstandard package)
+# or "none" to store plain JSON text. Existing rows are still readable after a change; use
+# DatabaseManager.migrate_payloads() to re-encode them.
+CACHE_COMPRESSION = "zlib"
+CACHE_ZLIB_LEVEL = 6
+CACHE_ZSTD_LEVEL = 3
+
+# In-process cache of decoded responses in front of SQLite. Set the size to 0 to disable it.
+# Entries are re-read from the database after the TTL, so writes by other processes show up.
+CACHE_MEMORY_MAX_BYTES = 64 * 1024 * 1024
+CACHE_MEMORY_TTL_SECONDS = 600
+
+# Cache maintenance (modules/cache_maintenance.py), run on a timer and from the Debug & Cache tab.
+# Maximum age in days per data type before an entry is evicted; None keeps entries forever,
+# since the cache doubles as a long-term keyword dataset.
+CACHE_MAX_AGE_DAYS_BY_TYPE = {
+    "serp": None,
+    "volume": None,
+    "kd": None,
+    "intent": None,
+}
+# When the database grows beyond this many MB, least recently used entries are evicted. None (the
+# default) disables size-based eviction, matching the keep-forever ages above; set a limit only if
+# disk space matters more than keeping old data.
+CACHE_MAX_SIZE_MB = None
+CACHE_MAINTENANCE_INTERVAL_SECONDS = 1800
+# Entries deleted per transaction, so evictions never hold the write lock for long.
+CACHE_EVICTION_BATCH_SIZE = 200
@@ -0,0 +1,179 @@
+# modules/async_dataforseo_client.py
+
+import asyncio
+import json
+
+from config import (
+    HTTP_MAX_CONCURRENCY, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_MAX_RETRIES, HTTP_BACKOFF_FACTOR,
+)
+from modules.dataforseo_client import (
+    DataForSeoClient, basic_auth_header, serp_tasks_payload, keywords_payload,
+    SERP_TASK_POST_PATH, SERP_TASK_GET_PATH, SERP_TASKS_READY_PATH,
+    SEARCH_VOLUME_TASK_POST_PATH, SEARCH_VOLUME_TASK_GET_PATH,
+    KEYWORD_DIFFICULTY_LIVE_PATH, SEARCH_INTENT_LIVE_PATH,
+)
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+class AsyncDataForSeoClient:
+    """
+    An asyncio counterpart of `DataForSeoClient` for running many requests concurrently,
+    e.g. thousands of task_get calls or live KD/intent lookups. Needs the httpx package.
+
+    At most `max_concurrency` requests are in flight at once; the rest wait on a semaphore,
+    which keeps bursts within the API's rate limits. Timeouts, retries and error handling
+    follow the synchronous client: failed connections are retried with exponential backoff,
+    GETs also on 429/5xx and read errors, and failed requests return None.
+
+        async with AsyncDataForSeoClient(login, password, API_BASE_URL) as client:
+            results = await client.get_serp_task_results_many(task_ids)
+    """
+
+    RETRY_STATUSES = DataForSeoClient.RETRY_STATUSES
+
+    def __init__(self, login, password, api_base_url, max_concurrency=HTTP_MAX_CONCURRENCY,
+                 timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT), max_retries=HTTP_MAX_RETRIES,
+                 backoff_factor=HTTP_BACKOFF_FACTOR):
+        if not HTTPX_AVAILABLE:
+            raise RuntimeError("AsyncDataForSeoClient requires the httpx package (pip install httpx).")
+        self.api_base_url = api_base_url.rstrip("/")
+        self.login = login
+        self.password = password
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.headers = {
+            'Authorization': basic_auth_header(login, password),
+            'Content-Type': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+        }
+        connect_timeout, read_timeout = timeout
+        self._client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """Closes the pooled connections."""
+        await self._client.aclose()
+
+    def _retry_delay(self, attempt, response=None):
+        """Exponential backoff, or the server's Retry-After if it asked for a wait."""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return int(retry_after)
+        return self.backoff_factor * (2 ** attempt)
+
+    async def _request(self, method, url, payload=None):
+        """Sends one request under the concurrency limit, retrying as described on the class."""
+        content = json.dumps(payload) if payload is not None else None
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                retries_left = attempt < self.max_retries
+                try:
+                    response = await self._client.request(method, url, content=content)
+                except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+                    error = e # Nothing reached the server, so any request can be repeated.
+                except httpx.TransportError as e:
+                    if method != "GET" or not retries_left:
+                        print(f"An error occurred during API {method} request to {url}: {e}")
+                        return None
+                    error = e
+                else:
+                    if response.status_code in self.RETRY_STATUSES and method == "GET" and retries_left:
+                        await asyncio.sleep(self._retry_delay(attempt, response))
+                        continue
+                    try:
+                        response.raise_for_status()
+                        return response.json()
+                    except httpx.HTTPStatusError as e:
+                        print(f"An error occurred during API {method} request to {url}: {e}")
+                        return None
+                    except json.JSONDecodeError:
+                        print(f"Failed to decode JSON response from {url}")
+                        return None
+                if not retries_left:
+                    print(f"An error occurred during API {method} request to {url}: {error}")
+                    return None
+                await asyncio.sleep(self._retry_delay(attempt))
+
+    async def _post_request(self, url, payload):
+        return await self._request("POST", url, payload)
+
+    async def _get_request(self, url):
+        return await self._request("GET", url)
+
+    async def post_bulk_serp_tasks(self, keywords, location_code, language_code, device):
+        """Posts SERP tasks for multiple keywords in a single bulk request. See `DataForSeoClient`."""
+        url = f"{self.api_base_url}{SERP_TASK_POST_PATH}"
+        return await self._post_request(url, serp_tasks_payload(keywords, location_code, language_code, device))
+
+    async def post_bulk_search_volume_tasks(self, keywords, location_code, language_code):
+        """Posts one search volume task for multiple keywords. See `DataForSeoClient`."""
+        url = f"{self.api_base_url}{SEARCH_VOLUME_TASK_POST_PATH}"
+        return await self._post_request(url, keywords_payload(keywords, location_code, language_code))
+
+    async def fetch_keyword_difficulty(self, keyword, location_code, language_code):
+        """Fetches Keyword Difficulty for a single keyword."""
+        url = f"{self.api_base_url}{KEYWORD_DIFFICULTY_LIVE_PATH}"
+        return await self._post_request(url, keywords_payload([keyword], location_code, language_code))
+
+    async def fetch_search_intent(self, keyword, location_code, language_code):
+        """Fetches Search Intent for a single keyword."""
+        url = f"{self.api_base_url}{SEARCH_INTENT_LIVE_PATH}"
+        return await self._post_request(url, keywords_payload([keyword], location_code, language_code))
+
+    async def get_task_results(self, url):
+        """Retrieves the results of a previously posted asynchronous task."""
+        return await self._get_request(url)
+
+    async def get_serp_task_results(self, task_id):
+        """Retrieves the advanced results of a posted SERP task."""
+        return await self._get_request(f"{self.api_base_url}{SERP_TASK_GET_PATH}{task_id}")
+
+    async def get_serp_tasks_ready(self):
+        """Lists completed, not yet collected SERP tasks. See `DataForSeoClient.get_serp_tasks_ready`."""
+        return await self._get_request(f"{self.api_base_url}{SERP_TASKS_READY_PATH}")
+
+    async def get_search_volume_task_results(self, task_id):
+        """Retrieves the results of a posted search volume task."""
+        return await self._get_request(f"{self.api_base_url}{SEARCH_VOLUME_TASK_GET_PATH}{task_id}")
+
+    async def get_serp_task_results_many(self, task_ids):
+        """
+        Retrieves many SERP tasks concurrently (up to `max_concurrency` at a time).
+
+        Returns:
+            dict: Maps each task ID to its response, or None if the request failed.
+        """
+        task_ids = list(task_ids)
+        responses = await asyncio.gather(*(self.get_serp_task_results(task_id) for task_id in task_ids))
+        return dict(zip(task_ids, responses))
+
+    async def fetch_keyword_difficulty_many(self, keywords, location_code, language_code):
+        """Fetches Keyword Difficulty for many keywords concurrently. Returns a dict keyword -> response."""
+        keywords = list(keywords)
+        responses = await asyncio.gather(
+            *(self.fetch_keyword_difficulty(keyword, location_code, language_code) for keyword in keywords)
+        )
+        return dict(zip(keywords, responses))
+
+    async def fetch_search_intent_many(self, keywords, location_code, language_code):
+        """Fetches Search Intent for many keywords concurrently. Returns a dict keyword -> response."""
+        keywords = list(keywords)
+        responses = await asyncio.gather(
+            *(self.fetch_search_intent(keyword, location_code, language_code) for keyword in keywords)
+        )
+        return dict(zip(keywords, responses))
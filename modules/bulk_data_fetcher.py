@@ -1,7 +1,16 @@
 # modules/bulk_data_fetcher.py
 
 import time
-from config import SERP_TASK_GET_ADVANCED, SEARCH_VOLUME_TASK_GET
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from config import (
+    TASK_POLL_CONCURRENCY, SERP_POLL_MODE, TASKS_READY_FALLBACK_SECONDS,
+    SERP_TASK_TIMEOUT_SECONDS, VOLUME_TASK_TIMEOUT_SECONDS,
+)
+from modules.polling import PollingScheduler
+
+# The tasks_ready endpoint lists at most this many tasks per call; a full page may hide ours.
+TASKS_READY_PAGE_LIMIT = 1000
 
 class BulkDataFetcher:
     """
@@ -10,16 +19,68 @@ class BulkDataFetcher:
     multiple keywords in batches.
     """
     
-    def __init__(self, client, db_manager):
+    POLL_MODES = ("tasks_ready", "task_get")
+
+    def __init__(self, client, db_manager, poll_concurrency=TASK_POLL_CONCURRENCY, poll_mode=SERP_POLL_MODE,
+                 tasks_ready_fallback_seconds=TASKS_READY_FALLBACK_SECONDS,
+                 serp_task_timeout=SERP_TASK_TIMEOUT_SECONDS, volume_task_timeout=VOLUME_TASK_TIMEOUT_SECONDS,
+                 clock=time.monotonic, sleep=time.sleep):
         """
         Initialize the bulk data fetcher.
         
         Args:
             client: DataForSeoClient instance
             db_manager: DatabaseManager instance for caching
+            poll_concurrency (int): task_get requests sent in parallel while polling
+            poll_mode (str): 'tasks_ready' or 'task_get', see SERP_POLL_MODE in config.py
+            tasks_ready_fallback_seconds (int): Seconds without a completion before every task is requested directly
+            serp_task_timeout (int): Seconds a SERP task may take before it is given up
+            volume_task_timeout (int): Seconds a search volume task may take before it is given up
+            clock, sleep: Time source and sleep function for polling, replaceable for simulations
         """
+        if poll_mode not in self.POLL_MODES:
+            raise ValueError(f"Unknown poll mode '{poll_mode}'. Expected one of {self.POLL_MODES}.")
         self.client = client
         self.db_manager = db_manager
+        self.poll_concurrency = max(1, poll_concurrency)
+        self.poll_mode = poll_mode
+        self.tasks_ready_fallback_seconds = tasks_ready_fallback_seconds
+        self.serp_task_timeout = serp_task_timeout
+        self.volume_task_timeout = volume_task_timeout
+        self.clock = clock
+        self.sleep = sleep
+
+    def _new_scheduler(self, timeout_seconds):
+        return PollingScheduler(timeout_seconds, clock=self.clock, sleep=self.sleep)
+
+    def _ready_serp_task_ids(self, pending_task_ids, log_callback):
+        """
+        Returns the pending tasks the tasks_ready endpoint reports as complete, or None when
+        the listing cannot be trusted (request failed, or a full page that may hide our tasks).
+        """
+        response = self.client.get_serp_tasks_ready()
+        if not (response and response.get("status_code") == 20000 and response.get("tasks")):
+            log_callback("⚠️ tasks_ready request failed; requesting every pending task instead", "warning")
+            return None
+        listed = [
+            item.get("id")
+            for task in response["tasks"] if task
+            for item in task.get("result") or [] if item
+        ]
+        if len(listed) >= TASKS_READY_PAGE_LIMIT:
+            return None
+        return pending_task_ids.intersection(listed)
+
+    @staticmethod
+    def _get_task_results_concurrently(executor, get_task_results, task_ids):
+        """
+        Sends one task_get per task ID through the executor and yields (task_id, response)
+        pairs as the responses arrive, so a polling cycle takes about as long as its slowest
+        request. Only the HTTP calls run on worker threads; results are handled by the caller.
+        """
+        futures = {executor.submit(get_task_results, task_id): task_id for task_id in task_ids}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
     
     def fetch_bulk_serp_data(self, keywords, location_code, language_code, device, 
                            cache_duration_days=None, log_callback=None, progress_callback=None):
@@ -48,9 +109,11 @@ class BulkDataFetcher:
         keywords_to_fetch = []
         cached_results = {}
         
+        cache_keys = {kw: f"serp|{kw}|{location_code}|{language_code}|{device}" for kw in keywords}
+        cached_entries = self.db_manager.check_cache_many(cache_keys.values(), max_age_days=cache_duration_days)
+
         for kw in keywords:
-            cache_key = f"serp|{kw}|{location_code}|{language_code}|{device}"
-            cached_data = self.db_manager.check_cache(cache_key, max_age_days=cache_duration_days)
+            cached_data = cached_entries.get(cache_keys[kw])
             
             if cached_data is not None:
                 cached_results[kw] = cached_data
@@ -110,52 +173,87 @@ class BulkDataFetcher:
     def _poll_for_serp_results(self, pending_task_ids, task_keyword_map, location_code, 
                               language_code, device, log_callback, progress_callback, batch_num):
         """
-        Poll for SERP task results until all are complete or timeout.
+        Poll for SERP task results until all are complete or have passed their deadline.
+        Each task is checked on its own schedule, which adapts to how quickly tasks complete
+        (see `PollingScheduler`).
         """
-        start_time = time.time()
-        timeout_seconds = 300  # 5-minute timeout
+        scheduler = self._new_scheduler(self.serp_task_timeout)
+        scheduler.add(task_keyword_map) # In posting order, so the probes are the first tasks posted
         batch_results = {}
         
-        log_callback(f"Polling for batch {batch_num} results... (checking every 15 seconds)", "info")
+        log_callback(f"Polling for batch {batch_num} results... (timeout {self.serp_task_timeout} seconds)", "info")
         
-        while pending_task_ids and time.time() - start_time < timeout_seconds:
-            completed_this_cycle = set()
-            
-            for task_id in pending_task_ids:
-                keyword = task_keyword_map[task_id]
-                get_url = SERP_TASK_GET_ADVANCED + task_id
-                task_result = self.client.get_task_results(get_url)
+        # Once a fallback sweep finds tasks the listing missed, the listing is not used again.
+        use_tasks_ready = self.poll_mode == "tasks_ready"
+
+        with ThreadPoolExecutor(max_workers=self.poll_concurrency, thread_name_prefix="serp-poll") as executor:
+            while scheduler.pending:
+                scheduler.wait()
+                pending_task_ids = scheduler.pending
+                completed_this_cycle = set()
+
+                # In tasks_ready mode only tasks reported complete are downloaded, and the listing
+                # counts as a check of every pending task. Tasks whose check is due are requested
+                # directly in task_get mode or when the listing is unusable. Every task is
+                # requested once nothing has completed for longer than the fallback window or
+                # than most tasks have taken so far.
+                task_ids_to_get = checked_task_ids = scheduler.due()
+                fallback_sweep = False
+                quiet_limit = max(self.tasks_ready_fallback_seconds, scheduler.latency_percentile(0.9) or 0)
+                if use_tasks_ready:
+                    if scheduler.quiet_seconds() >= quiet_limit:
+                        task_ids_to_get = checked_task_ids = pending_task_ids
+                        fallback_sweep = True
+                    else:
+                        ready_task_ids = self._ready_serp_task_ids(pending_task_ids, log_callback)
+                        if ready_task_ids is not None:
+                            task_ids_to_get, checked_task_ids = ready_task_ids, pending_task_ids
                 
-                # Check if task is complete
-                if (task_result and
-                    task_result.get("tasks") and
-                    task_result["tasks"] and
-                    task_result["tasks"][0].get("result")):
-                    
-                    # Cache the result
-                    cache_key = f"serp|{keyword}|{location_code}|{language_code}|{device}"
-                    self.db_manager.update_cache(cache_key, task_result)
-                    batch_results[keyword] = task_result
-                    completed_this_cycle.add(task_id)
-                    
-                    log_callback(f"✅ Completed SERP for '{keyword}'", "info")
-            
-            # Remove completed tasks
-            if completed_this_cycle:
-                pending_task_ids.difference_update(completed_this_cycle)
-                progress_callback(
-                    len(batch_results), 
-                    len(task_keyword_map), 
-                    f"Batch {batch_num}: {len(batch_results)}/{len(task_keyword_map)} complete"
-                )
-            
-            if pending_task_ids:
-                time.sleep(15)
+                # Cache everything completed this cycle in a single transaction
+                with self.db_manager.write_batch() as cache_batch:
+                    for task_id, task_result in self._get_task_results_concurrently(
+                        executor, self.client.get_serp_task_results, task_ids_to_get
+                    ):
+                        keyword = task_keyword_map[task_id]
+                        
+                        # Check if task is complete
+                        if (task_result and
+                            task_result.get("tasks") and
+                            task_result["tasks"] and
+                            task_result["tasks"][0].get("result")):
+                            
+                            # Cache the result
+                            cache_key = f"serp|{keyword}|{location_code}|{language_code}|{device}"
+                            cache_batch.add(cache_key, task_result)
+                            batch_results[keyword] = task_result
+                            completed_this_cycle.add(task_id)
+                            scheduler.complete(task_id)
+                            
+                            log_callback(f"✅ Completed SERP for '{keyword}'", "info")
+                
+                if task_ids_to_get == pending_task_ids:
+                    scheduler.mark_progress()
+                if fallback_sweep and completed_this_cycle:
+                    use_tasks_ready = False
+                    log_callback(
+                        f"⚠️ tasks_ready did not list {len(completed_this_cycle)} finished tasks; "
+                        f"requesting the rest of batch {batch_num} directly", "warning"
+                    )
+
+                if completed_this_cycle:
+                    progress_callback(
+                        len(batch_results), 
+                        len(task_keyword_map), 
+                        f"Batch {batch_num}: {len(batch_results)}/{len(task_keyword_map)} complete"
+                    )
+                scheduler.expire()
+                scheduler.end_cycle(checked_task_ids)
         
         # Handle timeouts
-        if pending_task_ids:
-            timed_out_keywords = [task_keyword_map[tid] for tid in pending_task_ids]
-            log_callback(f"❌ {len(pending_task_ids)} tasks timed out: {timed_out_keywords}", "error")
+        if scheduler.timed_out:
+            timed_out_keywords = [task_keyword_map[tid] for tid in scheduler.timed_out]
+            log_callback(f"❌ {len(timed_out_keywords)} tasks timed out: {timed_out_keywords}", "error")
+        log_callback(f"Batch {batch_num} polling: {scheduler.describe()}", "info")
         
         return batch_results
     
@@ -185,9 +283,11 @@ class BulkDataFetcher:
         keywords_to_fetch = []
         cached_results = {}
         
+        cache_keys = {kw: f"volume|{kw}|{location_code}|{language_code}" for kw in keywords}
+        cached_entries = self.db_manager.check_cache_many(cache_keys.values(), max_age_days=cache_duration_days)
+
         for kw in keywords:
-            cache_key = f"volume|{kw}|{location_code}|{language_code}"
-            cached_data = self.db_manager.check_cache(cache_key, max_age_days=cache_duration_days)
+            cached_data = cached_entries.get(cache_keys[kw])
             
             if cached_data is not None:
                 cached_results[kw] = cached_data
@@ -228,16 +328,17 @@ class BulkDataFetcher:
     def _poll_for_volume_results(self, task_id, keywords, location_code, language_code,
                                log_callback, progress_callback):
         """
-        Poll for search volume task results until complete or timeout.
+        Poll for search volume task results until complete or past its deadline.
+        Polling intervals adapt as in `_poll_for_serp_results`.
         """
-        start_time = time.time()
-        timeout_seconds = 180  # 3-minute timeout for volume data
+        scheduler = self._new_scheduler(self.volume_task_timeout)
+        scheduler.add([task_id])
         
-        log_callback("Polling for search volume results... (checking every 10 seconds)", "info")
+        log_callback(f"Polling for search volume results... (timeout {self.volume_task_timeout} seconds)", "info")
         
-        while time.time() - start_time < timeout_seconds:
-            get_url = SEARCH_VOLUME_TASK_GET + task_id
-            task_result = self.client.get_task_results(get_url)
+        while scheduler.pending:
+            scheduler.wait()
+            task_result = self.client.get_search_volume_task_results(task_id)
             
             if (task_result and
                 task_result.get("tasks") and
@@ -249,25 +350,30 @@ class BulkDataFetcher:
                 result_data = task_result["tasks"][0]["result"]
                 
                 if result_data:
-                    for item in result_data:
-                        keyword = item.get("keyword")
-                        if keyword in keywords:
-                            # Create individual task result for caching
-                            individual_result = {
-                                "tasks": [{
-                                    "result": [item]
-                                }]
-                            }
-                            cache_key = f"volume|{keyword}|{location_code}|{language_code}"
-                            self.db_manager.update_cache(cache_key, individual_result)
-                            results[keyword] = individual_result
+                    wanted_keywords = set(keywords)
+                    with self.db_manager.write_batch() as cache_batch:
+                        for item in result_data:
+                            keyword = item.get("keyword")
+                            if keyword in wanted_keywords:
+                                # Create individual task result for caching
+                                individual_result = {
+                                    "tasks": [{
+                                        "result": [item]
+                                    }]
+                                }
+                                cache_key = f"volume|{keyword}|{location_code}|{language_code}"
+                                cache_batch.add(cache_key, individual_result)
+                                results[keyword] = individual_result
                 
                 log_callback(f"✅ Completed search volume for {len(results)} keywords", "info")
                 progress_callback(len(results), len(keywords), f"Volume data complete")
+                scheduler.complete(task_id)
+                log_callback(f"Search volume polling: {scheduler.describe()}", "info")
                 
                 return results
             
-            time.sleep(10)
+            scheduler.expire()
+            scheduler.end_cycle()
         
-        log_callback("❌ Search volume task timed out", "error")
+        log_callback(f"❌ Search volume task timed out after {scheduler.polls} polls", "error")
         return {}
@@ -0,0 +1,323 @@
+# modules/cache_backends.py
+
+import os
+import sqlite3
+import struct
+from collections import namedtuple
+
+from modules.cache_codec import FORMAT_JSON
+from modules.cache_projections import parse_cache_key
+
+try:
+    import lmdb
+    LMDB_AVAILABLE = True
+except ImportError:
+    LMDB_AVAILABLE = False
+
+# One stored cache entry, still encoded (see `PayloadCodec.encode`). Timestamps are ISO-8601
+# strings in UTC; `last_access` is None for backends that do not track reads.
+CacheRecord = namedtuple(
+    "CacheRecord", "key response_json payload format_version timestamp last_access", defaults=(None,)
+)
+
+# Keys per `IN (...)` query; stays below SQLite's default limit of 999 bound variables.
+SQLITE_MAX_VARIABLES = 900
+
+RECORD_COLUMNS = "key, response_json, payload, format_version, timestamp, last_access"
+KEY_COLUMNS = "data_type, keyword, location_code, language_code, device"
+
+def record_from_row(row):
+    """Builds a CacheRecord from a cache table row selected with RECORD_COLUMNS."""
+    return CacheRecord(row['key'], row['response_json'], row['payload'], row['format_version'],
+                       row['timestamp'], row['last_access'])
+
+def key_columns(key):
+    """Returns the KEY_COLUMNS values for a cache key (all None for non-standard keys)."""
+    parts = parse_cache_key(key)
+    if parts is None:
+        return (None, None, None, None, None)
+    return (parts['data_type'], parts['keyword'], parts['location_code'], parts['language_code'], parts['device'])
+
+def prefix_range(prefix):
+    """Returns [low, high) bounds matching every key that starts with `prefix`, for index range scans."""
+    return [prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)]
+
+class CacheBackend:
+    """
+    Where `DatabaseManager` stores encoded cache entries.
+
+    A backend is an ordered key-value store of CacheRecords. Keys are compared as UTF-8
+    bytes, so `scan` pages through them in the same order whatever the backend.
+    Failures raise one of the exception types listed in `errors`.
+    """
+
+    name = None
+    errors = ()
+
+    def get_many(self, keys, min_timestamp=None):
+        """
+        Returns a dict mapping every found key to its CacheRecord. Keys written before
+        `min_timestamp` (an ISO string) are treated as missing.
+        """
+        raise NotImplementedError
+
+    def put_many(self, records):
+        """Inserts or replaces CacheRecords in one transaction. Returns the number written."""
+        raise NotImplementedError
+
+    def scan(self, prefix="", after_key=None, limit=None):
+        """Returns the records whose key starts with `prefix`, in key order, after `after_key`."""
+        raise NotImplementedError
+
+    def delete(self, keys):
+        """Deletes the given keys in one transaction. Returns the number actually deleted."""
+        raise NotImplementedError
+
+    def count(self, prefix=""):
+        """Counts the keys starting with `prefix`."""
+        raise NotImplementedError
+
+    def clear(self):
+        """Deletes every record."""
+        raise NotImplementedError
+
+    def size_bytes(self):
+        """Returns the space used by the stored records on disk."""
+        raise NotImplementedError
+
+    def close(self):
+        """Releases files and connections; the backend cannot be used afterwards."""
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Stores records in the `cache` table of the SQLite database (created by `DatabaseManager`),
+    alongside the structured key columns and access times the SQL-based cache queries use.
+    """
+
+    name = "sqlite"
+    errors = (sqlite3.Error,)
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def get_many(self, keys, min_timestamp=None):
+        keys = list(keys)
+        age_filter = ""
+        age_params = ()
+        if min_timestamp is not None:
+            # ISO-8601 timestamps sort chronologically as plain strings.
+            age_filter = " AND timestamp >= ?"
+            age_params = (min_timestamp,)
+
+        records = {}
+        with self.pool.connection() as conn:
+            for i in range(0, len(keys), SQLITE_MAX_VARIABLES):
+                chunk = keys[i:i + SQLITE_MAX_VARIABLES]
+                placeholders = ",".join("?" * len(chunk))
+                for row in conn.execute(
+                    f"SELECT {RECORD_COLUMNS} FROM cache WHERE key IN ({placeholders}){age_filter}",
+                    (*chunk, *age_params)
+                ):
+                    records[row['key']] = record_from_row(row)
+        return records
+
+    def put_many(self, records):
+        rows = [
+            (r.key, r.response_json, r.payload, r.format_version, r.timestamp, r.last_access or r.timestamp,
+             *key_columns(r.key))
+            for r in records
+        ]
+        if not rows:
+            return 0
+        with self.pool.connection() as conn:
+            with conn: # Commits on success, rolls back on error.
+                # A rewrite never moves last_access backwards, so re-encoding old rows keeps their recency.
+                conn.executemany(f"""
+                    INSERT INTO cache (key, response_json, payload, format_version, timestamp, last_access, {KEY_COLUMNS})
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (key) DO UPDATE SET
+                        response_json = excluded.response_json, payload = excluded.payload,
+                        format_version = excluded.format_version, timestamp = excluded.timestamp,
+                        last_access = MAX(COALESCE(cache.last_access, ''), excluded.last_access)
+                """, rows)
+        return len(rows)
+
+    def scan(self, prefix="", after_key=None, limit=None):
+        conditions = []
+        params = []
+        if prefix:
+            conditions.append("key >= ? AND key < ?")
+            params += prefix_range(prefix)
+        if after_key is not None:
+            conditions.append("key > ?")
+            params.append(after_key)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                f"SELECT {RECORD_COLUMNS} FROM cache {where} ORDER BY key LIMIT ?",
+                (*params, -1 if limit is None else limit)
+            ).fetchall()
+        return [record_from_row(row) for row in rows]
+
+    def delete(self, keys):
+        keys = list(keys)
+        deleted = 0
+        with self.pool.connection() as conn:
+            with conn:
+                for i in range(0, len(keys), SQLITE_MAX_VARIABLES):
+                    chunk = keys[i:i + SQLITE_MAX_VARIABLES]
+                    placeholders = ",".join("?" * len(chunk))
+                    deleted += conn.execute(f"DELETE FROM cache WHERE key IN ({placeholders})", chunk).rowcount
+        return deleted
+
+    def count(self, prefix=""):
+        with self.pool.connection() as conn:
+            if not prefix:
+                return conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            return conn.execute(
+                "SELECT COUNT(*) FROM cache WHERE key >= ? AND key < ?", prefix_range(prefix)
+            ).fetchone()[0]
+
+    def clear(self):
+        with self.pool.connection() as conn:
+            with conn:
+                conn.execute("DELETE FROM cache")
+
+    def size_bytes(self):
+        """The bytes used by the whole database file, not counting free pages awaiting reuse."""
+        with self.pool.connection() as conn:
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+            freelist_count = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return (page_count - freelist_count) * page_size
+
+class LMDBCacheBackend(CacheBackend):
+    """
+    Stores records in an LMDB environment: a memory-mapped B+tree whose reads are served
+    straight from the page cache without locks, which suits read-heavy caches with millions
+    of SERP payloads. Needs the `lmdb` package.
+
+    Values are a small header (format version and write time) followed by the payload, or by
+    the UTF-8 JSON text for uncompressed entries. Reads are not tracked, so `last_access` is
+    always None. LMDB limits keys to 511 bytes of UTF-8; longer keys are skipped on write.
+    """
+
+    name = "lmdb"
+    errors = (lmdb.Error,) if LMDB_AVAILABLE else ()
+
+    _HEADER = struct.Struct("<BB") # format_version, length of the ISO write time that follows
+
+    def __init__(self, path, map_size_mb=16384):
+        if not LMDB_AVAILABLE:
+            raise RuntimeError("The LMDB cache backend requires the lmdb package (pip install lmdb).")
+        os.makedirs(path, exist_ok=True)
+        # readahead=False keeps random reads from pulling neighbouring pages into memory.
+        self.env = lmdb.open(path, map_size=map_size_mb * 1024 * 1024, readahead=False, max_readers=256)
+        self.max_key_bytes = self.env.max_key_size()
+
+    def _encode_value(self, record):
+        timestamp = record.timestamp.encode("ascii")
+        body = record.response_json.encode("utf-8") if record.format_version == FORMAT_JSON else record.payload
+        return self._HEADER.pack(record.format_version, len(timestamp)) + timestamp + body
+
+    def _decode_value(self, key, value):
+        format_version, timestamp_length = self._HEADER.unpack_from(value)
+        body_start = self._HEADER.size + timestamp_length
+        timestamp = bytes(value[self._HEADER.size:body_start]).decode("ascii")
+        body = bytes(value[body_start:])
+        if format_version == FORMAT_JSON:
+            return CacheRecord(key, body.decode("utf-8"), None, format_version, timestamp)
+        return CacheRecord(key, "", body, format_version, timestamp)
+
+    def get_many(self, keys, min_timestamp=None):
+        records = {}
+        with self.env.begin(buffers=True) as txn:
+            for key in keys:
+                value = txn.get(key.encode("utf-8"))
+                if value is None:
+                    continue
+                record = self._decode_value(key, value)
+                if min_timestamp is None or record.timestamp >= min_timestamp:
+                    records[key] = record
+        return records
+
+    def put_many(self, records):
+        written = 0
+        with self.env.begin(write=True) as txn:
+            for record in records:
+                key = record.key.encode("utf-8")
+                if len(key) > self.max_key_bytes:
+                    print(f"Skipping cache key longer than {self.max_key_bytes} bytes: '{record.key[:80]}...'")
+                    continue
+                txn.put(key, self._encode_value(record))
+                written += 1
+        return written
+
+    def _iter_keys(self, txn, prefix, after_key=None):
+        """Yields (key, value) pairs with `prefix` in key order, starting after `after_key`."""
+        prefix_bytes = prefix.encode("utf-8")
+        after_bytes = after_key.encode("utf-8") if after_key is not None else None
+        cursor = txn.cursor()
+        if not cursor.set_range(max(prefix_bytes, after_bytes) if after_bytes is not None else prefix_bytes):
+            return
+        for key, value in cursor:
+            key = bytes(key)
+            if not key.startswith(prefix_bytes):
+                break
+            if key != after_bytes:
+                yield key, value
+
+    def scan(self, prefix="", after_key=None, limit=None):
+        records = []
+        with self.env.begin(buffers=True) as txn:
+            for key, value in self._iter_keys(txn, prefix, after_key):
+                if limit is not None and len(records) >= limit:
+                    break
+                records.append(self._decode_value(key.decode("utf-8"), value))
+        return records
+
+    def delete(self, keys):
+        deleted = 0
+        with self.env.begin(write=True) as txn:
+            for key in keys:
+                key = key.encode("utf-8")
+                if len(key) <= self.max_key_bytes and txn.delete(key):
+                    deleted += 1
+        return deleted
+
+    def count(self, prefix=""):
+        if not prefix:
+            return self.env.stat()['entries']
+        with self.env.begin(buffers=True) as txn:
+            return sum(1 for _ in self._iter_keys(txn, prefix))
+
+    def clear(self):
+        with self.env.begin(write=True) as txn:
+            txn.drop(self.env.open_db(txn=txn), delete=False)
+
+    def size_bytes(self):
+        """
+        The bytes of the pages holding records. The file itself never shrinks (`last_pgno` only
+        grows), but pages freed by deletes are reused, so this is what eviction can bring down.
+        """
+        stat = self.env.stat()
+        return (stat['branch_pages'] + stat['leaf_pages'] + stat['overflow_pages']) * stat['psize']
+
+    def close(self):
+        self.env.close()
+
+BACKENDS = {
+    "sqlite": SQLiteCacheBackend,
+    "lmdb": LMDBCacheBackend,
+}
+
+def create_cache_backend(name, pool, lmdb_path=None, lmdb_map_size_mb=16384):
+    """
+    Creates the backend configured by `CACHE_BACKEND`. The SQLite backend shares `pool` with
+    the projection tables; the LMDB one opens its own environment at `lmdb_path`.
+    """
+    if name == "sqlite":
+        return SQLiteCacheBackend(pool)
+    if name == "lmdb":
+        return LMDBCacheBackend(lmdb_path, lmdb_map_size_mb)
+    raise ValueError(f"Unknown cache backend '{name}'. Expected one of {list(BACKENDS)}.")
@@ -0,0 +1,155 @@
+# modules/cache_codec.py
+
+import json
+import threading
+import zlib
+
+try:
+    import zstandard as zstd
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Values stored in the cache table's `format_version` column.
+FORMAT_JSON = 0        # Plain JSON text in `response_json` (rows written before compression).
+FORMAT_ZLIB = 1        # zlib-compressed compact JSON in `payload`.
+FORMAT_ZSTD = 2        # zstd-compressed compact JSON in `payload`.
+FORMAT_ZSTD_DICT = 3   # zstd with a trained dictionary; the frame header records which one.
+
+COMPRESSION_FORMATS = {
+    "none": FORMAT_JSON,
+    "zlib": FORMAT_ZLIB,
+    "zstd": FORMAT_ZSTD,
+}
+
+class PayloadDecodeError(ValueError):
+    """Raised when a cache row cannot be decompressed or parsed."""
+
+class PayloadCodec:
+    """
+    Encodes API responses for storage in the cache table and decodes them again.
+
+    Responses are serialized as compact JSON and compressed with zlib (always available)
+    or zstd (if the `zstandard` package is installed). A zstd dictionary trained on cached
+    SERP responses can be added with `set_dictionary`; small, repetitive payloads like
+    SERP tasks compress considerably better with one.
+    """
+
+    def __init__(self, compression="zlib", zlib_level=6, zstd_level=3):
+        if compression not in COMPRESSION_FORMATS:
+            raise ValueError(f"Unknown compression '{compression}'. Choose from {list(COMPRESSION_FORMATS)}.")
+        if compression == "zstd" and not ZSTD_AVAILABLE:
+            print("zstandard is not installed; falling back to zlib compression for the cache.")
+            compression = "zlib"
+        self.compression = compression
+        self.zlib_level = zlib_level
+        self.zstd_level = zstd_level
+        self._dictionary = None
+        self._known_dictionaries = {}
+        # zstd (de)compressor objects must not be shared between threads.
+        self._local = threading.local()
+
+    @property
+    def format_version(self):
+        """The format that `encode` currently writes."""
+        if self.compression == "zstd" and self._dictionary is not None:
+            return FORMAT_ZSTD_DICT
+        return COMPRESSION_FORMATS[self.compression]
+
+    def add_dictionary(self, dict_data):
+        """Registers a stored zstd dictionary (raw bytes) for decoding. Returns its dictionary id."""
+        dictionary = zstd.ZstdCompressionDict(dict_data)
+        self._known_dictionaries[dictionary.dict_id()] = dictionary
+        return dictionary.dict_id()
+
+    def set_dictionary(self, dict_data):
+        """Registers a zstd dictionary and uses it for every payload encoded from now on."""
+        dict_id = self.add_dictionary(dict_data)
+        self._dictionary = self._known_dictionaries[dict_id]
+        return dict_id
+
+    @staticmethod
+    def train_dictionary(samples, dict_size=112640):
+        """
+        Trains a zstd dictionary on sample responses.
+
+        Args:
+            samples (list): Decoded API responses, ideally a few hundred or more.
+            dict_size (int): Target dictionary size in bytes.
+        Returns:
+            bytes: The raw dictionary, ready for `set_dictionary` and for storing.
+        """
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("Training a compression dictionary requires the zstandard package.")
+        encoded = [_dumps(sample).encode("utf-8") for sample in samples]
+        try:
+            return zstd.train_dictionary(dict_size, encoded).as_bytes()
+        except zstd.ZstdError as e:
+            raise RuntimeError(f"Could not train a compression dictionary: {e}") from e
+
+    def encode(self, data):
+        """
+        Serializes and compresses one response.
+
+        Returns:
+            tuple: (response_json, payload, format_version). Exactly one of the first two is used:
+                   uncompressed rows keep their JSON text, compressed rows keep a blob.
+        """
+        text = _dumps(data)
+        format_version = self.format_version
+        if format_version == FORMAT_JSON:
+            return text, None, format_version
+        if format_version == FORMAT_ZLIB:
+            return "", zlib.compress(text.encode("utf-8"), self.zlib_level), format_version
+        return "", self._zstd_compressor().compress(text.encode("utf-8")), format_version
+
+    def decode(self, response_json, payload, format_version):
+        """
+        Restores the response from a cache row, whatever format it was written in.
+        Raises `PayloadDecodeError` if the row cannot be read.
+        """
+        return self.decode_with_size(response_json, payload, format_version)[0]
+
+    def decode_with_size(self, response_json, payload, format_version):
+        """Like `decode`, but returns (data, size of the JSON text in bytes)."""
+        try:
+            if not format_version:
+                text = response_json
+            elif format_version == FORMAT_ZLIB:
+                text = zlib.decompress(payload)
+            elif format_version in (FORMAT_ZSTD, FORMAT_ZSTD_DICT):
+                if not ZSTD_AVAILABLE:
+                    raise PayloadDecodeError("This cache entry is zstd-compressed but zstandard is not installed.")
+                text = self._decompressor_for(payload).decompress(payload)
+            else:
+                raise PayloadDecodeError(f"Unknown cache payload format version {format_version}.")
+            return json.loads(text), len(text)
+        except PayloadDecodeError:
+            raise
+        except Exception as e: # json, zlib and zstd each raise their own error types.
+            raise PayloadDecodeError(str(e)) from e
+
+    def _zstd_compressor(self):
+        compressor, dictionary = getattr(self._local, "compressor", (None, None))
+        if compressor is None or dictionary is not self._dictionary:
+            compressor = zstd.ZstdCompressor(level=self.zstd_level, dict_data=self._dictionary)
+            self._local.compressor = (compressor, self._dictionary)
+        return compressor
+
+    def _decompressor_for(self, payload):
+        if not hasattr(self._local, "decompressors"):
+            self._local.decompressors = {}
+        dict_id = zstd.get_frame_parameters(payload).dict_id
+        decompressor = self._local.decompressors.get(dict_id)
+        if decompressor is None:
+            dictionary = None
+            if dict_id:
+                dictionary = self._known_dictionaries.get(dict_id)
+                if dictionary is None:
+                    raise PayloadDecodeError(f"The zstd dictionary {dict_id} for this cache entry is missing.")
+            decompressor = zstd.ZstdDecompressor(dict_data=dictionary)
+            self._local.decompressors[dict_id] = decompressor
+        return decompressor
+
+def _dumps(data):
+    return json.dumps(data, separators=(",", ":"))
@@ -0,0 +1,125 @@
+# modules/cache_maintenance.py
+
+import threading
+import time
+from datetime import datetime
+
+from config import (
+    CACHE_MAX_AGE_DAYS_BY_TYPE, CACHE_MAX_SIZE_MB,
+    CACHE_MAINTENANCE_INTERVAL_SECONDS, CACHE_EVICTION_BATCH_SIZE,
+)
+
+class CacheMaintenance:
+    """
+    Policy-driven eviction and compaction for the local cache.
+
+    Each run:
+    1. writes pending last-access times,
+    2. evicts entries older than the maximum age configured for their data type,
+    3. evicts least recently used entries while the database is larger than the size limit,
+    4. releases free pages (incremental vacuum) and checkpoints the WAL.
+
+    Deletions happen in small transactions with a short pause in between, so interactive
+    reads and fetcher writes are never held up for long. Runs can be started manually
+    (`run_once`) or on a background timer (`start`).
+    """
+
+    def __init__(self, db_manager, max_age_days_by_type=None, max_size_mb=CACHE_MAX_SIZE_MB,
+                 batch_size=CACHE_EVICTION_BATCH_SIZE, interval_seconds=CACHE_MAINTENANCE_INTERVAL_SECONDS):
+        self.db_manager = db_manager
+        self.max_age_days_by_type = dict(
+            CACHE_MAX_AGE_DAYS_BY_TYPE if max_age_days_by_type is None else max_age_days_by_type
+        )
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024) if max_size_mb else None
+        self.batch_size = batch_size
+        self.interval_seconds = interval_seconds
+        self.last_report = None
+        self._run_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def is_running(self):
+        """True while a maintenance run is in progress."""
+        return self._run_lock.locked()
+
+    def run_once(self, log_callback=None):
+        """
+        Runs one maintenance pass.
+
+        Args:
+            log_callback (function, optional): Called with a message after each step.
+        Returns:
+            dict: A report of what was done, or None if another run was already in progress.
+        """
+        if not self._run_lock.acquire(blocking=False):
+            return None
+        try:
+            if not log_callback:
+                log_callback = lambda msg: None
+            started = time.monotonic()
+            report = {"started_at": datetime.utcnow().isoformat(), "expired": {}, "evicted_for_size": 0}
+
+            self.db_manager.flush_access_times()
+            report["size_before"] = self.db_manager.database_size_bytes()
+
+            for data_type, max_age_days in self.max_age_days_by_type.items():
+                if max_age_days is None:
+                    continue
+                expired = self._evict_batches(
+                    lambda: self.db_manager.find_stale_keys(max_age_days, data_type=data_type, limit=self.batch_size)
+                )
+                report["expired"][data_type] = expired
+                log_callback(f"Evicted {expired} {data_type} entries older than {max_age_days} days")
+
+            if self.max_size_bytes:
+                lru_batches = self.db_manager.iter_least_recently_used_batches(self.batch_size)
+                report["evicted_for_size"] = self._evict_batches(
+                    lambda: next(lru_batches, None),
+                    keep_going=lambda: self.db_manager.database_size_bytes() > self.max_size_bytes
+                )
+                log_callback(f"Evicted {report['evicted_for_size']} least recently used entries to stay under the size limit")
+
+            report["compaction"] = self.db_manager.compact()
+            report["size_after"] = self.db_manager.database_size_bytes()
+            report["duration_seconds"] = round(time.monotonic() - started, 2)
+            log_callback(f"Compaction released {report['compaction']['pages_released']} pages")
+            self.last_report = report
+            return report
+        finally:
+            self._run_lock.release()
+
+    def _evict_batches(self, next_keys, keep_going=lambda: True):
+        """Deletes batches of keys from `next_keys()` until it runs dry or `keep_going()` is False."""
+        evicted = 0
+        while keep_going() and not self._stop_event.is_set():
+            keys = next_keys()
+            if not keys:
+                break
+            deleted = self.db_manager.delete_cache_keys(keys)
+            if not deleted:
+                break # The delete failed; try again on the next run.
+            evicted += deleted
+            time.sleep(0.01) # Let waiting writers take the lock between batches.
+        return evicted
+
+    def start(self):
+        """Starts running maintenance every `interval_seconds` on a daemon thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run_periodically, name="cache-maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the timer; a run in progress finishes its current batch first."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=10)
+
+    def _run_periodically(self):
+        while not self._stop_event.wait(self.interval_seconds):
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Error during cache maintenance: {e}")
@@ -0,0 +1,87 @@
+# modules/cache_projections.py
+
+# Extracts the few fields the app actually uses from cached DataForSEO responses, so they can be
+# stored in compact projection tables (`serp_urls`, `keyword_metrics`) next to the raw cache.
+
+def parse_cache_key(key):
+    """
+    Splits a cache key into its parts.
+
+    Keys look like `serp|{kw}|{location_code}|{language_code}|{device}` or
+    `{volume|kd|intent}|{kw}|{location_code}|{language_code}`. The keyword is taken from the
+    middle, so keywords containing '|' still parse correctly.
+
+    Returns:
+        dict: data_type, keyword, location_code (int), language_code and device (None for
+              non-SERP keys), or None if the key does not follow this layout.
+    """
+    data_type, _, rest = key.partition("|")
+    if data_type == "serp":
+        parts = rest.rsplit("|", 3)
+        if len(parts) != 4:
+            return None
+        keyword, location_code, language_code, device = parts
+    elif data_type in ("volume", "kd", "intent"):
+        parts = rest.rsplit("|", 2)
+        if len(parts) != 3:
+            return None
+        keyword, location_code, language_code = parts
+        device = None
+    else:
+        return None
+    try:
+        location_code = int(location_code)
+    except ValueError:
+        return None
+    return {
+        "data_type": data_type,
+        "keyword": keyword,
+        "location_code": location_code,
+        "language_code": language_code,
+        "device": device,
+    }
+
+def build_cache_key(data_type, keyword, location_code, language_code, device=None):
+    """The inverse of `parse_cache_key`."""
+    if data_type == "serp":
+        return f"serp|{keyword}|{location_code}|{language_code}|{device}"
+    return f"{data_type}|{keyword}|{location_code}|{language_code}"
+
+def _first_result(data):
+    if data and data.get('tasks') and data['tasks'][0].get('result'):
+        return data['tasks'][0]['result'][0]
+    return None
+
+def extract_serp_urls(serp_data):
+    """
+    Returns the result URLs of a SERP response in rank order, or None if it has no result.
+    Items without a URL (e.g. `"url": null` on some SERP features) are skipped.
+    """
+    result = _first_result(serp_data)
+    if result is None:
+        return None
+    return [
+        item['url'] for item in result.get('items') or []
+        if isinstance(item, dict) and isinstance(item.get('url'), str) and item['url']
+    ]
+
+def extract_keyword_metrics(data_type, data):
+    """
+    Returns the metric columns a volume, kd or intent response contributes to `keyword_metrics`,
+    e.g. {'search_volume': 880, 'cpc': 1.2}, or None if the response has no result.
+    """
+    result = _first_result(data)
+    if result is None:
+        return None
+    if data_type == "volume":
+        return {"search_volume": result.get('search_volume'), "cpc": result.get('cpc')}
+
+    result_items = result.get('items') or []
+    if not result_items:
+        return None
+    if data_type == "kd":
+        return {"keyword_difficulty": result_items[0].get('keyword_difficulty')}
+    if data_type == "intent":
+        keyword_intent = result_items[0].get('keyword_intent') or {}
+        return {"intent": keyword_intent.get('label')}
+    return None
@@ -1,7 +1,290 @@
 # modules/clustering.py
 
-import pandas as pd
-from typing import List
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, Iterator, List
+
+try:
+    import numpy as np
+    from scipy import sparse
+    SPARSE_BACKEND_AVAILABLE = True
+except ImportError:
+    SPARSE_BACKEND_AVAILABLE = False
+    np = None
+    sparse = None
+
+class SerpOverlapIndex:
+    """
+    Preprocessed, integer-interned view of a keyword -> SERP URLs mapping.
+    Keywords are referred to by integer ids (their position in `keywords`) and every URL is
+    interned to an integer id once, so each keyword's top `urls_to_check` URLs are stored a
+    single time as a frozenset of ints. An inverted index maps every URL id to the ids of the
+    keywords ranking it, so overlap counting only visits keywords that actually share a URL.
+    Built once per clustering run and shared by all algorithms.
+    """
+
+    BACKENDS = ("python", "sparse")
+
+    def __init__(self, keyword_serp_data: dict, urls_to_check: int = 10, backend: str = "python"):
+        """
+        Builds the index.
+
+        Args:
+            keyword_serp_data: Dictionary mapping keywords to their SERP URLs
+            urls_to_check: Number of top URLs to consider
+            backend: "python" computes neighbours lazily through the inverted index,
+                     "sparse" computes all of them at once with a NumPy/SciPy matrix product
+        """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown overlap backend '{backend}'. Expected one of {self.BACKENDS}.")
+        if backend == "sparse" and not SPARSE_BACKEND_AVAILABLE:
+            print("NumPy/SciPy not available, falling back to the python overlap backend.")
+            backend = "python"
+
+        self.backend = backend
+        self.urls_to_check = urls_to_check
+        self.keywords = list(keyword_serp_data.keys())
+        self.keyword_ids = {kw: kw_id for kw_id, kw in enumerate(self.keywords)}
+
+        self.url_ids = {}
+        self.keyword_urls = []
+        url_keywords = []
+        for kw_id, kw in enumerate(self.keywords):
+            urls = keyword_serp_data[kw]
+            interned = set()
+            for url in (urls or [])[:urls_to_check]:
+                url_id = self.url_ids.get(url)
+                if url_id is None:
+                    url_id = self.url_ids[url] = len(url_keywords)
+                    url_keywords.append([])
+                if url_id not in interned:
+                    interned.add(url_id)
+                    url_keywords[url_id].append(kw_id)
+            self.keyword_urls.append(frozenset(interned))
+
+        self.url_keywords = [tuple(kw_ids) for kw_ids in url_keywords]
+        self._neighbours = {}
+        self._pair_counts = None
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def ids_for(self, keywords: List[str]) -> List[int]:
+        """Maps keywords to their ids, preserving order."""
+        return [self.keyword_ids[kw] for kw in keywords]
+
+    def intersections(self, first_id: int, second_id: int) -> int:
+        """Number of URLs shared by two keywords."""
+        return len(self.keyword_urls[first_id] & self.keyword_urls[second_id])
+
+    def overlap_counts(self, kw_id: int) -> Dict[int, int]:
+        """
+        Counts shared URLs between one keyword and every indexed keyword it overlaps with.
+
+        Args:
+            kw_id: Id of the keyword to compare against the index
+
+        Returns:
+            Dictionary mapping keyword ids to their number of shared URLs (only non-zero counts)
+        """
+        counts = {}
+        for url_id in self.keyword_urls[kw_id]:
+            for other_id in self.url_keywords[url_id]:
+                if other_id != kw_id:
+                    counts[other_id] = counts.get(other_id, 0) + 1
+        return counts
+
+    def connected_components(self, min_intersections: int = 1) -> List[List[int]]:
+        """
+        Splits the keywords into the connected components of the neighbour graph for
+        `min_intersections`. Every algorithm only grows a cluster through neighbours of its
+        members, so keywords in different components can never end up in the same cluster.
+        Thresholding keeps hub URLs shared by unrelated keywords from merging everything.
+
+        Args:
+            min_intersections: Minimum number of shared URLs for two keywords to be connected
+
+        Returns:
+            List of components, each a list of keyword ids in index order
+        """
+        neighbours = self.neighbours(max(min_intersections, 1))
+        parent = list(range(len(self.keywords)))
+
+        def find(kw_id):
+            while parent[kw_id] != kw_id:
+                parent[kw_id] = parent[parent[kw_id]]
+                kw_id = parent[kw_id]
+            return kw_id
+
+        for kw_id in range(len(self.keywords)):
+            root = find(kw_id)
+            for other_id in neighbours[kw_id]:
+                if other_id > kw_id:
+                    other_root = find(other_id)
+                    if other_root != root:
+                        parent[other_root] = root
+
+        components = {}
+        for kw_id in range(len(self.keywords)):
+            components.setdefault(find(kw_id), []).append(kw_id)
+        return list(components.values())
+
+    def neighbours(self, min_intersections: int) -> "_NeighbourLookup":
+        """
+        Adjacency of the keyword graph where two keywords are connected if they share at least
+        `min_intersections` URLs. Cached per threshold, so every algorithm run on this index
+        reuses the same lookup.
+
+        Args:
+            min_intersections: Minimum number of shared URLs for two keywords to be neighbours
+
+        Returns:
+            A lookup where `lookup[kw_id]` is the frozenset of neighbour ids of `kw_id`
+        """
+        if min_intersections not in self._neighbours:
+            if self.backend == "sparse" and min_intersections > 0:
+                precomputed = self._sparse_neighbours(min_intersections)
+            else:
+                precomputed = None
+            self._neighbours[min_intersections] = _NeighbourLookup(self, min_intersections, precomputed)
+        return self._neighbours[min_intersections]
+
+    def set_neighbours(self, min_intersections: int, neighbour_sets: List[frozenset]):
+        """
+        Seeds the neighbour cache for one threshold with sets computed elsewhere, e.g. by a
+        PositionalOverlapProfile shared across several parameter settings.
+        """
+        self._neighbours[min_intersections] = _NeighbourLookup(self, min_intersections, list(neighbour_sets))
+
+    def _sparse_neighbours(self, min_intersections: int) -> List[frozenset]:
+        """
+        Computes every keyword's neighbour set in one pass from the pairwise intersection counts.
+        The counts are kept, so further thresholds on the same index skip the matrix product.
+        """
+        if self._pair_counts is None:
+            lengths = [len(urls) for urls in self.keyword_urls]
+            rows = np.repeat(np.arange(len(self.keywords), dtype=np.int32), lengths)
+            cols = np.fromiter((url_id for urls in self.keyword_urls for url_id in urls),
+                               dtype=np.int32, count=int(sum(lengths)))
+            self._pair_counts = _pair_counts(rows, cols, (len(self.keywords), len(self.url_keywords)))
+        return _neighbour_sets(self._pair_counts, min_intersections)
+
+def _pair_counts(rows, cols, shape):
+    """
+    Pairwise URL intersection counts of every keyword pair sharing a URL. Keywords are the rows
+    of a sparse binary keyword x URL matrix built from the (row, col) entries, so `M @ M.T` holds
+    all counts at once. The diagonal is dropped and counts are stored in the smallest integer type.
+    """
+    matrix = sparse.csr_matrix((np.ones(len(cols), dtype=np.int32), (rows, cols)), shape=shape)
+    counts = (matrix @ matrix.T).tocsr()
+    counts.setdiag(0)
+    counts.eliminate_zeros()
+    counts.data = counts.data.astype(np.min_scalar_type(int(counts.data.max(initial=0))))
+    return counts
+
+def _neighbour_sets(pair_counts, min_intersections: int) -> List[frozenset]:
+    """Neighbour sets of every row of a `_pair_counts` matrix for one threshold."""
+    above = pair_counts.copy()
+    above.data = (above.data >= min_intersections).astype(np.int8)
+    above.eliminate_zeros()
+    indptr, indices = above.indptr, above.indices.tolist()
+    return [frozenset(indices[indptr[kw_id]:indptr[kw_id + 1]]) for kw_id in range(above.shape[0])]
+
+class _NeighbourLookup:
+    """
+    Per-threshold neighbour sets of a SerpOverlapIndex. Sets come from the sparse backend when
+    precomputed, otherwise they are computed on first access through the inverted index.
+    """
+
+    def __init__(self, index: SerpOverlapIndex, min_intersections: int, precomputed: List[frozenset] = None):
+        self.index = index
+        self.min_intersections = min_intersections
+        self._sets = precomputed if precomputed is not None else [None] * len(index)
+
+    def __getitem__(self, kw_id: int) -> frozenset:
+        neighbours = self._sets[kw_id]
+        if neighbours is None:
+            if self.min_intersections <= 0:
+                # Every pair qualifies, including keywords without any shared URL
+                neighbours = frozenset(range(len(self.index))) - {kw_id}
+            else:
+                neighbours = frozenset(
+                    other_id for other_id, intersections in self.index.overlap_counts(kw_id).items()
+                    if intersections >= self.min_intersections
+                )
+            self._sets[kw_id] = neighbours
+        return neighbours
+
+class PositionalOverlapProfile:
+    """
+    Pairwise URL overlaps for every `urls_to_check` of a parameter sweep, built from a single
+    pass over the SERPs. Each keyword's URLs are interned once with the position at which they
+    first occur; the top-N overlap of two keywords counts the URLs ranking within the top N for
+    both. For each distinct N one sparse matrix product yields the counts of all pairs, which
+    every `min_intersections` threshold then filters. Needs NumPy/SciPy.
+    """
+
+    def __init__(self, keyword_serp_data: dict, max_urls_to_check: int = 20):
+        """
+        Builds the profile.
+
+        Args:
+            keyword_serp_data: Dictionary mapping keywords to their SERP URLs
+            max_urls_to_check: Largest number of top URLs any setting will consider
+        """
+        if not SPARSE_BACKEND_AVAILABLE:
+            raise RuntimeError("PositionalOverlapProfile requires NumPy and SciPy.")
+        self.max_urls_to_check = max_urls_to_check
+        self.keywords = list(keyword_serp_data.keys())
+
+        url_ids = {}
+        rows, cols, positions = [], [], []
+        for kw_id, kw in enumerate(self.keywords):
+            seen = set()
+            for position, url in enumerate((keyword_serp_data[kw] or [])[:max_urls_to_check]):
+                if url not in seen:
+                    seen.add(url)
+                    rows.append(kw_id)
+                    cols.append(url_ids.setdefault(url, len(url_ids)))
+                    positions.append(position)
+
+        self._rows = np.array(rows, dtype=np.int32)
+        self._cols = np.array(cols, dtype=np.int32)
+        self._positions = np.array(positions, dtype=np.int16)
+        self._url_count = len(url_ids)
+        self._counts = {}
+
+    def pair_counts(self, urls_to_check: int):
+        """Sparse keyword x keyword matrix of top-`urls_to_check` intersection counts, cached per depth."""
+        if urls_to_check > self.max_urls_to_check:
+            raise ValueError(
+                f"urls_to_check={urls_to_check} exceeds the profile's max_urls_to_check={self.max_urls_to_check}."
+            )
+        if urls_to_check not in self._counts:
+            within = self._positions < urls_to_check
+            self._counts[urls_to_check] = _pair_counts(
+                self._rows[within], self._cols[within], (len(self.keywords), self._url_count)
+            )
+        return self._counts[urls_to_check]
+
+    def neighbour_sets(self, urls_to_check: int, min_intersections: int) -> List[frozenset]:
+        """
+        Neighbour sets of every keyword for one (urls_to_check, min_intersections) setting.
+
+        Args:
+            urls_to_check: Number of top URLs to consider, at most `max_urls_to_check`
+            min_intersections: Minimum number of shared URLs for two keywords to be neighbours
+
+        Returns:
+            List indexed by keyword id of frozensets of neighbour ids
+        """
+        pair_counts = self.pair_counts(urls_to_check)
+        if min_intersections <= 0:
+            everyone = frozenset(range(len(self.keywords)))
+            return [everyone - {kw_id} for kw_id in range(len(self.keywords))]
+        return _neighbour_sets(pair_counts, min_intersections)
 
 class ClusteringAlgorithms:
     """
@@ -11,7 +294,8 @@ class ClusteringAlgorithms:
 
     @staticmethod
     def default_algorithm(keyword_serp_data: dict, keyword_metrics: dict, min_intersections: int = 3,
-                         urls_to_check: int = 10, cluster_strategy: str = "volume") -> List[List[str]]:
+                         urls_to_check: int = 10, cluster_strategy: str = "volume",
+                         index: SerpOverlapIndex = None) -> List[List[str]]:
         """
         Default Algorithm: Groups keywords if they share X URLs with the primary keyword.
         Creates broader topic clusters. Best for content hubs and category planning.
@@ -22,47 +306,57 @@ class ClusteringAlgorithms:
             min_intersections: Minimum number of shared URLs required
             urls_to_check: Number of top URLs to consider
             cluster_strategy: "volume" or "cpc" for primary keyword selection
+            index: Optional prebuilt SerpOverlapIndex for `keyword_serp_data` and `urls_to_check`
 
         Returns:
             List of clusters, where each cluster is a list of keywords
         """
-        # Sort keywords by the chosen strategy (volume or CPC) to determine primary keywords
-        sorted_keywords = ClusteringAlgorithms._sort_keywords_by_strategy(
-            list(keyword_serp_data.keys()), keyword_metrics, cluster_strategy
-        )
+        return list(ClusteringAlgorithms.iter_default_algorithm(
+            keyword_serp_data, keyword_metrics, min_intersections, urls_to_check, cluster_strategy, index
+        ))
 
-        clusters = []
-        unclustered_keywords = set(sorted_keywords)
-
-        while unclustered_keywords:
-            # Take the highest-ranking unclustered keyword as the primary keyword
-            primary_keyword = next(kw for kw in sorted_keywords if kw in unclustered_keywords)
-            cluster = [primary_keyword]
-            unclustered_keywords.remove(primary_keyword)
+    @staticmethod
+    def iter_default_algorithm(keyword_serp_data: dict, keyword_metrics: dict, min_intersections: int = 3,
+                               urls_to_check: int = 10, cluster_strategy: str = "volume",
+                               index: SerpOverlapIndex = None) -> Iterator[List[str]]:
+        """
+        Generator form of `default_algorithm`, taking the same arguments.
+        Yields each cluster (a list of keywords) as soon as it is finalized.
+        """
+        if index is None:
+            index = SerpOverlapIndex(keyword_serp_data, urls_to_check)
 
-            primary_urls = set(keyword_serp_data[primary_keyword][:urls_to_check])
+        # Sort keywords by the chosen strategy (volume or CPC) to determine primary keywords
+        ranked_ids = index.ids_for(ClusteringAlgorithms._sort_keywords_by_strategy(
+            index.keywords, keyword_metrics, cluster_strategy
+        ))
+        rank = {kw_id: position for position, kw_id in enumerate(ranked_ids)}
 
-            # Find all keywords that share enough URLs with the primary keyword
-            candidates_to_remove = []
-            for candidate in unclustered_keywords:
-                candidate_urls = set(keyword_serp_data[candidate][:urls_to_check])
-                intersections = len(primary_urls.intersection(candidate_urls))
+        # Candidates are only the primary's neighbours in the URL overlap graph, so keywords
+        # without enough shared URLs are never compared.
+        neighbours = index.neighbours(min_intersections)
+        clustered = set()
 
-                if intersections >= min_intersections:
-                    cluster.append(candidate)
-                    candidates_to_remove.append(candidate)
+        for primary_id in ranked_ids:
+            if primary_id in clustered:
+                continue
 
-            # Remove clustered candidates
-            for candidate in candidates_to_remove:
-                unclustered_keywords.remove(candidate)
+            # Take the highest-ranking unclustered keyword as the primary keyword
+            clustered.add(primary_id)
 
-            clusters.append(cluster)
+            # Find all keywords that share enough URLs with the primary keyword
+            members = sorted(
+                (kw_id for kw_id in neighbours[primary_id] if kw_id not in clustered),
+                key=rank.__getitem__
+            )
+            clustered.update(members)
 
-        return clusters
+            yield [index.keywords[kw_id] for kw_id in [primary_id] + members]
 
     @staticmethod
     def strict_algorithm(keyword_serp_data: dict, keyword_metrics: dict, min_intersections: int = 3,
-                        urls_to_check: int = 10, cluster_strategy: str = "volume") -> List[List[str]]:
+                        urls_to_check: int = 10, cluster_strategy: str = "volume",
+                        index: SerpOverlapIndex = None) -> List[List[str]]:
         """
         Strict Algorithm: Groups keywords only if ALL keywords in the cluster share X URLs with each other.
         Creates very tight, highly relevant clusters. Best for precise content targeting.
@@ -73,53 +367,61 @@ class ClusteringAlgorithms:
             min_intersections: Minimum number of shared URLs required between ALL pairs
             urls_to_check: Number of top URLs to consider
             cluster_strategy: "volume" or "cpc" for primary keyword selection
+            index: Optional prebuilt SerpOverlapIndex for `keyword_serp_data` and `urls_to_check`
 
         Returns:
             List of clusters, where each cluster is a list of keywords
         """
-        sorted_keywords = ClusteringAlgorithms._sort_keywords_by_strategy(
-            list(keyword_serp_data.keys()), keyword_metrics, cluster_strategy
-        )
+        return list(ClusteringAlgorithms.iter_strict_algorithm(
+            keyword_serp_data, keyword_metrics, min_intersections, urls_to_check, cluster_strategy, index
+        ))
 
-        clusters = []
-        unclustered_keywords = set(sorted_keywords)
+    @staticmethod
+    def iter_strict_algorithm(keyword_serp_data: dict, keyword_metrics: dict, min_intersections: int = 3,
+                              urls_to_check: int = 10, cluster_strategy: str = "volume",
+                              index: SerpOverlapIndex = None) -> Iterator[List[str]]:
+        """
+        Generator form of `strict_algorithm`, taking the same arguments.
+        Yields each cluster (a list of keywords) as soon as it is finalized.
+        """
+        if index is None:
+            index = SerpOverlapIndex(keyword_serp_data, urls_to_check)
 
-        while unclustered_keywords:
-            # Take the highest-ranking unclustered keyword as seed
-            seed_keyword = next(kw for kw in sorted_keywords if kw in unclustered_keywords)
-            cluster = [seed_keyword]
-            unclustered_keywords.remove(seed_keyword)
+        ranked_ids = index.ids_for(ClusteringAlgorithms._sort_keywords_by_strategy(
+            index.keywords, keyword_metrics, cluster_strategy
+        ))
+        neighbours = index.neighbours(min_intersections)
+        rank = {kw_id: position for position, kw_id in enumerate(ranked_ids)}
 
-            # Try to add keywords that share enough URLs with ALL existing cluster members
-            candidates_to_remove = []
-            for candidate in list(unclustered_keywords):
-                can_join_cluster = True
-                candidate_urls = set(keyword_serp_data[candidate][:urls_to_check])
+        clustered = set()
 
-                # Check if candidate shares enough URLs with ALL cluster members
-                for cluster_member in cluster:
-                    member_urls = set(keyword_serp_data[cluster_member][:urls_to_check])
-                    intersections = len(candidate_urls.intersection(member_urls))
+        for seed_id in ranked_ids:
+            if seed_id in clustered:
+                continue
 
-                    if intersections < min_intersections:
-                        can_join_cluster = False
-                        break
+            # Take the highest-ranking unclustered keyword as seed
+            cluster = [seed_id]
+            clustered.add(seed_id)
 
-                if can_join_cluster:
-                    cluster.append(candidate)
-                    candidates_to_remove.append(candidate)
+            # Admissible candidates share enough URLs with ALL existing cluster members: the
+            # intersection of the members' neighbour sets. Adding a member only shrinks it, so
+            # no candidate is ever re-tested against the whole cluster.
+            admissible = {kw_id for kw_id in neighbours[seed_id] if kw_id not in clustered}
 
-            # Remove clustered candidates
-            for candidate in candidates_to_remove:
-                unclustered_keywords.remove(candidate)
+            for candidate_id in sorted(admissible, key=rank.__getitem__):
+                if candidate_id not in admissible:
+                    continue
 
-            clusters.append(cluster)
+                cluster.append(candidate_id)
+                clustered.add(candidate_id)
+                admissible &= neighbours[candidate_id]
 
-        return clusters
+            yield [index.keywords[kw_id] for kw_id in cluster]
 
     @staticmethod
     def balanced_strict_algorithm(keyword_serp_data: dict, keyword_metrics: dict, min_intersections: int = 3,
-                                 urls_to_check: int = 10, cluster_strategy: str = "volume") -> List[List[str]]:
+                                 urls_to_check: int = 10, cluster_strategy: str = "volume",
+                                 index: SerpOverlapIndex = None) -> List[List[str]]:
         """
         Balanced Strict Algorithm: Uses progressive thresholds to solve the strict algorithm's limitations.
         - Small clusters (2-5 keywords): requires 100% match (like Strict)
@@ -132,64 +434,98 @@ class ClusteringAlgorithms:
             min_intersections: Base minimum number of shared URLs required
             urls_to_check: Number of top URLs to consider
             cluster_strategy: "volume" or "cpc" for primary keyword selection
+            index: Optional prebuilt SerpOverlapIndex for `keyword_serp_data` and `urls_to_check`
 
         Returns:
             List of clusters, where each cluster is a list of keywords
         """
-        sorted_keywords = ClusteringAlgorithms._sort_keywords_by_strategy(
-            list(keyword_serp_data.keys()), keyword_metrics, cluster_strategy
-        )
+        return list(ClusteringAlgorithms.iter_balanced_strict_algorithm(
+            keyword_serp_data, keyword_metrics, min_intersections, urls_to_check, cluster_strategy, index
+        ))
+
+    @staticmethod
+    def iter_balanced_strict_algorithm(keyword_serp_data: dict, keyword_metrics: dict, min_intersections: int = 3,
+                                       urls_to_check: int = 10, cluster_strategy: str = "volume",
+                                       index: SerpOverlapIndex = None) -> Iterator[List[str]]:
+        """
+        Generator form of `balanced_strict_algorithm`, taking the same arguments.
+        Yields each cluster (a list of keywords) as soon as it is finalized.
+        """
+        if index is None:
+            index = SerpOverlapIndex(keyword_serp_data, urls_to_check)
 
-        clusters = []
-        unclustered_keywords = set(sorted_keywords)
+        ranked_ids = index.ids_for(ClusteringAlgorithms._sort_keywords_by_strategy(
+            index.keywords, keyword_metrics, cluster_strategy
+        ))
+        neighbours = index.neighbours(min_intersections)
+        rank = {kw_id: position for position, kw_id in enumerate(ranked_ids)}
 
-        while unclustered_keywords:
-            # Take the highest-ranking unclustered keyword as seed
-            seed_keyword = next(kw for kw in sorted_keywords if kw in unclustered_keywords)
-            cluster = [seed_keyword]
-            unclustered_keywords.remove(seed_keyword)
+        clustered = set()
 
-            # Iteratively try to add keywords with progressive thresholds
+        for seed_id in ranked_ids:
+            if seed_id in clustered:
+                continue
+
+            # Take the highest-ranking unclustered keyword as seed
+            cluster = [seed_id]
+            clustered.add(seed_id)
+
+            # Running count of cluster members each candidate shares enough URLs with. Only the
+            # neighbours of a newly added member change, so a candidate's match percentage is
+            # checked in O(1) and candidates without any matching member are never visited.
+            matching_members = {}
+            for kw_id in neighbours[seed_id]:
+                if kw_id not in clustered:
+                    matching_members[kw_id] = 1
+
+            # Iteratively try to add keywords with progressive thresholds. Each pass visits
+            # candidates in rank order; one that gains its first match from a member added
+            # earlier in the same pass is still visited in that pass if it ranks further down.
             added_keywords = True
             while added_keywords:
                 added_keywords = False
-                candidates_to_remove = []
+                pass_queue = [rank[kw_id] for kw_id in matching_members]
+                heapq.heapify(pass_queue)
+                queued = set(matching_members)
 
-                for candidate in list(unclustered_keywords):
-                    candidate_urls = set(keyword_serp_data[candidate][:urls_to_check])
+                while pass_queue:
+                    position = heapq.heappop(pass_queue)
+                    candidate_id = ranked_ids[position]
 
                     # Determine the required match percentage based on potential cluster size
-                    potential_size = len(cluster) + 1
-                    if 2 <= potential_size <= 5:
-                        required_match_percentage = 1.0  # 100% match (strict)
-                    elif 6 <= potential_size <= 10:
-                        required_match_percentage = 0.8  # 80% match
-                    else:
-                        required_match_percentage = 0.6  # 60% match
-
-                    # Count how many cluster members the candidate shares enough URLs with
-                    matching_members = 0
-                    for cluster_member in cluster:
-                        member_urls = set(keyword_serp_data[cluster_member][:urls_to_check])
-                        intersections = len(candidate_urls.intersection(member_urls))
-
-                        if intersections >= min_intersections:
-                            matching_members += 1
+                    required_match_percentage = ClusteringAlgorithms._required_match_percentage(len(cluster) + 1)
 
                     # Check if candidate meets the required match percentage
-                    match_percentage = matching_members / len(cluster)
-                    if match_percentage >= required_match_percentage:
-                        cluster.append(candidate)
-                        candidates_to_remove.append(candidate)
-                        added_keywords = True
+                    match_percentage = matching_members[candidate_id] / len(cluster)
+                    if match_percentage < required_match_percentage:
+                        continue
 
-                # Remove clustered candidates
-                for candidate in candidates_to_remove:
-                    unclustered_keywords.remove(candidate)
+                    cluster.append(candidate_id)
+                    clustered.add(candidate_id)
+                    del matching_members[candidate_id]
+                    added_keywords = True
 
-            clusters.append(cluster)
+                    for kw_id in neighbours[candidate_id]:
+                        if kw_id in clustered:
+                            continue
+                        matching_members[kw_id] = matching_members.get(kw_id, 0) + 1
+                        if kw_id not in queued and rank[kw_id] > position:
+                            heapq.heappush(pass_queue, rank[kw_id])
+                            queued.add(kw_id)
 
-        return clusters
+            yield [index.keywords[kw_id] for kw_id in cluster]
+
+    @staticmethod
+    def _required_match_percentage(potential_size: int) -> float:
+        """
+        Progressive Balanced Strict threshold for a cluster that would reach `potential_size` keywords.
+        """
+        if 2 <= potential_size <= 5:
+            return 1.0  # 100% match (strict)
+        elif 6 <= potential_size <= 10:
+            return 0.8  # 80% match
+        else:
+            return 0.6  # 60% match
 
     @staticmethod
     def _sort_keywords_by_strategy(keywords: List[str], keyword_metrics: dict, strategy: str) -> List[str]:
@@ -213,9 +549,18 @@ class ClusteringAlgorithms:
 
         return sorted(keywords, key=get_sort_key, reverse=True)
 
+SERP_ALGORITHMS = {
+    "default": ClusteringAlgorithms.default_algorithm,
+    "strict": ClusteringAlgorithms.strict_algorithm,
+    "balanced_strict": ClusteringAlgorithms.balanced_strict_algorithm,
+}
+
+# Below this many keywords the process pool start-up costs more than it saves.
+PARALLEL_MIN_KEYWORDS = 50000
+
 def perform_serp_clustering(keyword_serp_data: dict, min_intersections: int = 3, urls_to_check: int = 10,
                            algorithm: str = "balanced_strict", cluster_strategy: str = "volume",
-                           keyword_metrics: dict = None):
+                           keyword_metrics: dict = None, backend: str = "python", max_workers: int = None):
     """
     Enhanced SERP-based keyword clustering with multiple algorithms and cluster strategies.
 
@@ -226,6 +571,10 @@ def perform_serp_clustering(keyword_serp_data: dict, min_intersections: int = 3,
         algorithm (str): Clustering algorithm - "default", "strict", or "balanced_strict"
         cluster_strategy (str): Primary keyword selection strategy - "volume" or "cpc"
         keyword_metrics (dict): Dictionary mapping keywords to their metrics (volume, cpc, etc.)
+        backend (str): Overlap backend - "python" (inverted index) or "sparse" (NumPy/SciPy
+                       matrix product, falls back to "python" when not installed)
+        max_workers (int): Worker processes for clustering independent keyword groups in parallel.
+                           None uses every core for lists of PARALLEL_MIN_KEYWORDS or more, 1 disables it.
 
     Returns:
         list: A list of lists, where each inner list represents a cluster of keywords
@@ -235,53 +584,286 @@ def perform_serp_clustering(keyword_serp_data: dict, min_intersections: int = 3,
         keyword_metrics = {}
 
     # Choose the appropriate algorithm
-    if algorithm == "default":
-        return ClusteringAlgorithms.default_algorithm(
-            keyword_serp_data, keyword_metrics, min_intersections, urls_to_check, cluster_strategy
-        )
-    elif algorithm == "strict":
-        return ClusteringAlgorithms.strict_algorithm(
-            keyword_serp_data, keyword_metrics, min_intersections, urls_to_check, cluster_strategy
-        )
-    elif algorithm == "balanced_strict":
-        return ClusteringAlgorithms.balanced_strict_algorithm(
-            keyword_serp_data, keyword_metrics, min_intersections, urls_to_check, cluster_strategy
+    if algorithm in SERP_ALGORITHMS:
+        # Intern URLs and slice the top results once; the algorithm only works on the index
+        index = SerpOverlapIndex(keyword_serp_data, urls_to_check, backend=backend)
+
+        if max_workers is None:
+            max_workers = (os.cpu_count() or 1) if len(index) >= PARALLEL_MIN_KEYWORDS else 1
+        if max_workers > 1 and min_intersections > 0:
+            return _parallel_serp_clustering(
+                index, keyword_serp_data, keyword_metrics, min_intersections, algorithm, cluster_strategy, max_workers
+            )
+
+        return SERP_ALGORITHMS[algorithm](
+            keyword_serp_data, keyword_metrics, min_intersections, urls_to_check, cluster_strategy, index=index
         )
     else:
         # Fallback to legacy implementation for backward compatibility
         return _legacy_clustering(keyword_serp_data, min_intersections, urls_to_check)
 
-def _legacy_clustering(keyword_serp_data: dict, min_intersections: int = 3, urls_to_check: int = 10):
+def iter_serp_clustering(keyword_serp_data: dict, min_intersections: int = 3, urls_to_check: int = 10,
+                         algorithm: str = "balanced_strict", cluster_strategy: str = "volume",
+                         keyword_metrics: dict = None, backend: str = "python",
+                         max_workers: int = None) -> Iterator[dict]:
     """
-    Legacy clustering implementation for backward compatibility.
-    This is the original "Balanced Strict Algorithm" implementation.
+    Streaming variant of `perform_serp_clustering`: yields every cluster as soon as it is finalized,
+    so callers can write rows out incrementally instead of waiting for the full list.
+    In parallel mode clusters arrive as worker chunks complete rather than in seed rank order;
+    the set of clusters is the same.
+
+    Args:
+        Same as `perform_serp_clustering`.
+
+    Yields:
+        dict: {"cluster": list of keywords, "main_keyword": the keyword picked by `select_main_keyword`,
+               "intersections": dict mapping each keyword to the URLs it shares with the main keyword}
     """
-    # Create a DataFrame for efficient processing.
-    # We slice the URL list for each keyword to the specified `urls_to_check` limit.
-    df = pd.DataFrame(list(keyword_serp_data.items()), columns=['keyword', 'urls'])
-    df['urls'] = df['urls'].apply(lambda x: x[:urls_to_check] if isinstance(x, list) else [])
+    if keyword_metrics is None:
+        keyword_metrics = {}
 
-    # Keep track of which keywords have been assigned to a cluster.
-    unclustered_keywords = list(df['keyword'])
+    index = SerpOverlapIndex(keyword_serp_data, urls_to_check, backend=backend)
+    if algorithm in SERP_ALGORITHMS:
+        if max_workers is None:
+            max_workers = (os.cpu_count() or 1) if len(index) >= PARALLEL_MIN_KEYWORDS else 1
+        if max_workers > 1 and min_intersections > 0:
+            clusters = _iter_parallel_serp_clustering(
+                index, keyword_serp_data, keyword_metrics, min_intersections, algorithm, cluster_strategy, max_workers
+            )
+        else:
+            clusters = getattr(ClusteringAlgorithms, f"iter_{algorithm}_algorithm")(
+                keyword_serp_data, keyword_metrics, min_intersections, urls_to_check, cluster_strategy, index=index
+            )
+    else:
+        clusters = _legacy_clustering(keyword_serp_data, min_intersections, urls_to_check)
+
+    for cluster in clusters:
+        main_keyword = select_main_keyword(cluster, keyword_metrics, cluster_strategy)
+        main_id = index.keyword_ids[main_keyword]
+        yield {
+            "cluster": cluster,
+            "main_keyword": main_keyword,
+            "intersections": {kw: index.intersections(main_id, index.keyword_ids[kw]) for kw in cluster},
+        }
+
+def select_main_keyword(cluster: List[str], keyword_metrics: dict, cluster_strategy: str = "volume") -> str:
+    """
+    Picks the keyword that represents a cluster.
+    "cpc" prefers the highest CPC, then volume; "volume" prefers the highest volume, then the lowest KD.
+
+    Args:
+        cluster (list): Keywords of one cluster
+        keyword_metrics (dict): Dictionary mapping keywords to their metrics (volume, cpc, kd)
+        cluster_strategy (str): "volume" or "cpc"
+
+    Returns:
+        str: The main keyword (the first one in cluster order on ties)
+    """
+    def get_sort_key(keyword):
+        metrics = keyword_metrics.get(keyword, {})
+        if cluster_strategy == "cpc":
+            return (metrics.get('cpc', 0) or 0, metrics.get('volume', 0) or 0)
+        else:  # volume strategy (default)
+            return (metrics.get('volume', 0) or 0, -1 * (metrics.get('kd', 101) or 101))
+
+    return max(cluster, key=get_sort_key)
+
+def _parallel_serp_clustering(index: SerpOverlapIndex, keyword_serp_data: dict, keyword_metrics: dict,
+                              min_intersections: int, algorithm: str, cluster_strategy: str,
+                              max_workers: int) -> List[List[str]]:
+    """
+    Clusters components in parallel (see `_iter_parallel_serp_clustering`) and sorts the merged
+    clusters by the global rank of their seed, which reproduces the sequential greedy order.
+    """
+    clusters = list(_iter_parallel_serp_clustering(
+        index, keyword_serp_data, keyword_metrics, min_intersections, algorithm, cluster_strategy, max_workers
+    ))
+    rank = {kw: position for position, kw in enumerate(
+        ClusteringAlgorithms._sort_keywords_by_strategy(index.keywords, keyword_metrics, cluster_strategy)
+    )}
+    clusters.sort(key=lambda cluster: rank[cluster[0]])
+    return clusters
+
+def _iter_parallel_serp_clustering(index: SerpOverlapIndex, keyword_serp_data: dict, keyword_metrics: dict,
+                                   min_intersections: int, algorithm: str, cluster_strategy: str,
+                                   max_workers: int) -> Iterator[List[str]]:
+    """
+    Clusters the connected components of the `min_intersections` neighbour graph in a process pool,
+    yielding each worker chunk's clusters as soon as it completes. Every algorithm grows a cluster
+    only through neighbours of its members, so each component clusters exactly as it would inside
+    the full run, with its keywords ordered by strategy rank. The neighbour sets computed here to
+    find the components are sent along, so workers do not count overlaps again.
+    """
+    if SPARSE_BACKEND_AVAILABLE and index.backend != "sparse":
+        # Finding the components needs every neighbour set up front, which one matrix product
+        # computes several times faster than the inverted index.
+        index.set_neighbours(min_intersections, index._sparse_neighbours(min_intersections))
+    neighbours = index.neighbours(min_intersections)
+    jobs = []
+    for component in index.connected_components(min_intersections):
+        if len(component) == 1:
+            # Keywords without neighbours always form their own cluster
+            yield [index.keywords[component[0]]]
+            continue
+
+        keywords = [index.keywords[kw_id] for kw_id in component]
+        local_ids = {kw_id: local_id for local_id, kw_id in enumerate(component)}
+        jobs.append((
+            {kw: keyword_serp_data[kw] for kw in keywords},
+            {kw: keyword_metrics[kw] for kw in keywords if kw in keyword_metrics},
+            [frozenset(local_ids[other_id] for other_id in neighbours[kw_id]) for kw_id in component],
+        ))
+
+    # Largest components first, dealt round-robin into a few chunks per worker, so the pool stays
+    # busy without pickling thousands of tiny tasks.
+    jobs.sort(key=lambda job: len(job[0]), reverse=True)
+    chunk_count = max(1, min(len(jobs), max_workers * 4))
+    chunks = [jobs[i::chunk_count] for i in range(chunk_count)]
+    settings = (min_intersections, index.urls_to_check, algorithm, cluster_strategy)
+
+    remaining = set(range(len(chunks)))
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(_cluster_components, chunk, settings): i for i, chunk in enumerate(chunks)}
+            try:
+                for future in as_completed(futures):
+                    chunk_clusters = future.result()
+                    remaining.discard(futures[future])
+                    yield from chunk_clusters
+            finally:
+                # Stop queued chunks when the caller abandons the stream or a worker fails
+                for future in futures:
+                    future.cancel()
+    except (OSError, BrokenProcessPool) as e:
+        print(f"Parallel SERP clustering failed ({e}), clustering the remaining components sequentially.")
+        for i in sorted(remaining):
+            yield from _cluster_components(chunks[i], settings)
+
+def _cluster_components(components: list, settings: tuple) -> List[List[str]]:
+    """Process pool worker: runs one SERP algorithm over each (serp_data, metrics, neighbour sets) component."""
+    min_intersections, urls_to_check, algorithm, cluster_strategy = settings
     clusters = []
+    for component_serp_data, component_metrics, neighbour_sets in components:
+        index = SerpOverlapIndex(component_serp_data, urls_to_check)
+        index.set_neighbours(min_intersections, neighbour_sets)
+        clusters.extend(SERP_ALGORITHMS[algorithm](
+            component_serp_data, component_metrics, min_intersections, urls_to_check, cluster_strategy, index=index
+        ))
+    return clusters
+
+def sweep_serp_clustering(keyword_serp_data: dict, min_intersections_values: Iterable[int] = (2, 3, 4),
+                          urls_to_check_values: Iterable[int] = (10,), algorithms: Iterable[str] = ("balanced_strict",),
+                          cluster_strategies: Iterable[str] = ("volume",), keyword_metrics: dict = None) -> List[dict]:
+    """
+    Runs SERP clustering over a grid of parameters while computing URL overlaps only once per
+    `urls_to_check` value (see `PositionalOverlapProfile`); every min_intersections threshold
+    derives its neighbour sets from those counts. Without NumPy/SciPy each setting computes
+    its own overlaps.
 
-    # Loop as long as there are keywords left to be clustered.
-    while unclustered_keywords:
-        # Pop the first keyword to act as the seed for a new cluster.
-        seed_keyword = unclustered_keywords.pop(0)
-        new_cluster = [seed_keyword]
+    Args:
+        keyword_serp_data (dict): Dictionary mapping keywords to their SERP URLs
+        min_intersections_values (iterable): Minimum shared URL counts to try
+        urls_to_check_values (iterable): Numbers of top URLs to try
+        algorithms (iterable): Any of "default", "strict", "balanced_strict"
+        cluster_strategies (iterable): Any of "volume", "cpc"
+        keyword_metrics (dict): Dictionary mapping keywords to their metrics (volume, cpc, etc.)
 
-        # Get the set of URLs for the seed keyword for fast intersection calculation.
-        seed_urls = set(df.loc[df['keyword'] == seed_keyword, 'urls'].iloc[0])
+    Returns:
+        list: One dict per setting with the parameters, the clusters and their statistics
+    """
+    if keyword_metrics is None:
+        keyword_metrics = {}
+    # The grid is iterated once per setting, so single-use iterables are read up front.
+    algorithms = list(algorithms)
+    cluster_strategies = list(cluster_strategies)
+
+    unknown = [algorithm for algorithm in algorithms if algorithm not in SERP_ALGORITHMS]
+    if unknown:
+        raise ValueError(f"Unknown SERP clustering algorithm(s) {unknown}. Expected one of {list(SERP_ALGORITHMS)}.")
+
+    urls_to_check_values = sorted(set(urls_to_check_values))
+    min_intersections_values = sorted(set(min_intersections_values))
+    if SPARSE_BACKEND_AVAILABLE:
+        profile = PositionalOverlapProfile(keyword_serp_data, max(urls_to_check_values))
+    else:
+        print("NumPy/SciPy not available, computing URL overlaps separately for every setting.")
+        profile = None
+
+    results = []
+    for urls_to_check in urls_to_check_values:
+        index = SerpOverlapIndex(keyword_serp_data, urls_to_check)
+        for min_intersections in min_intersections_values:
+            if profile is not None:
+                index.set_neighbours(min_intersections, profile.neighbour_sets(urls_to_check, min_intersections))
+
+            for algorithm in algorithms:
+                for cluster_strategy in cluster_strategies:
+                    clusters = SERP_ALGORITHMS[algorithm](
+                        keyword_serp_data, keyword_metrics, min_intersections, urls_to_check, cluster_strategy,
+                        index=index
+                    )
+                    results.append({
+                        "algorithm": algorithm,
+                        "cluster_strategy": cluster_strategy,
+                        "urls_to_check": urls_to_check,
+                        "min_intersections": min_intersections,
+                        "clusters": clusters,
+                        "stats": cluster_statistics(clusters),
+                    })
+
+    return results
+
+def cluster_statistics(clusters: List[List[str]]) -> dict:
+    """
+    Summarizes a clustering result.
 
-        # Create a copy of the list to iterate over, as we will modify the original list.
-        candidates = unclustered_keywords[:]
+    Args:
+        clusters (list): A list of lists, where each inner list represents a cluster of keywords
 
-        for candidate_keyword in candidates:
-            candidate_urls = set(df.loc[df['keyword'] == candidate_keyword, 'urls'].iloc[0])
+    Returns:
+        dict: Cluster count, keyword count, singleton/6+ cluster counts, largest and average size
+    """
+    sizes = [len(cluster) for cluster in clusters]
+    return {
+        "cluster_count": len(sizes),
+        "keyword_count": sum(sizes),
+        "single_keyword_clusters": sum(1 for size in sizes if size == 1),
+        "clusters_6_plus": sum(1 for size in sizes if size >= 6),
+        "largest_cluster": max(sizes, default=0),
+        "average_cluster_size": sum(sizes) / len(sizes) if sizes else 0,
+    }
 
+def _legacy_clustering(keyword_serp_data: dict, min_intersections: int = 3, urls_to_check: int = 10):
+    """
+    Legacy clustering implementation for backward compatibility.
+    This is the original "Balanced Strict Algorithm" implementation.
+    """
+    # Slice the URL list for each keyword to the specified `urls_to_check` limit once, and keep
+    # an O(1) keyword id -> URL id set mapping plus the inverted URL index for candidate lookup.
+    index = SerpOverlapIndex(
+        {kw: urls if isinstance(urls, list) else [] for kw, urls in keyword_serp_data.items()},
+        urls_to_check
+    )
+
+    # Keep track of which keywords have been assigned to a cluster, as an insertion-ordered set.
+    unclustered_ids = dict.fromkeys(range(len(index)))
+    clusters = []
+
+    # Loop as long as there are keywords left to be clustered.
+    while unclustered_ids:
+        # Take the first keyword to act as the seed for a new cluster.
+        seed_id = next(iter(unclustered_ids))
+        del unclustered_ids[seed_id]
+        new_cluster = [seed_id]
+
+        # Every threshold below needs at least one shared URL, so only keywords overlapping
+        # the seed can join. Visit them in input order, like the original full scan.
+        overlap_counts = index.overlap_counts(seed_id)
+        candidates = sorted(kw_id for kw_id in overlap_counts if kw_id in unclustered_ids)
+
+        for candidate_id in candidates:
             # Calculate how many URLs the candidate shares with the seed.
-            intersections = len(seed_urls.intersection(candidate_urls))
+            intersections = overlap_counts[candidate_id]
 
             # --- Two-Stage Filtering ---
             # 1. First, check if the candidate meets the basic minimum intersection requirement.
@@ -301,10 +883,10 @@ def _legacy_clustering(keyword_serp_data: dict, min_intersections: int = 3, urls
 
                 # The candidate is only added if it meets this dynamic, stricter threshold.
                 if intersections >= threshold:
-                    new_cluster.append(candidate_keyword)
-                    unclustered_keywords.remove(candidate_keyword)
+                    new_cluster.append(candidate_id)
+                    del unclustered_ids[candidate_id]
 
         # Once all candidates have been checked against the seed, the cluster is complete.
-        clusters.append(new_cluster)
+        clusters.append([index.keywords[kw_id] for kw_id in new_cluster])
 
-    return clusters
\ No newline at end of file
+    return clusters
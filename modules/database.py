@@ -2,52 +2,439 @@
 
 import sqlite3
 from datetime import datetime, timedelta
-import json
 import threading
+import time
+import atexit
+import heapq
+import weakref
+from contextlib import contextmanager
 
-# Use thread-local storage to ensure each thread gets its own connection.
-thread_local = threading.local()
+from config import (
+    CACHE_DB_PATH, SQLITE_PRAGMAS, SQLITE_POOL_SIZE, SQLITE_POOL_TIMEOUT,
+    CACHE_COMPRESSION, CACHE_ZLIB_LEVEL, CACHE_ZSTD_LEVEL,
+    CACHE_MEMORY_MAX_BYTES, CACHE_MEMORY_TTL_SECONDS,
+    CACHE_BACKEND, CACHE_LMDB_PATH, CACHE_LMDB_MAP_SIZE_MB,
+)
+from modules.cache_backends import (
+    CacheRecord, SQLiteCacheBackend, create_cache_backend, record_from_row,
+    RECORD_COLUMNS, SQLITE_MAX_VARIABLES, key_columns, prefix_range,
+)
+from modules.cache_codec import PayloadCodec, PayloadDecodeError, ZSTD_AVAILABLE
+from modules.memory_cache import PayloadLRUCache
+from modules.cache_projections import (
+    parse_cache_key, build_cache_key, extract_serp_urls, extract_keyword_metrics,
+)
 
-def get_db_connection(db_path="data/seo_app_cache.db"):
+# Columns added to the original (key, response_json, timestamp) cache table, in order.
+CACHE_TABLE_COLUMNS = {
+    "payload": "BLOB",
+    "format_version": "INTEGER NOT NULL DEFAULT 0",
+    # Parsed from the key, so rows can be filtered by scope without LIKE scans over keys.
+    "data_type": "TEXT",
+    "keyword": "TEXT",
+    "location_code": "INTEGER",
+    "language_code": "TEXT",
+    "device": "TEXT",
+    # Last time the entry was written or read, flushed in batches; drives LRU eviction.
+    "last_access": "TEXT",
+}
+
+# Pending read timestamps are written once this many keys have been read since the last flush.
+ACCESS_FLUSH_THRESHOLD = 10000
+
+# Bit flags in `keyword_metrics.sources` recording which responses a row was projected from.
+METRIC_SOURCES = {"volume": 1, "kd": 2, "intent": 4}
+
+class ConnectionPool:
+    """
+    A bounded pool of SQLite connections shared by every thread.
+
+    Each connection is opened with the configured pragmas (WAL journal, synchronous level,
+    page cache, mmap and busy timeout). Idle connections are health-checked before they are
+    handed out and replaced if they no longer work. At most `max_connections` are open at
+    once; callers beyond that wait up to `timeout` seconds for one to be returned.
+    """
+
+    def __init__(self, db_path=CACHE_DB_PATH, max_connections=SQLITE_POOL_SIZE,
+                 pragmas=None, timeout=SQLITE_POOL_TIMEOUT):
+        self.db_path = db_path
+        self.max_connections = max(1, max_connections)
+        self.pragmas = {**SQLITE_PRAGMAS, **(pragmas or {})}
+        self.timeout = timeout
+        self._idle = []
+        self._open_count = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        _open_pools.add(self)
+
+    def _connect(self):
+        """Opens a new connection and applies the pool's pragmas."""
+        busy_timeout_ms = self.pragmas.get("busy_timeout", 5000)
+        # The check_same_thread=False is crucial: connections move between threads via the pool.
+        conn = sqlite3.connect(self.db_path, timeout=busy_timeout_ms / 1000, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        return conn
+
+    @staticmethod
+    def _is_healthy(conn):
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _acquire(self):
+        deadline = time.monotonic() + self.timeout
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("The connection pool has been closed.")
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._open_count < self.max_connections:
+                    self._open_count += 1
+                    conn = None # Reserve the slot; the connection is opened outside the lock.
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise sqlite3.OperationalError(
+                        f"No cache connection became free within {self.timeout} seconds."
+                    )
+                self._condition.wait(remaining)
+
+        try:
+            if conn is not None and not self._is_healthy(conn):
+                conn.close()
+                conn = None
+            if conn is None:
+                conn = self._connect()
+            return conn
+        except sqlite3.Error:
+            with self._condition:
+                self._open_count -= 1
+                self._condition.notify()
+            raise
+
+    def _release(self, conn):
+        discard = False
+        if conn.in_transaction:
+            try:
+                conn.rollback() # Never hand out a connection with a half-finished transaction.
+            except sqlite3.Error:
+                discard = True
+        with self._condition:
+            if discard or self._closed:
+                conn.close()
+                self._open_count -= 1
+            else:
+                self._idle.append(conn)
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrows a connection for the duration of a `with` block:
+
+            with pool.connection() as conn:
+                conn.execute(...)
+
+        The connection goes back to the pool afterwards; uncommitted work is rolled back.
+        """
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def close(self):
+        """Closes idle connections now and borrowed ones as they are returned."""
+        with self._condition:
+            self._closed = True
+            for conn in self._idle:
+                conn.close()
+            self._open_count -= len(self._idle)
+            self._idle.clear()
+            self._condition.notify_all()
+        _open_pools.discard(self)
+
+# Pools still open at interpreter shutdown are closed so WAL files are checkpointed cleanly.
+_open_pools = weakref.WeakSet()
+
+@atexit.register
+def close_all_pools():
+    """Closes every connection pool that is still open."""
+    for pool in list(_open_pools):
+        pool.close()
+
+_default_pools = {}
+_default_pools_lock = threading.Lock()
+
+def get_connection_pool(db_path=CACHE_DB_PATH):
+    """Returns the shared connection pool for `db_path`, creating it on first use."""
+    with _default_pools_lock:
+        pool = _default_pools.get(db_path)
+        if pool is None or pool._closed:
+            pool = _default_pools[db_path] = ConnectionPool(db_path)
+        return pool
+
+def get_db_connection(db_path=CACHE_DB_PATH):
     """
-    Gets a database connection from thread-local storage or creates a new one.
-    This ensures that each thread has its own separate, safe connection.
+    Borrows a connection from the shared pool for `db_path`.
+    Use it as a context manager (`with get_db_connection() as conn:`) so the
+    connection is returned to the pool when the block ends.
     """
-    if not hasattr(thread_local, "conn"):
-        # The check_same_thread=False is crucial for Streamlit's architecture.
-        thread_local.conn = sqlite3.connect(db_path, check_same_thread=False)
-        thread_local.conn.row_factory = sqlite3.Row
-    return thread_local.conn
+    return get_connection_pool(db_path).connection()
+
+class CacheWriteBatch:
+    """Collects (key, data) pairs for `DatabaseManager.write_batch`."""
+
+    def __init__(self):
+        self.items = {}
+
+    def add(self, key, data):
+        """Queues a record; adding the same key again replaces the queued data."""
+        self.items[key] = data
+
+    def __len__(self):
+        return len(self.items)
 
 class DatabaseManager:
     """
-    Manages all interactions with the local SQLite database with thread-safety.
+    Manages all interactions with the local cache with thread-safety.
     Includes logic for cache age validation and clearing the cache.
+    Responses are stored compressed (see `modules.cache_codec`) and decoded transparently.
+
+    Cached responses live in a `CacheBackend` (see `modules.cache_backends`): the SQLite `cache`
+    table by default, or LMDB. The projection tables, compression dictionaries and SQL-based
+    cache queries always use the SQLite database; with another backend, queries that have
+    no SQL to run on (scopes, stale entries, statistics) scan the backend instead.
     """
 
-    def __init__(self, db_path="data/seo_app_cache.db"):
+    def __init__(self, db_path=CACHE_DB_PATH, pool=None, codec=None, memory_cache=None, backend=None):
         """
         Initializes the DatabaseManager.
-        The connection itself is managed on a per-thread basis.
+        Connections are borrowed from a shared `ConnectionPool`, one per operation.
+        Decoded payloads are kept in an in-process `PayloadLRUCache` for repeated reads.
+        The cache backend defaults to the one chosen by `CACHE_BACKEND`.
         """
         self.db_path = db_path
+        self.pool = pool or get_connection_pool(db_path)
+        self.backend = backend or create_cache_backend(
+            CACHE_BACKEND, self.pool, CACHE_LMDB_PATH, CACHE_LMDB_MAP_SIZE_MB
+        )
+        # Records in the SQLite `cache` table can be queried with SQL; other backends are scanned.
+        self._sql_backend = isinstance(self.backend, SQLiteCacheBackend)
+        self.codec = codec or PayloadCodec(CACHE_COMPRESSION, CACHE_ZLIB_LEVEL, CACHE_ZSTD_LEVEL)
+        self.memory_cache = memory_cache or PayloadLRUCache(CACHE_MEMORY_MAX_BYTES, CACHE_MEMORY_TTL_SECONDS)
+        self._pending_access = set()
+        self._access_lock = threading.Lock()
         self.create_table()
+        self._load_dictionaries()
+
+    def close(self):
+        """Writes pending access times and closes the manager's backend and connection pool."""
+        self.flush_access_times()
+        self.backend.close()
+        self.pool.close()
+
+    def _record_access(self, keys):
+        """Notes that entries were read; the times are written in batches by `flush_access_times`."""
+        if not self._sql_backend:
+            return # Only the SQLite backend tracks access times.
+        with self._access_lock:
+            self._pending_access.update(keys)
+            should_flush = len(self._pending_access) >= ACCESS_FLUSH_THRESHOLD
+        if should_flush:
+            self.flush_access_times()
+
+    def flush_access_times(self):
+        """Writes the last-access time of every entry read since the previous flush."""
+        with self._access_lock:
+            keys, self._pending_access = self._pending_access, set()
+        if not keys:
+            return
+        current_timestamp = datetime.utcnow().isoformat()
+        try:
+            with self.pool.connection() as conn:
+                with conn:
+                    conn.executemany(
+                        "UPDATE cache SET last_access = ? WHERE key = ?",
+                        ((current_timestamp, key) for key in keys)
+                    )
+        except sqlite3.Error as e:
+            print(f"Error recording cache access times: {e}")
 
     def create_table(self):
-        """Creates the 'cache' table if it does not already exist."""
-        try:
-            conn = get_db_connection(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS cache (
-                    key TEXT PRIMARY KEY,
-                    response_json TEXT NOT NULL,
-                    timestamp TEXT NOT NULL
-                )
-            """)
-            conn.commit()
+        """
+        Creates the 'cache' table if it does not already exist, and adds the columns of
+        `CACHE_TABLE_COLUMNS` to tables created by older versions. Rows that predate the
+        structured key columns are backfilled from their keys.
+        """
+        key_columns_added = last_access_added = False
+        try:
+            with self.pool.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS cache (
+                        key TEXT PRIMARY KEY,
+                        response_json TEXT NOT NULL,
+                        timestamp TEXT NOT NULL
+                    )
+                """)
+                columns = {row['name'] for row in cursor.execute("PRAGMA table_info(cache)")}
+                for name, definition in CACHE_TABLE_COLUMNS.items():
+                    if name not in columns:
+                        cursor.execute(f"ALTER TABLE cache ADD COLUMN {name} {definition}")
+                key_columns_added = 'data_type' not in columns
+                last_access_added = 'last_access' not in columns
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_cache_scope
+                    ON cache (data_type, location_code, language_code, device, keyword)
+                """)
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_cache_type_timestamp ON cache (data_type, timestamp)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_cache_timestamp ON cache (timestamp)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_cache_last_access ON cache (last_access)")
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS cache_dictionaries (
+                        dict_id INTEGER PRIMARY KEY,
+                        dictionary BLOB NOT NULL,
+                        created TEXT NOT NULL
+                    )
+                """)
+                # Projections of the cached responses, kept in sync by every cache write.
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS urls (
+                        url_id INTEGER PRIMARY KEY,
+                        url TEXT NOT NULL UNIQUE
+                    )
+                """)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS serp_urls (
+                        keyword TEXT NOT NULL,
+                        location_code INTEGER NOT NULL,
+                        language_code TEXT NOT NULL,
+                        device TEXT NOT NULL,
+                        rank INTEGER NOT NULL,
+                        url_id INTEGER NOT NULL,
+                        PRIMARY KEY (location_code, language_code, device, keyword, rank)
+                    ) WITHOUT ROWID
+                """)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS keyword_metrics (
+                        keyword TEXT NOT NULL,
+                        location_code INTEGER NOT NULL,
+                        language_code TEXT NOT NULL,
+                        search_volume INTEGER,
+                        cpc REAL,
+                        keyword_difficulty INTEGER,
+                        intent TEXT,
+                        sources INTEGER NOT NULL DEFAULT 0, -- METRIC_SOURCES bits of the projected responses
+                        PRIMARY KEY (location_code, language_code, keyword)
+                    ) WITHOUT ROWID
+                """)
+                conn.commit()
         except sqlite3.Error as e:
             print(f"Error creating table: {e}")
+            return
+
+        if key_columns_added:
+            self.backfill_key_columns()
+        if last_access_added:
+            self._backfill_last_access()
+
+    def _backfill_last_access(self, batch_size=5000):
+        """Starts rows that predate access tracking with their write time as last access."""
+        try:
+            with self.pool.connection() as conn:
+                max_rowid = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM cache").fetchone()[0]
+                for start in range(0, max_rowid, batch_size):
+                    with conn:
+                        conn.execute("""
+                            UPDATE cache SET last_access = timestamp
+                            WHERE rowid > ? AND rowid <= ? AND last_access IS NULL
+                        """, (start, start + batch_size))
+        except sqlite3.Error as e:
+            print(f"Error backfilling cache access times: {e}")
+
+    def backfill_key_columns(self, batch_size=5000):
+        """
+        Fills data_type, keyword, location_code, language_code and device of rows written before
+        those columns existed, in small transactions. Keys that do not follow the standard
+        layout keep NULLs. Returns the number of rows updated.
+        """
+        last_rowid = 0
+        updated = 0
+        try:
+            while True:
+                with self.pool.connection() as conn:
+                    rows = conn.execute("""
+                        SELECT rowid, key FROM cache
+                        WHERE rowid > ? AND data_type IS NULL
+                        ORDER BY rowid LIMIT ?
+                    """, (last_rowid, batch_size)).fetchall()
+                    if not rows:
+                        break
+                    last_rowid = rows[-1]['rowid']
+                    updates = [
+                        (*columns, row['rowid'])
+                        for row in rows
+                        for columns in [key_columns(row['key'])]
+                        if columns[0] is not None
+                    ]
+                    with conn:
+                        conn.executemany("""
+                            UPDATE cache SET data_type = ?, keyword = ?, location_code = ?, language_code = ?, device = ?
+                            WHERE rowid = ?
+                        """, updates)
+                updated += len(updates)
+        except sqlite3.Error as e:
+            print(f"Error backfilling cache key columns: {e}")
+        return updated
+
+    def _load_dictionaries(self):
+        """Registers stored zstd dictionaries; the newest one is used for new zstd writes."""
+        if not ZSTD_AVAILABLE:
+            return
+        try:
+            with self.pool.connection() as conn:
+                rows = conn.execute("SELECT dictionary FROM cache_dictionaries ORDER BY created").fetchall()
+        except sqlite3.Error as e:
+            print(f"Error loading compression dictionaries: {e}")
+            return
+        for row in rows:
+            if self.codec.compression == "zstd":
+                self.codec.set_dictionary(row['dictionary'])
+            else:
+                self.codec.add_dictionary(row['dictionary'])
+
+    def _decode_record(self, record):
+        return self.codec.decode(record.response_json, record.payload, record.format_version)
+
+    def _decode_and_remember(self, record, generation):
+        """Decodes a CacheRecord and keeps the result in the memory cache."""
+        data, size = self.codec.decode_with_size(record.response_json, record.payload, record.format_version)
+        self.memory_cache.put(record.key, data, size, record.timestamp, generation)
+        return data
+
+    @staticmethod
+    def _min_timestamp(max_age_days):
+        """The oldest write time still fresh for `max_age_days`, as an ISO string (None if age does not matter)."""
+        if max_age_days is None:
+            return None
+        return (datetime.utcnow() - timedelta(days=max_age_days)).isoformat()
+
+    def _scan_all(self, prefix="", batch_size=1000):
+        """Yields every backend record starting with `prefix`, paging through the backend in key order."""
+        after_key = None
+        while True:
+            records = self.backend.scan(prefix, after_key=after_key, limit=batch_size)
+            yield from records
+            if len(records) < batch_size:
+                return
+            after_key = records[-1].key
 
     def check_cache(self, key, max_age_days=None):
         """
@@ -64,51 +451,858 @@ class DatabaseManager:
         if max_age_days == 0:
             return None # Always fetch new data if duration is 0 days.
 
+        cached = self.memory_cache.get(key, max_age_days)
+        if cached is not None:
+            self._record_access([key])
+            return cached
+
+        generation = self.memory_cache.generation
         try:
-            conn = get_db_connection(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT response_json, timestamp FROM cache WHERE key = ?", (key,))
-            row = cursor.fetchone()
+            record = self.backend.get_many([key], self._min_timestamp(max_age_days)).get(key)
+            if record is None:
+                return None # No entry found, or it is stale.
 
-            if row:
-                if max_age_days is not None:
-                    timestamp = datetime.fromisoformat(row['timestamp'])
-                    if datetime.utcnow() - timestamp > timedelta(days=max_age_days):
-                        return None # Cache is stale, return None.
-                
-                # Cache is not stale or age is not a factor.
-                return json.loads(row['response_json'])
-            else:
-                return None # No entry found.
-        except (sqlite3.Error, json.JSONDecodeError, TypeError) as e:
+            data = self._decode_and_remember(record, generation)
+            self._record_access([key])
+            return data
+        except (*self.backend.errors, PayloadDecodeError, TypeError) as e:
             print(f"Error checking cache for key '{key}': {e}")
             return None
 
+    def check_cache_many(self, keys, max_age_days=None):
+        """
+        Checks the cache for many keys at once, with the same age semantics as `check_cache`.
+        Keys are resolved in one backend call (chunked `IN (...)` queries for SQLite).
+
+        Args:
+            keys (iterable): The cache keys to look up.
+            max_age_days (int, optional): See `check_cache`.
+        Returns:
+            dict: Maps every key with a valid, non-stale entry to its parsed JSON data.
+                  Missing or stale keys are simply absent.
+        """
+        if max_age_days == 0:
+            return {} # Always fetch new data if duration is 0 days.
+
+        results = {}
+        keys_to_load = []
+        for key in dict.fromkeys(keys):
+            cached = self.memory_cache.get(key, max_age_days)
+            if cached is not None:
+                results[key] = cached
+            else:
+                keys_to_load.append(key)
+        if not keys_to_load:
+            self._record_access(results)
+            return results
+        keys = keys_to_load
+
+        generation = self.memory_cache.generation
+        try:
+            records = self.backend.get_many(keys, self._min_timestamp(max_age_days))
+        except self.backend.errors as e:
+            print(f"Error checking cache for {len(keys)} keys: {e}")
+            records = {}
+        for key, record in records.items():
+            try:
+                results[key] = self._decode_and_remember(record, generation)
+            except (PayloadDecodeError, TypeError) as e:
+                print(f"Error decoding cache entry for key '{key}': {e}")
+        self._record_access(results)
+        return results
+
+    @staticmethod
+    def _scope_filter(data_type=None, location_code=None, language_code=None, device=None, keyword=None):
+        """Builds a WHERE clause over the structured key columns; None means 'any'."""
+        scope = {
+            "data_type": data_type,
+            "location_code": location_code,
+            "language_code": language_code,
+            "device": device,
+            "keyword": keyword,
+        }
+        conditions = [f"{column} = ?" for column, value in scope.items() if value is not None]
+        params = [value for value in scope.values() if value is not None]
+        return conditions, params
+
+    def _scan_scope(self, data_type=None, location_code=None, language_code=None, device=None, keyword=None):
+        """Yields the backend records in a scope, for backends without the structured key columns."""
+        prefix = ""
+        if data_type is not None:
+            prefix = f"{data_type}|" if keyword is None else f"{data_type}|{keyword}|"
+        scope = {
+            "data_type": data_type,
+            "location_code": location_code,
+            "language_code": language_code,
+            "device": device,
+            "keyword": keyword,
+        }
+        wanted = {column: value for column, value in scope.items() if value is not None}
+        for record in self._scan_all(prefix):
+            if wanted:
+                parts = parse_cache_key(record.key)
+                if parts is None or any(parts[column] != value for column, value in wanted.items()):
+                    continue
+            yield record
+
+    def query_cache(self, data_type, location_code=None, language_code=None, device=None,
+                    keyword=None, max_age_days=None, limit=None):
+        """
+        Returns every cached response in a scope, e.g. all SERPs for one location and language.
+        Filtering runs on the indexed key columns rather than on the key text.
+
+        Args:
+            data_type (str): 'serp', 'volume', 'kd' or 'intent'.
+            location_code, language_code, device, keyword: Optional filters; None matches anything.
+            max_age_days (int, optional): See `check_cache`.
+            limit (int, optional): Maximum number of entries to return.
+        Returns:
+            dict: Maps cache keys to their parsed JSON data.
+        """
+        if max_age_days == 0:
+            return {}
+        if not self._sql_backend:
+            return self._query_cache_by_scan(data_type, location_code, language_code, device, keyword,
+                                             max_age_days, limit)
+        conditions, params = self._scope_filter(data_type, location_code, language_code, device, keyword)
+        if max_age_days is not None:
+            conditions.append("timestamp >= ?")
+            params.append((datetime.utcnow() - timedelta(days=max_age_days)).isoformat())
+        sql = f"SELECT {RECORD_COLUMNS} FROM cache WHERE {' AND '.join(conditions)}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        results = {}
+        try:
+            with self.pool.connection() as conn:
+                for row in conn.execute(sql, params):
+                    try:
+                        results[row['key']] = self._decode_record(record_from_row(row))
+                    except (PayloadDecodeError, TypeError) as e:
+                        print(f"Error decoding cache entry for key '{row['key']}': {e}")
+        except sqlite3.Error as e:
+            print(f"Error querying cache for {data_type}: {e}")
+        self._record_access(results)
+        return results
+
+    def _query_cache_by_scan(self, data_type, location_code, language_code, device, keyword, max_age_days, limit):
+        min_timestamp = self._min_timestamp(max_age_days)
+        results = {}
+        try:
+            for record in self._scan_scope(data_type, location_code, language_code, device, keyword):
+                if limit is not None and len(results) >= limit:
+                    break
+                if min_timestamp is not None and record.timestamp < min_timestamp:
+                    continue
+                try:
+                    results[record.key] = self._decode_record(record)
+                except (PayloadDecodeError, TypeError) as e:
+                    print(f"Error decoding cache entry for key '{record.key}': {e}")
+        except self.backend.errors as e:
+            print(f"Error querying cache for {data_type}: {e}")
+        return results
+
+    def find_stale_keys(self, max_age_days, data_type=None, location_code=None, language_code=None,
+                        device=None, limit=None):
+        """
+        Lists the keys of entries older than `max_age_days`, optionally within a scope
+        (e.g. all stale volume rows). Uses the timestamp indexes.
+
+        Returns:
+            list: Cache keys, oldest first.
+        """
+        if not self._sql_backend:
+            cutoff = self._min_timestamp(max_age_days)
+            try:
+                stale = [
+                    record for record in self._scan_scope(data_type, location_code, language_code, device)
+                    if record.timestamp < cutoff
+                ]
+            except self.backend.errors as e:
+                print(f"Error finding stale cache keys: {e}")
+                return []
+            stale.sort(key=lambda record: record.timestamp)
+            return [record.key for record in stale[:limit]]
+        conditions, params = self._scope_filter(data_type, location_code, language_code, device)
+        conditions.append("timestamp < ?")
+        params.append((datetime.utcnow() - timedelta(days=max_age_days)).isoformat())
+        sql = f"SELECT key FROM cache WHERE {' AND '.join(conditions)} ORDER BY timestamp"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        try:
+            with self.pool.connection() as conn:
+                return [row['key'] for row in conn.execute(sql, params)]
+        except sqlite3.Error as e:
+            print(f"Error finding stale cache keys: {e}")
+            return []
+
+    def find_least_recently_used_keys(self, limit, data_type=None):
+        """
+        Lists up to `limit` keys, least recently read or written first. Uses the last-access index.
+        Backends that do not track reads return the least recently written keys instead.
+        """
+        if not self._sql_backend:
+            try:
+                return [
+                    record.key for record in
+                    heapq.nsmallest(limit, self._scan_scope(data_type), key=lambda record: record.timestamp)
+                ]
+            except self.backend.errors as e:
+                print(f"Error finding least recently used cache keys: {e}")
+                return []
+        sql = "SELECT key FROM cache"
+        params = []
+        if data_type is not None:
+            sql += " WHERE data_type = ?"
+            params.append(data_type)
+        sql += " ORDER BY last_access LIMIT ?"
+        params.append(limit)
+        try:
+            with self.pool.connection() as conn:
+                return [row['key'] for row in conn.execute(sql, params)]
+        except sqlite3.Error as e:
+            print(f"Error finding least recently used cache keys: {e}")
+            return []
+
+    def iter_least_recently_used_batches(self, batch_size, data_type=None):
+        """
+        Yields batches of up to `batch_size` keys, least recently used first, for eviction loops
+        that delete each batch before asking for the next. With SQLite every batch is a fresh
+        query on the last-access index; other backends rank all keys by write time in a single
+        scan per call instead of rescanning the store for every batch.
+        """
+        if self._sql_backend:
+            while True:
+                keys = self.find_least_recently_used_keys(batch_size, data_type)
+                if not keys:
+                    return
+                yield keys
+        try:
+            ranked = sorted((record.timestamp, record.key) for record in self._scan_scope(data_type))
+        except self.backend.errors as e:
+            print(f"Error finding least recently used cache keys: {e}")
+            return
+        for i in range(0, len(ranked), batch_size):
+            yield [key for _, key in ranked[i:i + batch_size]]
+
+    def delete_cache_keys(self, keys):
+        """
+        Deletes entries from the backend, then their projections.
+        Keep batches small (a few hundred keys) so concurrent writers are not held up.
+
+        Returns:
+            int: The number of cache entries deleted (0 if the deletion failed).
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return 0
+        serp_scopes = []
+        metric_scopes = []
+        for key in keys:
+            parts = parse_cache_key(key)
+            if parts is None:
+                continue
+            scope = (parts['location_code'], parts['language_code'])
+            if parts['data_type'] == "serp":
+                serp_scopes.append((*scope, parts['device'], parts['keyword']))
+            else:
+                metric_scopes.append((METRIC_SOURCES[parts['data_type']], *scope, parts['keyword']))
+
+        try:
+            deleted = self.backend.delete(keys)
+            with self.pool.connection() as conn:
+                with conn:
+                    conn.executemany("""
+                        DELETE FROM serp_urls
+                        WHERE location_code = ? AND language_code = ? AND device = ? AND keyword = ?
+                    """, serp_scopes)
+                    # Only the deleted response's share of a metrics row goes; the row goes with its last source.
+                    conn.executemany("""
+                        UPDATE keyword_metrics SET sources = sources & ~?1,
+                            search_volume = CASE WHEN ?1 = 1 THEN NULL ELSE search_volume END,
+                            cpc = CASE WHEN ?1 = 1 THEN NULL ELSE cpc END,
+                            keyword_difficulty = CASE WHEN ?1 = 2 THEN NULL ELSE keyword_difficulty END,
+                            intent = CASE WHEN ?1 = 4 THEN NULL ELSE intent END
+                        WHERE location_code = ?2 AND language_code = ?3 AND keyword = ?4
+                    """, metric_scopes)
+                    if metric_scopes:
+                        conn.execute("DELETE FROM keyword_metrics WHERE sources = 0")
+        except (*self.backend.errors, sqlite3.Error) as e:
+            print(f"Error deleting {len(keys)} cache keys: {e}")
+            return 0
+        finally:
+            self.memory_cache.invalidate(keys)
+            with self._access_lock:
+                self._pending_access.difference_update(keys)
+        return deleted
+
+    def database_size_bytes(self):
+        """
+        Returns the bytes used by the cache: the SQLite file, not counting free pages awaiting
+        reuse, plus the backend's files when responses are stored elsewhere.
+        """
+        sqlite_backend = self.backend if self._sql_backend else SQLiteCacheBackend(self.pool)
+        try:
+            size = sqlite_backend.size_bytes()
+            if not self._sql_backend:
+                size += self.backend.size_bytes()
+            return size
+        except (*self.backend.errors, sqlite3.Error) as e:
+            print(f"Error reading database size: {e}")
+            return 0
+
+    AUTO_VACUUM_MODES = {0: "none", 1: "full", 2: "incremental"}
+
+    def auto_vacuum_mode(self):
+        """Returns the database file's auto-vacuum mode: 'none', 'full' or 'incremental'."""
+        try:
+            with self.pool.connection() as conn:
+                return self.AUTO_VACUUM_MODES.get(conn.execute("PRAGMA auto_vacuum").fetchone()[0], "none")
+        except sqlite3.Error as e:
+            print(f"Error reading auto-vacuum mode: {e}")
+            return None
+
+    def enable_incremental_vacuum(self):
+        """
+        Converts an existing database file to incremental auto-vacuum, so `compact` can shrink it.
+        The `auto_vacuum` pragma only applies to new files; older ones are converted by rewriting
+        the whole file with VACUUM. That blocks every other writer until it finishes and needs free
+        disk space of about the database's size, so it is a one-time manual action.
+
+        Returns:
+            bool: True if the database uses incremental auto-vacuum afterwards.
+        """
+        try:
+            with self.pool.connection() as conn:
+                # executescript commits any open transaction first; VACUUM cannot run inside one.
+                conn.executescript("PRAGMA auto_vacuum=INCREMENTAL; VACUUM;")
+                # In WAL mode the rewritten pages sit in the log; copy them back and truncate it.
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                return conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        except sqlite3.Error as e:
+            print(f"Error converting the cache database to incremental auto-vacuum: {e}")
+            return False
+
+    def compact(self, max_pages=2000):
+        """
+        Returns free space to the file system without blocking readers: releases up to
+        `max_pages` free pages when the database uses incremental auto-vacuum, and runs a
+        passive WAL checkpoint so the write-ahead log can be reused. Files created before
+        auto-vacuum was configured never shrink until `enable_incremental_vacuum` converts them.
+
+        Returns:
+            dict: 'pages_released' and the checkpoint's 'wal_pages'/'checkpointed_pages'.
+        """
+        report = {"pages_released": 0, "wal_pages": 0, "checkpointed_pages": 0}
+        try:
+            with self.pool.connection() as conn:
+                if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2: # INCREMENTAL
+                    free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                    # executescript steps the pragma to completion; execute() would free a single page.
+                    conn.executescript(f"PRAGMA incremental_vacuum({int(max_pages)});")
+                    report["pages_released"] = free_before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+                _, wal_pages, checkpointed = conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+                report["wal_pages"] = max(wal_pages, 0)
+                report["checkpointed_pages"] = max(checkpointed, 0)
+        except sqlite3.Error as e:
+            print(f"Error compacting cache database: {e}")
+        return report
+
+    def cache_summary(self):
+        """
+        Aggregates the cache per data type, location and language in a single grouped query.
+
+        Returns:
+            list: One dict per group with 'data_type', 'location_code', 'language_code', 'entries',
+                  'bytes' (stored size, after compression), 'oldest' and 'newest' timestamps.
+                  Entries with non-standard keys are grouped under a data_type of None.
+        """
+        if not self._sql_backend:
+            return self._cache_summary_by_scan()
+        try:
+            with self.pool.connection() as conn:
+                rows = conn.execute("""
+                    SELECT data_type, location_code, language_code,
+                           COUNT(*) AS entries,
+                           SUM(COALESCE(LENGTH(payload), 0) + LENGTH(response_json)) AS bytes,
+                           MIN(timestamp) AS oldest,
+                           MAX(timestamp) AS newest
+                    FROM cache
+                    GROUP BY data_type, location_code, language_code
+                    ORDER BY entries DESC
+                """).fetchall()
+            return [dict(row) for row in rows]
+        except sqlite3.Error as e:
+            print(f"Error summarizing cache: {e}")
+            return []
+
+    def _cache_summary_by_scan(self):
+        groups = {}
+        try:
+            for record in self._scan_all():
+                parts = parse_cache_key(record.key) or {}
+                group_key = (parts.get('data_type'), parts.get('location_code'), parts.get('language_code'))
+                group = groups.get(group_key)
+                if group is None:
+                    group = groups[group_key] = {
+                        "data_type": group_key[0], "location_code": group_key[1], "language_code": group_key[2],
+                        "entries": 0, "bytes": 0, "oldest": record.timestamp, "newest": record.timestamp,
+                    }
+                group["entries"] += 1
+                group["bytes"] += len(record.payload or b"") + len(record.response_json)
+                group["oldest"] = min(group["oldest"], record.timestamp)
+                group["newest"] = max(group["newest"], record.timestamp)
+        except self.backend.errors as e:
+            print(f"Error summarizing cache: {e}")
+            return []
+        return sorted(groups.values(), key=lambda group: group["entries"], reverse=True)
+
+    def cache_age_histogram(self, bucket_days=(1, 7, 30, 90, 180, 365), data_type=None,
+                            location_code=None, language_code=None):
+        """
+        Counts entries per age bucket and data type, optionally within a scope.
+
+        Args:
+            bucket_days (tuple): Ascending bucket edges in days. Produces the buckets
+                                 '< 1d', '1-7d', ..., '>= 365d'.
+        Returns:
+            dict: Maps each data type to a dict of bucket label -> entry count.
+        """
+        now = datetime.utcnow()
+        edges = [(now - timedelta(days=days)).isoformat() for days in bucket_days]
+        labels = [f"< {bucket_days[0]}d"]
+        labels += [f"{low}-{high}d" for low, high in zip(bucket_days, bucket_days[1:])]
+        labels.append(f">= {bucket_days[-1]}d")
+
+        # Bucket i holds entries newer than edge i but not newer than edge i-1.
+        bucket_columns = ["SUM(timestamp >= ?) AS b0"]
+        params = [edges[0]]
+        for i in range(1, len(edges)):
+            bucket_columns.append(f"SUM(timestamp < ? AND timestamp >= ?) AS b{i}")
+            params += [edges[i - 1], edges[i]]
+        bucket_columns.append(f"SUM(timestamp < ?) AS b{len(edges)}")
+        params.append(edges[-1])
+
+        if not self._sql_backend:
+            histogram = {}
+            try:
+                for record in self._scan_scope(data_type, location_code, language_code):
+                    parts = parse_cache_key(record.key)
+                    buckets = histogram.setdefault(parts and parts['data_type'], dict.fromkeys(labels, 0))
+                    # Edges run from newest to oldest; count how many this entry is older than.
+                    buckets[labels[sum(record.timestamp < edge for edge in edges)]] += 1
+            except self.backend.errors as e:
+                print(f"Error building cache age histogram: {e}")
+                return {}
+            return histogram
+
+        conditions, scope_params = self._scope_filter(data_type, location_code, language_code)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        try:
+            with self.pool.connection() as conn:
+                rows = conn.execute(f"""
+                    SELECT data_type, {', '.join(bucket_columns)}
+                    FROM cache {where}
+                    GROUP BY data_type
+                """, (*params, *scope_params)).fetchall()
+            return {
+                row['data_type']: {label: row[f"b{i}"] or 0 for i, label in enumerate(labels)}
+                for row in rows
+            }
+        except sqlite3.Error as e:
+            print(f"Error building cache age histogram: {e}")
+            return {}
+
+    def list_cache_keys(self, prefix="", after_key=None, limit=50):
+        """
+        Lists keys starting with `prefix` in key order, one page at a time. Pages are seeked
+        on the key order of the backend (pass the last key of a page as `after_key` for the next
+        one), so every page is equally fast no matter how deep into the cache it is.
+
+        Returns:
+            list: Dicts with 'key', 'timestamp', 'last_access' (None if the backend does not
+                  track reads), 'bytes' and 'format_version'.
+        """
+        if self._sql_backend:
+            # Only the lengths are read, so pages of large uncompressed rows stay cheap.
+            conditions = []
+            params = []
+            if prefix:
+                conditions.append("key >= ? AND key < ?")
+                params += prefix_range(prefix)
+            if after_key is not None:
+                conditions.append("key > ?")
+                params.append(after_key)
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            try:
+                with self.pool.connection() as conn:
+                    rows = conn.execute(f"""
+                        SELECT key, timestamp, last_access, format_version,
+                               COALESCE(LENGTH(payload), 0) + LENGTH(response_json) AS bytes
+                        FROM cache {where} ORDER BY key LIMIT ?
+                    """, (*params, limit)).fetchall()
+            except sqlite3.Error as e:
+                print(f"Error listing cache keys: {e}")
+                return []
+            return [dict(row) for row in rows]
+
+        try:
+            records = self.backend.scan(prefix, after_key=after_key, limit=limit)
+        except self.backend.errors as e:
+            print(f"Error listing cache keys: {e}")
+            return []
+        return [
+            {
+                "key": record.key,
+                "timestamp": record.timestamp,
+                "last_access": record.last_access,
+                "format_version": record.format_version,
+                "bytes": len(record.payload or b"") + len(record.response_json),
+            }
+            for record in records
+        ]
+
+    def count_cache_keys(self, prefix=""):
+        """Counts the keys starting with `prefix` (a range scan of the primary key index for SQLite)."""
+        try:
+            return self.backend.count(prefix)
+        except self.backend.errors as e:
+            print(f"Error counting cache keys: {e}")
+            return 0
+
     def update_cache(self, key, data):
         """Inserts or replaces a record in the cache with the current timestamp."""
-        json_data_string = json.dumps(data)
+        self.update_cache_many([(key, data)])
+
+    def update_cache_many(self, items):
+        """
+        Inserts or replaces many records in a single backend transaction, all with the same
+        timestamp, then updates their projections in a second transaction on the SQLite database.
+
+        The two steps are not atomic: if the projection step fails, the records stay written, the
+        error is logged, and the projections can be repaired with `rebuild_projections`.
+
+        Args:
+            items (iterable or dict): (key, data) pairs, or a dict mapping keys to data.
+        Returns:
+            int: The number of records written by the backend (0 if that write failed),
+                 regardless of whether their projections were written.
+        """
+        items = list(items.items() if isinstance(items, dict) else items)
         current_timestamp = datetime.utcnow().isoformat()
+        records = [CacheRecord(key, *self.codec.encode(data), current_timestamp) for key, data in items]
+        if not records:
+            return 0
+
+        try:
+            written = self.backend.put_many(records)
+        except (*self.backend.errors, sqlite3.Error) as e:
+            print(f"Error updating cache for {len(records)} keys: {e}")
+            return 0
+        finally:
+            self.memory_cache.invalidate(key for key, _ in items)
+        # Projections are derived data; failing to write them must not fail the cache write.
+        self.write_projections(items)
+        return written
 
+    @contextmanager
+    def write_batch(self):
+        """
+        Groups cache writes into one transaction:
+
+            with db_manager.write_batch() as batch:
+                batch.add(key, data)
+
+        Everything added is written with `update_cache_many` when the block exits, including
+        when it exits with an exception, so results fetched before a failure are still kept.
+        """
+        batch = CacheWriteBatch()
         try:
-            conn = get_db_connection(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO cache (key, response_json, timestamp)
-                VALUES (?, ?, ?)
-            """, (key, json_data_string, current_timestamp))
-            conn.commit()
+            yield batch
+        finally:
+            self.update_cache_many(batch.items)
+
+    def write_projections(self, items):
+        """
+        Writes the `serp_urls`/`keyword_metrics` projections of already-cached responses, e.g. for
+        rows cached before the projection tables existed. `update_cache` does this automatically.
+
+        Args:
+            items (iterable or dict): (key, data) pairs, or a dict mapping cache keys to data.
+        """
+        items = list(items.items() if isinstance(items, dict) else items)
+        if not items:
+            return
+        try:
+            with self.pool.connection() as conn:
+                with conn:
+                    self._write_projections(conn, items)
+        except (sqlite3.Error, KeyError, TypeError, ValueError, AttributeError) as e:
+            # Malformed responses surface as lookup/type errors; the projections roll back as a whole.
+            print(f"Error writing projections for {len(items)} keys: {e!r}")
+
+    def _write_projections(self, conn, items):
+        """Projects (key, data) pairs into `serp_urls` and `keyword_metrics` inside the caller's transaction."""
+        serp_rows = {}
+        metric_rows = []
+        for key, data in items:
+            parts = parse_cache_key(key)
+            if parts is None:
+                continue
+            scope = (parts['location_code'], parts['language_code'])
+            if parts['data_type'] == "serp":
+                urls = extract_serp_urls(data)
+                if urls is not None:
+                    serp_rows[(*scope, parts['device'], parts['keyword'])] = urls
+            else:
+                metrics = extract_keyword_metrics(parts['data_type'], data)
+                if metrics is not None:
+                    metrics['sources'] = METRIC_SOURCES[parts['data_type']]
+                    metric_rows.append((parts['keyword'], *scope, metrics))
+
+        if serp_rows:
+            all_urls = list({url for urls in serp_rows.values() for url in urls})
+            conn.executemany("INSERT OR IGNORE INTO urls (url) VALUES (?)", ((url,) for url in all_urls))
+            url_ids = {}
+            for i in range(0, len(all_urls), SQLITE_MAX_VARIABLES):
+                chunk = all_urls[i:i + SQLITE_MAX_VARIABLES]
+                placeholders = ",".join("?" * len(chunk))
+                url_ids.update(conn.execute(f"SELECT url, url_id FROM urls WHERE url IN ({placeholders})", chunk))
+
+            conn.executemany("""
+                DELETE FROM serp_urls
+                WHERE location_code = ? AND language_code = ? AND device = ? AND keyword = ?
+            """, serp_rows.keys())
+            conn.executemany("""
+                INSERT OR REPLACE INTO serp_urls (location_code, language_code, device, keyword, rank, url_id)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (
+                (*serp_key, rank, url_ids[url])
+                for serp_key, urls in serp_rows.items()
+                for rank, url in enumerate(urls, start=1)
+                if url in url_ids
+            ))
+
+        for keyword, location_code, language_code, metrics in metric_rows:
+            columns = ", ".join(metrics)
+            placeholders = ", ".join("?" * len(metrics))
+            updates = ", ".join(f"{column} = excluded.{column}" for column in metrics if column != 'sources')
+            conn.execute(f"""
+                INSERT INTO keyword_metrics (keyword, location_code, language_code, {columns})
+                VALUES (?, ?, ?, {placeholders})
+                ON CONFLICT (location_code, language_code, keyword)
+                DO UPDATE SET {updates}, sources = keyword_metrics.sources | excluded.sources
+            """, (keyword, location_code, language_code, *metrics.values()))
+
+    @contextmanager
+    def _keyword_table(self, keywords):
+        """
+        Borrows a connection with `keywords` loaded into a temporary indexed table, so that
+        projection lookups for any number of keywords are a single join.
+        """
+        with self.pool.connection() as conn:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS wanted_keywords (keyword TEXT PRIMARY KEY)")
+            conn.execute("DELETE FROM temp.wanted_keywords")
+            conn.executemany(
+                "INSERT OR IGNORE INTO temp.wanted_keywords (keyword) VALUES (?)", ((kw,) for kw in keywords)
+            )
+            try:
+                yield conn
+            finally:
+                conn.execute("DELETE FROM temp.wanted_keywords")
+                conn.commit()
+
+    def get_serp_urls(self, keywords, location_code, language_code, device, urls_to_check=None):
+        """
+        Loads the top SERP URLs of many keywords from the `serp_urls` projection.
+
+        Args:
+            keywords (iterable): The keywords to load.
+            urls_to_check (int, optional): Only the first N URLs of each SERP; all if None.
+        Returns:
+            dict: Maps each keyword with a projected SERP to its URLs in rank order.
+                  Keywords without one are absent.
+        """
+        results = {}
+        try:
+            with self._keyword_table(keywords) as conn:
+                rows = conn.execute("""
+                    SELECT s.keyword, u.url
+                    FROM temp.wanted_keywords w
+                    JOIN serp_urls s
+                      ON s.location_code = ? AND s.language_code = ? AND s.device = ? AND s.keyword = w.keyword
+                    JOIN urls u ON u.url_id = s.url_id
+                    WHERE s.rank <= ?
+                    ORDER BY s.keyword, s.rank
+                """, (location_code, language_code, device, urls_to_check or 2 ** 31))
+                for row in rows:
+                    results.setdefault(row['keyword'], []).append(row['url'])
         except sqlite3.Error as e:
-            print(f"Error updating cache for key '{key}': {e}")
+            print(f"Error loading SERP URLs: {e}")
+        self._record_access(
+            build_cache_key("serp", keyword, location_code, language_code, device) for keyword in results
+        )
+        return results
 
-    def clear_all_cache(self):
-        """Deletes all records from the cache table."""
+    def get_keyword_metrics(self, keywords, location_code, language_code):
+        """
+        Loads volume, CPC, KD and intent for many keywords from the `keyword_metrics` projection.
+
+        Returns:
+            dict: Maps each keyword with projected metrics to a dict holding 'volume' and 'cpc',
+                  'kd', and 'intent' for each response type that was projected. Values can be None
+                  when the API returned none; keys of responses never projected are left out.
+        """
+        results = {}
         try:
-            conn = get_db_connection(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM cache")
-            conn.commit()
-            return True
+            with self._keyword_table(keywords) as conn:
+                rows = conn.execute("""
+                    SELECT m.keyword, m.search_volume, m.cpc, m.keyword_difficulty, m.intent, m.sources
+                    FROM temp.wanted_keywords w
+                    JOIN keyword_metrics m
+                      ON m.location_code = ? AND m.language_code = ? AND m.keyword = w.keyword
+                """, (location_code, language_code))
+                for row in rows:
+                    metrics = {}
+                    if row['sources'] & METRIC_SOURCES['volume']:
+                        metrics['volume'] = row['search_volume']
+                        metrics['cpc'] = row['cpc']
+                    if row['sources'] & METRIC_SOURCES['kd']:
+                        metrics['kd'] = row['keyword_difficulty']
+                    if row['sources'] & METRIC_SOURCES['intent']:
+                        metrics['intent'] = row['intent']
+                    results[row['keyword']] = metrics
         except sqlite3.Error as e:
+            print(f"Error loading keyword metrics: {e}")
+        self._record_access(
+            build_cache_key(data_type, keyword, location_code, language_code)
+            for keyword, metrics in results.items()
+            for data_type in ("volume", "kd", "intent") # The metric keys double as data types.
+            if data_type in metrics
+        )
+        return results
+
+    def rebuild_projections(self, batch_size=500, progress_callback=None):
+        """
+        Rebuilds the projection tables from every cached response, in small batches.
+
+        Returns:
+            int: The number of cache rows processed.
+        """
+        after_key = None
+        processed = 0
+        try:
+            while True:
+                records = self.backend.scan(after_key=after_key, limit=batch_size)
+                if not records:
+                    break
+                after_key = records[-1].key
+
+                items = []
+                for record in records:
+                    try:
+                        items.append((record.key, self._decode_record(record)))
+                    except (PayloadDecodeError, TypeError) as e:
+                        print(f"Skipping unreadable cache entry '{record.key}': {e}")
+                self.write_projections(items)
+                processed += len(records)
+                if progress_callback:
+                    progress_callback(processed)
+        except (*self.backend.errors, sqlite3.Error) as e:
+            print(f"Error rebuilding projections: {e}")
+        return processed
+
+    def clear_all_cache(self):
+        """Deletes all records from the cache backend and the projections."""
+        self.memory_cache.clear()
+        try:
+            self.backend.clear()
+            with self.pool.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM serp_urls")
+                cursor.execute("DELETE FROM keyword_metrics")
+                cursor.execute("DELETE FROM urls")
+                conn.commit()
+                return True
+        except (*self.backend.errors, sqlite3.Error) as e:
             print(f"Error clearing cache: {e}")
             return False
 
+    def migrate_payloads(self, batch_size=500, progress_callback=None):
+        """
+        Re-encodes every row that is not in the codec's current format, for example plain JSON
+        rows written before compression, or zlib rows after switching to zstd. Rows are
+        converted in small transactions so the cache stays usable while this runs, and
+        timestamps are kept so cache ages are unaffected.
+
+        Args:
+            batch_size (int): Rows converted per transaction.
+            progress_callback (callable, optional): Called with the running total after each batch.
+        Returns:
+            int: The number of rows converted.
+        """
+        target_format = self.codec.format_version
+        after_key = None
+        converted = 0
+        try:
+            while True:
+                records = self.backend.scan(after_key=after_key, limit=batch_size)
+                if not records:
+                    break
+                after_key = records[-1].key
+
+                updates = []
+                for record in records:
+                    if record.format_version == target_format:
+                        continue
+                    try:
+                        encoded = self.codec.encode(self._decode_record(record))
+                        updates.append(record._replace(response_json=encoded[0], payload=encoded[1],
+                                                       format_version=encoded[2]))
+                    except (PayloadDecodeError, TypeError) as e:
+                        print(f"Skipping unreadable cache entry '{record.key}': {e}")
+                if updates:
+                    self.backend.put_many(updates)
+                    self.memory_cache.invalidate(record.key for record in updates)
+                converted += len(updates)
+                if progress_callback:
+                    progress_callback(converted)
+        except self.backend.errors as e:
+            print(f"Error migrating cache payloads: {e}")
+        return converted
+
+    def train_compression_dictionary(self, key_prefix="serp|", sample_size=1000, dict_size=112640):
+        """
+        Trains a zstd dictionary on a sample of cached responses, stores it, and uses it for
+        new writes. Call `migrate_payloads` afterwards to re-compress existing rows with it.
+        Requires the zstandard package and `CACHE_COMPRESSION = "zstd"`.
+
+        Args:
+            key_prefix (str): Only rows whose key starts with this prefix are sampled.
+            sample_size (int): Maximum number of rows to train on.
+            dict_size (int): Target dictionary size in bytes.
+        Returns:
+            int: The new dictionary's id, or None if there were no samples or training failed.
+        """
+        if self.codec.compression != "zstd":
+            print("Compression dictionaries are only used with zstd compression.")
+            return None
+        try:
+            samples = [self._decode_record(record) for record in self.backend.scan(key_prefix, limit=sample_size)]
+            if not samples:
+                return None
+            dict_data = PayloadCodec.train_dictionary(samples, dict_size)
+            dict_id = self.codec.set_dictionary(dict_data)
+            with self.pool.connection() as conn:
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO cache_dictionaries (dict_id, dictionary, created) VALUES (?, ?, ?)",
+                        (dict_id, dict_data, datetime.utcnow().isoformat())
+                    )
+            return dict_id
+        except (*self.backend.errors, sqlite3.Error, PayloadDecodeError, RuntimeError) as e:
+            print(f"Error training compression dictionary: {e}")
+            return None
+
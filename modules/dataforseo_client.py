@@ -4,38 +4,119 @@ import requests
 import json
 import time
 import base64
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import (
+    HTTP_POOL_SIZE, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_MAX_RETRIES, HTTP_BACKOFF_FACTOR,
+)
+
+# Endpoint paths, appended to the client's API base URL.
+SERP_TASK_POST_PATH = "/v3/serp/google/organic/task_post"
+SERP_TASK_GET_PATH = "/v3/serp/google/organic/task_get/advanced/"
+SERP_TASKS_READY_PATH = "/v3/serp/google/organic/tasks_ready"
+SEARCH_VOLUME_TASK_POST_PATH = "/v3/keywords_data/google_ads/search_volume/task_post"
+SEARCH_VOLUME_TASK_GET_PATH = "/v3/keywords_data/google_ads/search_volume/task_get/"
+KEYWORD_DIFFICULTY_LIVE_PATH = "/v3/dataforseo_labs/google/bulk_keyword_difficulty/live"
+SEARCH_INTENT_LIVE_PATH = "/v3/dataforseo_labs/google/search_intent/live"
+
+def basic_auth_header(login, password):
+    """The Basic Authentication header value for the API credentials."""
+    cred = base64.b64encode(f"{login}:{password}".encode()).decode()
+    return f'Basic {cred}'
+
+def serp_tasks_payload(keywords, location_code, language_code, device):
+    """One SERP task per keyword, top 100 results."""
+    return [{
+        "location_code": location_code,
+        "language_code": language_code,
+        "keyword": keyword,
+        "device": device,
+        "depth": 100
+    } for keyword in keywords]
+
+def keywords_payload(keywords, location_code, language_code):
+    """A single task covering all keywords, as used by search volume, KD and intent."""
+    return [{
+        "keywords": list(keywords),
+        "location_code": location_code,
+        "language_code": language_code,
+    }]
 
 class DataForSeoClient:
     """
     A client class to manage all API communications with the DataForSEO service.
     It handles authentication, request posting, and basic error handling.
+
+    Requests go through one pooled `requests.Session`, so connections (and their TLS
+    handshakes) are reused across calls and threads. Every request has connect/read
+    timeouts; failed connections are retried with exponential backoff, and so are GET
+    requests answered with 429 or 5xx. POSTs are not retried once sent, because repeating
+    a task_post could create (and bill) the same tasks twice.
     """
 
-    def __init__(self, login, password, api_base_url):
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, login, password, api_base_url, pool_size=HTTP_POOL_SIZE,
+                 timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT), max_retries=HTTP_MAX_RETRIES,
+                 backoff_factor=HTTP_BACKOFF_FACTOR):
         """
         Initializes the client with user credentials and the API base URL.
         It prepares the authentication header exactly as specified.
+
+        Args:
+            api_base_url (str): e.g. "https://api.dataforseo.com"; every endpoint URL is built from it.
+            pool_size (int): Keep-alive connections kept open to the API host.
+            timeout (tuple): (connect, read) timeouts in seconds.
+            max_retries (int): Retries of failed connections and of retryable GET responses.
+            backoff_factor (float): Base of the exponential wait between retries, in seconds.
         """
-        self.api_base_url = api_base_url
+        self.api_base_url = api_base_url.rstrip("/")
         self.login = login
         self.password = password
+        self.timeout = timeout
         
         # Manually prepare the Basic Authentication header to exactly match the working script.
-        cred = base64.b64encode(f"{login}:{password}".encode()).decode()
         self.headers = {
-            'Authorization': f'Basic {cred}',
-            'Content-Type': 'application/json'
+            'Authorization': basic_auth_header(login, password),
+            'Content-Type': 'application/json',
+            'Accept-Encoding': 'gzip, deflate', # Responses are decompressed transparently.
         }
+        self.session = self._create_session(pool_size, max_retries, backoff_factor)
+
+    def _create_session(self, pool_size, max_retries, backoff_factor):
+        """Builds the pooled session with the retry policy described on the class."""
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=self.RETRY_STATUSES,
+            allowed_methods=frozenset({"GET"}), # Read errors and statuses are only retried for GETs.
+            respect_retry_after_header=True,
+            raise_on_status=False, # Hand the last response to raise_for_status for the usual error path.
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry, pool_block=True)
+        session = requests.Session()
+        session.headers.update(self.headers)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def close(self):
+        """Closes the pooled connections."""
+        self.session.close()
 
     def _post_request(self, url, payload):
         """
         A private helper method for sending POST requests to the API.
         """
         try:
-            response = requests.post(
+            response = self.session.post(
                 url,
-                headers=self.headers,
-                data=json.dumps(payload)
+                data=json.dumps(payload),
+                timeout=self.timeout
             )
             response.raise_for_status()
             return response.json()
@@ -51,9 +132,9 @@ class DataForSeoClient:
         A private helper method for sending GET requests, used for retrieving task results.
         """
         try:
-            response = requests.get(
+            response = self.session.get(
                 url,
-                headers=self.headers
+                timeout=self.timeout
             )
             response.raise_for_status()
             return response.json()
@@ -63,15 +144,7 @@ class DataForSeoClient:
 
     def post_serp_tasks(self, keyword, location_code, language_code, device):
         """Posts a SERP task for a single keyword."""
-        url = f"{self.api_base_url}/v3/serp/google/organic/task_post"
-        post_data = [{
-            "location_code": location_code,
-            "language_code": language_code,
-            "keyword": keyword,
-            "device": device,
-            "depth": 100
-        }]
-        return self._post_request(url, post_data)
+        return self.post_bulk_serp_tasks([keyword], location_code, language_code, device)
 
     def post_bulk_serp_tasks(self, keywords, location_code, language_code, device):
         """
@@ -86,29 +159,12 @@ class DataForSeoClient:
         Returns:
             dict: API response containing task IDs for all posted keywords
         """
-        url = f"{self.api_base_url}/v3/serp/google/organic/task_post"
-        post_data = []
-
-        for keyword in keywords:
-            post_data.append({
-                "location_code": location_code,
-                "language_code": language_code,
-                "keyword": keyword,
-                "device": device,
-                "depth": 100
-            })
-
-        return self._post_request(url, post_data)
+        url = f"{self.api_base_url}{SERP_TASK_POST_PATH}"
+        return self._post_request(url, serp_tasks_payload(keywords, location_code, language_code, device))
 
     def post_search_volume_tasks(self, keyword, location_code, language_code):
         """Posts a search volume task for a single keyword."""
-        url = f"{self.api_base_url}/v3/keywords_data/google_ads/search_volume/task_post"
-        post_data = [{
-            "keywords": [keyword],
-            "location_code": location_code,
-            "language_code": language_code,
-        }]
-        return self._post_request(url, post_data)
+        return self.post_bulk_search_volume_tasks([keyword], location_code, language_code)
 
     def post_bulk_search_volume_tasks(self, keywords, location_code, language_code):
         """
@@ -122,35 +178,35 @@ class DataForSeoClient:
         Returns:
             dict: API response containing task IDs for all posted keywords
         """
-        url = f"{self.api_base_url}/v3/keywords_data/google_ads/search_volume/task_post"
-        post_data = [{
-            "keywords": keywords,
-            "location_code": location_code,
-            "language_code": language_code,
-        }]
-        return self._post_request(url, post_data)
+        url = f"{self.api_base_url}{SEARCH_VOLUME_TASK_POST_PATH}"
+        return self._post_request(url, keywords_payload(keywords, location_code, language_code))
 
     def fetch_keyword_difficulty(self, keyword, location_code, language_code):
         """Fetches Keyword Difficulty for a single keyword."""
         # Note: This still uses the 'bulk' endpoint name, but we only send one keyword.
-        url = f"{self.api_base_url}/v3/dataforseo_labs/google/bulk_keyword_difficulty/live"
-        payload = [{
-            "keywords": [keyword],
-            "location_code": location_code,
-            "language_code": language_code
-        }]
-        return self._post_request(url, payload)
+        url = f"{self.api_base_url}{KEYWORD_DIFFICULTY_LIVE_PATH}"
+        return self._post_request(url, keywords_payload([keyword], location_code, language_code))
 
     def fetch_search_intent(self, keyword, location_code, language_code):
         """Fetches Search Intent for a single keyword."""
-        url = f"{self.api_base_url}/v3/dataforseo_labs/google/search_intent/live"
-        payload = [{
-            "keywords": [keyword],
-            "location_code": location_code,
-            "language_code": language_code
-        }]
-        return self._post_request(url, payload)
+        url = f"{self.api_base_url}{SEARCH_INTENT_LIVE_PATH}"
+        return self._post_request(url, keywords_payload([keyword], location_code, language_code))
     
     def get_task_results(self, url):
         """Retrieves the results of a previously posted asynchronous task."""
         return self._get_request(url)
+
+    def get_serp_task_results(self, task_id):
+        """Retrieves the advanced results of a posted SERP task."""
+        return self._get_request(f"{self.api_base_url}{SERP_TASK_GET_PATH}{task_id}")
+
+    def get_serp_tasks_ready(self):
+        """
+        Lists completed SERP tasks that have not been collected yet (up to 1000 per call,
+        for the whole account). A task leaves the listing once its results are retrieved.
+        """
+        return self._get_request(f"{self.api_base_url}{SERP_TASKS_READY_PATH}")
+
+    def get_search_volume_task_results(self, task_id):
+        """Retrieves the results of a posted search volume task."""
+        return self._get_request(f"{self.api_base_url}{SEARCH_VOLUME_TASK_GET_PATH}{task_id}")
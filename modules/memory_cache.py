@@ -0,0 +1,109 @@
+# modules/memory_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+class PayloadLRUCache:
+    """
+    A bounded, thread-safe LRU of decoded cache payloads kept in front of SQLite.
+
+    Entries are charged by the size of their JSON text and the least recently used ones are
+    dropped once `max_bytes` is exceeded. Each entry remembers the timestamp of the database
+    row it was read from, so `get` applies the same `max_age_days` rules as
+    `DatabaseManager.check_cache`. Entries also expire `ttl_seconds` after they were loaded, so
+    rows rewritten by another process are picked up. Payloads are shared between callers
+    and must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl_seconds=600):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict() # key -> (data, size, row_timestamp, loaded_at)
+        self._bytes = 0
+        self._generation = 0 # Bumped by every invalidation; see `generation`.
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def get(self, key, max_age_days=None):
+        """Returns the cached payload, or None on a miss (absent, expired or stale for `max_age_days`)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                data, size, row_timestamp, loaded_at = entry
+                if self.ttl_seconds and time.monotonic() - loaded_at > self.ttl_seconds:
+                    self._remove(key)
+                elif max_age_days is not None and datetime.utcnow() - row_timestamp > timedelta(days=max_age_days):
+                    pass # Stale for this caller; the row itself may have been refreshed since.
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return data
+            self.misses += 1
+            return None
+
+    @property
+    def generation(self):
+        """
+        Read this before querying the database and pass it to `put`, so a payload read just
+        before a concurrent write is not cached after that write invalidated it.
+        """
+        return self._generation
+
+    def put(self, key, data, size, row_timestamp, generation=None):
+        """Stores a payload read from a row written at `row_timestamp` (a datetime or ISO string)."""
+        if not self.enabled or size > self.max_bytes:
+            return
+        if isinstance(row_timestamp, str):
+            row_timestamp = datetime.fromisoformat(row_timestamp)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (data, size, row_timestamp, time.monotonic())
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def invalidate(self, keys):
+        """Drops the given keys."""
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                if key in self._entries:
+                    self._remove(key)
+
+    def clear(self):
+        """Drops every entry. The hit and miss counters are kept."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Returns hit/miss counters and current usage."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _remove(self, key):
+        _, size, _, _ = self._entries.pop(key)
+        self._bytes -= size
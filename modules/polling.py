@@ -0,0 +1,206 @@
+# modules/polling.py
+
+import itertools
+import threading
+import time
+
+from config import (
+    POLL_INITIAL_INTERVAL_SECONDS, POLL_MAX_INTERVAL_SECONDS, POLL_BACKOFF_FACTOR, POLL_PROBE_TASKS,
+)
+
+class PollingScheduler:
+    """
+    Decides when to check each posted API task again and when to give up on it.
+
+    Every task has its own schedule, so a task that completes does not make the others be
+    polled more often:
+    - while nothing has completed yet, only the `probe_size` oldest tasks are checked. Tasks
+      posted together take similar times, so the rest wait for the first completion instead
+      of being requested every cycle;
+    - a task that was checked and is still running is next checked once its age has grown by
+      `backoff_factor` (at least `initial_interval`, at most `max_interval` later);
+    - once completion times have been observed, a task is not checked again before its age
+      reaches the median observed latency, since earlier checks rarely find anything.
+    Every task has its own deadline; waits never run past the nearest one, and `expire`
+    reports tasks that missed it. `stats` summarises the latency distribution.
+
+        scheduler = PollingScheduler(timeout_seconds=300)
+        scheduler.add(task_ids)
+        while scheduler.pending:
+            scheduler.wait()
+            due = scheduler.due()
+            ... check the due tasks, calling scheduler.complete(task_id) for finished ones ...
+            scheduler.expire()
+            scheduler.end_cycle(due)
+    """
+
+    def __init__(self, timeout_seconds, initial_interval=POLL_INITIAL_INTERVAL_SECONDS,
+                 max_interval=POLL_MAX_INTERVAL_SECONDS, backoff_factor=POLL_BACKOFF_FACTOR,
+                 probe_size=POLL_PROBE_TASKS, clock=time.monotonic, sleep=time.sleep):
+        self.timeout_seconds = timeout_seconds
+        self.initial_interval = initial_interval
+        self.max_interval = max(max_interval, initial_interval)
+        self.backoff_factor = max(backoff_factor, 1.0)
+        self.probe_size = max(1, probe_size)
+        self._clock = clock
+        self._sleep = sleep
+        self._submitted_at = {} # pending task ID -> submit time
+        self._deadlines = {}    # pending task ID -> deadline
+        self._next_due = {}     # pending task ID -> time of its next check
+        self.latencies = []     # Seconds from submit to observed completion, per completed task.
+        self.timed_out = []
+        self.polls = 0
+        self._last_progress = clock()
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self):
+        """IDs of tasks that have neither completed nor expired."""
+        with self._lock:
+            return set(self._submitted_at)
+
+    def add(self, task_ids, timeout_seconds=None):
+        """Starts tracking tasks posted now; each gets a deadline `timeout_seconds` from now."""
+        now = self._clock()
+        deadline = now + (self.timeout_seconds if timeout_seconds is None else timeout_seconds)
+        with self._lock:
+            for task_id in task_ids:
+                self._submitted_at[task_id] = now
+                self._deadlines[task_id] = deadline
+                self._next_due[task_id] = now + self.initial_interval
+            self._last_progress = now
+
+    def complete(self, task_id):
+        """Records that a task finished. Returns its latency in seconds, or None if it was not pending."""
+        with self._lock:
+            submitted_at = self._submitted_at.pop(task_id, None)
+            if submitted_at is None:
+                return None
+            del self._deadlines[task_id]
+            del self._next_due[task_id]
+            now = self._clock()
+            latency = now - submitted_at
+            self.latencies.append(latency)
+            self._last_progress = now
+            return latency
+
+    def mark_progress(self):
+        """Resets `quiet_seconds`, e.g. after a check that covered every pending task."""
+        with self._lock:
+            self._last_progress = self._clock()
+
+    def quiet_seconds(self):
+        """Seconds since tasks were added, a task completed, or `mark_progress` was called."""
+        with self._lock:
+            return self._clock() - self._last_progress
+
+    def latency_percentile(self, fraction):
+        """The observed completion latency at `fraction` (e.g. 0.9), or None before any completion."""
+        with self._lock:
+            if not self.latencies:
+                return None
+            ordered = sorted(self.latencies)
+            return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+    def expire(self):
+        """Stops tracking tasks past their deadline and returns their IDs."""
+        now = self._clock()
+        with self._lock:
+            expired = [task_id for task_id, deadline in self._deadlines.items() if deadline <= now]
+            for task_id in expired:
+                del self._submitted_at[task_id]
+                del self._deadlines[task_id]
+                del self._next_due[task_id]
+            self.timed_out.extend(expired)
+            return expired
+
+    def _candidates(self):
+        """Pending tasks that may be checked: all of them, or only the probes before any completion."""
+        if len(self.latencies) > self.probe_size // 2:
+            return self._next_due
+        # Dicts keep insertion order, so the first entries are the oldest tasks.
+        probes = itertools.islice(self._next_due, self.probe_size)
+        return {task_id: self._next_due[task_id] for task_id in probes}
+
+    def due(self):
+        """IDs of the pending tasks whose next check is due now."""
+        now = self._clock()
+        with self._lock:
+            return {task_id for task_id, next_due in self._candidates().items() if next_due <= now}
+
+    def end_cycle(self, checked=None):
+        """
+        Schedules the next check of every task in `checked` that is still pending (all pending
+        tasks if None, e.g. after a listing that covers them all).
+        """
+        now = self._clock()
+        with self._lock:
+            self.polls += 1
+            median = self._median(self.latencies) if self.latencies else None
+            for task_id in self._next_due.keys() if checked is None else checked:
+                if task_id not in self._next_due:
+                    continue
+                age = now - self._submitted_at[task_id]
+                wait = min(max(age * (self.backoff_factor - 1), self.initial_interval), self.max_interval)
+                if median is not None:
+                    # Skip checks the observed latencies say will not find anything yet.
+                    wait = max(wait, min(median - age, self.max_interval))
+                self._next_due[task_id] = now + wait
+
+    def next_wait(self):
+        """Seconds until the next check is due."""
+        now = self._clock()
+        with self._lock:
+            candidates = self._candidates()
+            if not candidates:
+                return 0.0
+            wait = min(candidates.values()) - now
+            time_to_deadline = min(self._deadlines.values()) - now
+            return max(0.0, min(wait, time_to_deadline))
+
+    def wait(self):
+        """Sleeps until the next check is due."""
+        seconds = self.next_wait()
+        if seconds > 0:
+            self._sleep(seconds)
+        return seconds
+
+    @staticmethod
+    def _median(values):
+        ordered = sorted(values)
+        return ordered[len(ordered) // 2]
+
+    def stats(self):
+        """
+        Returns:
+            dict: 'completed', 'timed_out', 'polls', and the latency 'min', 'p50', 'p90', 'max'
+                  and 'mean' in seconds (None before any completion).
+        """
+        with self._lock:
+            ordered = sorted(self.latencies)
+            stats = {
+                "completed": len(ordered),
+                "timed_out": len(self.timed_out),
+                "polls": self.polls,
+            }
+            if not ordered:
+                return {**stats, "min": None, "p50": None, "p90": None, "max": None, "mean": None}
+            return {
+                **stats,
+                "min": round(ordered[0], 2),
+                "p50": round(ordered[len(ordered) // 2], 2),
+                "p90": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))], 2),
+                "max": round(ordered[-1], 2),
+                "mean": round(sum(ordered) / len(ordered), 2),
+            }
+
+    def describe(self):
+        """A one-line summary of `stats` for logs."""
+        stats = self.stats()
+        if not stats["completed"]:
+            return f"no tasks completed after {stats['polls']} polls, {stats['timed_out']} timed out"
+        return (
+            f"{stats['completed']} tasks completed in {stats['polls']} polls "
+            f"(latency p50 {stats['p50']}s, p90 {stats['p90']}s, max {stats['max']}s), "
+            f"{stats['timed_out']} timed out"
+        )
@@ -2,7 +2,6 @@
 import streamlit as st
 import time
 
-from config import API_BASE_URL
 from utils import get_keywords_from_input
 from modules.bulk_data_fetcher import BulkDataFetcher
 
@@ -113,13 +112,18 @@ def render(client, db_manager, locations, languages, locations_map, languages_ma
                 # KD and Intent still use individual calls as they are live endpoints
                 if fetch_kd or fetch_intent:
                     log_area.info("Processing Keyword Difficulty and Search Intent (individual calls)...")
+                    cached_entries = db_manager.check_cache_many(
+                        [f"kd|{kw}|{location_code}|{language_code}" for kw in keywords if fetch_kd] +
+                        [f"intent|{kw}|{location_code}|{language_code}" for kw in keywords if fetch_intent],
+                        max_age_days=cache_duration_days
+                    )
                     for i, kw in enumerate(keywords):
                         progress_text = f"Processing KD/Intent {i+1}/{len(keywords)}: {kw}"
                         progress_bar.progress((i + 1) / len(keywords), text=progress_text)
 
                         if fetch_kd:
                             cache_key = f"kd|{kw}|{location_code}|{language_code}"
-                            if db_manager.check_cache(cache_key, max_age_days=cache_duration_days) is None:
+                            if cached_entries.get(cache_key) is None:
                                 log_area.warning(f"❌ KD Cache MISS for: '{kw}'. Calling API...")
                                 response = client.fetch_keyword_difficulty(kw, location_code, language_code)
                                 if response and response.get('status_code') == 20000:
@@ -132,7 +136,7 @@ def render(client, db_manager, locations, languages, locations_map, languages_ma
 
                         if fetch_intent:
                             cache_key = f"intent|{kw}|{location_code}|{language_code}"
-                            if db_manager.check_cache(cache_key, max_age_days=cache_duration_days) is None:
+                            if cached_entries.get(cache_key) is None:
                                 log_area.warning(f"❌ Intent Cache MISS for: '{kw}'. Calling API...")
                                 response = client.fetch_search_intent(kw, location_code, language_code)
                                 if response and response.get('status_code') == 20000:
@@ -158,10 +162,9 @@ def render(client, db_manager, locations, languages, locations_map, languages_ma
                             post_response = client.post_serp_tasks(kw, location_code, language_code, selected_device)
                             if post_response and post_response.get('tasks'):
                                 task_id = post_response['tasks'][0]['id']
-                                get_url = f"{API_BASE_URL}/v3/serp/google/organic/task_get/advanced/{task_id}"
                                 for _ in range(30):
                                     time.sleep(10)
-                                    task_result = client.get_task_results(get_url)
+                                    task_result = client.get_serp_task_results(task_id)
                                     if task_result and task_result.get('tasks') and task_result['tasks'][0].get('result'):
                                         db_manager.update_cache(cache_key, task_result)
                                         log_area.success(f"   - ✅ Got and cached SERP for '{kw}'")
@@ -181,10 +184,9 @@ def render(client, db_manager, locations, languages, locations_map, languages_ma
                             post_response = client.post_search_volume_tasks(kw, location_code, language_code)
                             if post_response and post_response.get('tasks'):
                                 task_id = post_response['tasks'][0]['id']
-                                get_url = f"{API_BASE_URL}/v3/keywords_data/google_ads/search_volume/task_get/{task_id}"
                                 for _ in range(10):
                                     time.sleep(5)
-                                    task_result = client.get_task_results(get_url)
+                                    task_result = client.get_search_volume_task_results(task_id)
                                     if task_result and task_result.get('tasks') and task_result['tasks'][0].get('result'):
                                         db_manager.update_cache(cache_key, task_result)
                                         log_area.success(f"   - ✅ Got and cached Volume for '{kw}'")
@@ -1,8 +1,28 @@
 # ui/tab_debug_cache.py
 import streamlit as st
+import pandas as pd
+import plotly.express as px
 import time
 
-def render(db_manager):
+KEY_BROWSER_PAGE_SIZE = 50
+
+@st.cache_data(ttl=60, show_spinner=False)
+def load_cache_statistics(_db_manager, db_path):
+    """Aggregates are cached for a minute so reruns of the tab stay instant on large caches."""
+    return _db_manager.cache_summary(), _db_manager.cache_age_histogram()
+
+@st.cache_data(ttl=60, show_spinner=False)
+def count_cache_keys(_db_manager, db_path, prefix):
+    """Key counts are cached like the statistics; an unprefixed count walks the whole table."""
+    return _db_manager.count_cache_keys(prefix)
+
+def render(db_manager, cache_maintenance=None):
+    render_statistics(db_manager)
+    st.divider()
+
+    render_key_browser(db_manager)
+    st.divider()
+
     st.header("Inspect Raw Cache Data")
     st.info("Use this tab to look up the raw JSON data stored in the local SQLite database for a specific cache key.")
     
@@ -27,9 +47,27 @@ def render(db_manager):
                     st.warning("No data found for this key.")
         else:
             st.warning("Please enter a cache key.")
-            
+
     st.divider()
-    
+
+    st.header("In-Memory Cache")
+    memory_stats = db_manager.memory_cache.stats()
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Hits", f"{memory_stats['hits']:,}")
+    m2.metric("Misses", f"{memory_stats['misses']:,}")
+    m3.metric("Hit Rate", f"{memory_stats['hit_rate']:.0%}")
+    m4.metric("Entries", f"{memory_stats['entries']:,}",
+              help=f"{memory_stats['bytes'] / 1024 / 1024:.1f} MB of {memory_stats['max_bytes'] / 1024 / 1024:.0f} MB used")
+
+    st.divider()
+
+    if cache_maintenance is not None:
+        render_maintenance(cache_maintenance)
+        st.divider()
+
+    render_storage_format(db_manager)
+    st.divider()
+
     st.header("Cache Management")
     st.warning("This action will permanently delete all cached data and cannot be undone.", icon="⚠️")
     
@@ -42,6 +80,8 @@ def render(db_manager):
         c1, c2 = st.columns(2)
         if c1.button("Yes, I am sure. Delete all data.", type="primary"):
             if db_manager.clear_all_cache():
+                load_cache_statistics.clear()
+                count_cache_keys.clear()
                 st.success("All cached data has been deleted.")
             else:
                 st.error("An error occurred while clearing the cache.")
@@ -53,3 +93,139 @@ def render(db_manager):
             st.session_state.confirm_delete = False
             st.rerun()
 
+
+def render_maintenance(cache_maintenance):
+    st.header("Cache Maintenance")
+    max_ages = {
+        data_type: (f"{days} days" if days is not None else "forever")
+        for data_type, days in cache_maintenance.max_age_days_by_type.items()
+    }
+    size_limit = (f"{cache_maintenance.max_size_bytes / 1024 / 1024:,.0f} MB"
+                  if cache_maintenance.max_size_bytes else "no limit")
+    st.caption(
+        f"Runs every {cache_maintenance.interval_seconds // 60} minutes. "
+        f"Keeps: {', '.join(f'{t} {a}' for t, a in max_ages.items())}. Size limit: {size_limit}."
+    )
+
+    if st.button("🧹 Run Maintenance Now", disabled=cache_maintenance.is_running):
+        with st.status("Running cache maintenance...", expanded=True) as status:
+            report = cache_maintenance.run_once(log_callback=st.write)
+            if report is None:
+                status.update(label="Maintenance is already running in the background.", state="error")
+            else:
+                status.update(label="Cache maintenance complete.", state="complete")
+
+    db_manager = cache_maintenance.db_manager
+    if db_manager.auto_vacuum_mode() != "incremental":
+        st.warning(
+            "This database file predates incremental auto-vacuum, so maintenance cannot give freed "
+            "space back to the file system and the file never shrinks. Converting rewrites the whole "
+            "file once: it blocks cache writes until done and needs free disk space of about "
+            f"{db_manager.database_size_bytes() / 1024 / 1024:,.0f} MB.", icon="⚠️"
+        )
+        if st.button("Convert to Incremental Auto-Vacuum", disabled=cache_maintenance.is_running):
+            with st.spinner("Rewriting the database file..."):
+                converted = db_manager.enable_incremental_vacuum()
+            if converted:
+                load_cache_statistics.clear()
+                st.success("The database now uses incremental auto-vacuum.")
+            else:
+                st.error("The conversion failed; see the server log for details.")
+
+    report = cache_maintenance.last_report
+    if report:
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Expired Entries", f"{sum(report['expired'].values()):,}")
+        c2.metric("Evicted for Size", f"{report['evicted_for_size']:,}")
+        c3.metric("Size Before", f"{report['size_before'] / 1024 / 1024:,.1f} MB")
+        c4.metric("Size After", f"{report['size_after'] / 1024 / 1024:,.1f} MB")
+        st.caption(f"Last run: {report['started_at']} UTC ({report['duration_seconds']}s)")
+
+def render_storage_format(db_manager):
+    st.header("Storage Format")
+    st.caption(
+        f"New entries are stored with {db_manager.codec.compression} compression. Entries written "
+        "before compression was enabled, or with another codec, are converted by re-encoding them."
+    )
+    if st.button("🗜️ Compress Existing Entries"):
+        with st.status("Re-encoding cached entries...", expanded=True) as status:
+            progress_text = st.empty()
+            converted = db_manager.migrate_payloads(
+                progress_callback=lambda total: progress_text.write(f"{total:,} entries converted so far...")
+            )
+            load_cache_statistics.clear()
+            status.update(label=f"Converted {converted:,} entries to the current format.", state="complete")
+
+def render_statistics(db_manager):
+    st.header("Cache Statistics")
+    if st.button("🔄 Refresh Statistics"):
+        load_cache_statistics.clear()
+        count_cache_keys.clear()
+    summary, age_histogram = load_cache_statistics(db_manager, db_manager.db_path)
+
+    if not summary:
+        st.info("The cache is empty.")
+        return
+
+    summary_df = pd.DataFrame(summary)
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Entries", f"{summary_df['entries'].sum():,}")
+    c2.metric("Stored Size", f"{summary_df['bytes'].sum() / 1024 / 1024:,.1f} MB")
+    c3.metric("Database File", f"{db_manager.database_size_bytes() / 1024 / 1024:,.1f} MB")
+
+    summary_df['data_type'] = summary_df['data_type'].fillna("other")
+    summary_df['MB'] = (summary_df['bytes'] / 1024 / 1024).round(2)
+    st.dataframe(
+        summary_df[['data_type', 'location_code', 'language_code', 'entries', 'MB', 'oldest', 'newest']].rename(columns={
+            'data_type': "Data Type", 'location_code': "Location", 'language_code': "Language",
+            'entries': "Entries", 'oldest': "Oldest (UTC)", 'newest': "Newest (UTC)"
+        }),
+        use_container_width=True, hide_index=True
+    )
+
+    if age_histogram:
+        st.subheader("Entry Age")
+        histogram_df = pd.DataFrame([
+            {"Data Type": data_type or "other", "Age": age, "Entries": count}
+            for data_type, buckets in age_histogram.items()
+            for age, count in buckets.items()
+        ])
+        fig = px.bar(histogram_df, x="Age", y="Entries", color="Data Type", barmode="group")
+        st.plotly_chart(fig, use_container_width=True)
+
+def render_key_browser(db_manager):
+    st.header("Browse Cache Keys")
+    prefix = st.text_input("Key prefix", placeholder="e.g. serp|best running shoes or volume|", key="cache_browser_prefix")
+
+    # Page cursors: the last key of every page seen so far, so Previous can step back.
+    if st.session_state.get('cache_browser_for_prefix') != prefix:
+        st.session_state.cache_browser_for_prefix = prefix
+        st.session_state.cache_browser_cursors = [None]
+    cursors = st.session_state.cache_browser_cursors
+
+    page = db_manager.list_cache_keys(prefix, after_key=cursors[-1], limit=KEY_BROWSER_PAGE_SIZE)
+    total = count_cache_keys(db_manager, db_manager.db_path, prefix)
+    st.caption(f"{total:,} matching keys. Page {len(cursors)}.")
+
+    if page:
+        page_df = pd.DataFrame(page)
+        page_df['KB'] = (page_df['bytes'] / 1024).round(1)
+        st.dataframe(
+            page_df[['key', 'timestamp', 'last_access', 'KB']].rename(columns={
+                'key': "Key", 'timestamp': "Cached (UTC)", 'last_access': "Last Access (UTC)"
+            }),
+            use_container_width=True, hide_index=True
+        )
+
+    c1, c2, _ = st.columns([1, 1, 4])
+    if c1.button("⬅️ Previous", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+    if c2.button("Next ➡️", disabled=len(page) < KEY_BROWSER_PAGE_SIZE):
+        cursors.append(page[-1]['key'])
+        st.rerun()
+
+    if page:
+        selected_key = st.selectbox("Inspect a key from this page", [row['key'] for row in page])
+        if st.button("🔍 Show Data", key="cache_browser_show"):
+            st.json(db_manager.check_cache(selected_key))
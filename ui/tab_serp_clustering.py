@@ -1,11 +1,96 @@
 # ui/tab_serp_clustering.py
 import streamlit as st
 import pandas as pd
+import csv
+import glob
+import os
+import tempfile
+import time
+from collections import deque
 
 from utils import get_keywords_from_input
-from modules.clustering import perform_serp_clustering
+from modules.clustering import iter_serp_clustering, sweep_serp_clustering, SPARSE_BACKEND_AVAILABLE
+from modules.cache_projections import extract_serp_urls, extract_keyword_metrics
 from utils.dataforseo_locations_languages import get_popular_locations, get_popular_languages, get_location_options, get_language_options
 
+# Rows shown in the live preview while clustering streams; the full result is in the CSV.
+PREVIEW_ROWS = 1000
+# Cluster CSVs live here; files older than this are removed, whichever session wrote them.
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), "seo_clustering_exports")
+EXPORT_MAX_AGE_SECONDS = 6 * 3600
+
+def remove_stale_exports(max_age_seconds=EXPORT_MAX_AGE_SECONDS):
+    """Deletes cluster CSVs that are older than `max_age_seconds`, e.g. from sessions that ended."""
+    cutoff = time.time() - max_age_seconds
+    for path in glob.glob(os.path.join(EXPORT_DIR, "serp_clusters_*.csv")):
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass # Already removed by another session
+
+def load_cached_keyword_data(db_manager, keywords, location_code, language_code, device, urls_to_check):
+    """
+    Collects SERP URLs, volume/CPC, KD and intent for each keyword from the local cache.
+    Returns the per-keyword data map and the list of keywords missing SERP data.
+
+    Data comes from the compact projection tables; only keywords that are not projected yet
+    (e.g. cached before the tables existed) fall back to the raw JSON responses, which are
+    then projected so the next run finds them.
+    """
+    keyword_data_map = {}
+    missing_keywords = []
+
+    serp_urls = db_manager.get_serp_urls(keywords, location_code, language_code, device, urls_to_check)
+    keyword_metrics = db_manager.get_keyword_metrics(keywords, location_code, language_code)
+
+    # Resolve the raw entries of anything not projected yet in a few batched queries
+    fallback_keys = []
+    for kw in keywords:
+        projected = keyword_metrics.get(kw, {})
+        if kw not in serp_urls:
+            fallback_keys.append(f"serp|{kw}|{location_code}|{language_code}|{device}")
+        if 'volume' not in projected:
+            fallback_keys.append(f"volume|{kw}|{location_code}|{language_code}")
+        if 'kd' not in projected:
+            fallback_keys.append(f"kd|{kw}|{location_code}|{language_code}")
+        if 'intent' not in projected:
+            fallback_keys.append(f"intent|{kw}|{location_code}|{language_code}")
+    cached_entries = db_manager.check_cache_many(fallback_keys) if fallback_keys else {}
+    if cached_entries:
+        db_manager.write_projections(cached_entries)
+
+    for kw in keywords:
+        keyword_data_map[kw] = {}
+        if kw in serp_urls:
+            keyword_data_map[kw]['urls'] = serp_urls[kw]
+        else:
+            urls = extract_serp_urls(cached_entries.get(f"serp|{kw}|{location_code}|{language_code}|{device}"))
+            if urls is None:
+                missing_keywords.append(f"{kw} (SERP)")
+                continue
+            keyword_data_map[kw]['urls'] = urls[:urls_to_check]
+
+        metrics = dict(keyword_metrics.get(kw, {}))
+        if 'volume' not in metrics:
+            volume = extract_keyword_metrics("volume", cached_entries.get(f"volume|{kw}|{location_code}|{language_code}"))
+            if volume:
+                metrics['volume'] = volume['search_volume']
+                metrics['cpc'] = volume['cpc']
+        if 'kd' not in metrics:
+            kd = extract_keyword_metrics("kd", cached_entries.get(f"kd|{kw}|{location_code}|{language_code}"))
+            if kd:
+                metrics['kd'] = kd['keyword_difficulty']
+        if 'intent' not in metrics:
+            intent = extract_keyword_metrics("intent", cached_entries.get(f"intent|{kw}|{location_code}|{language_code}"))
+            if intent:
+                metrics['intent'] = intent['intent']
+        if metrics.get('intent') is None:
+            metrics.pop('intent', None)
+        keyword_data_map[kw].update(metrics)
+
+    return keyword_data_map, missing_keywords
+
 def render(db_manager, locations_map, languages_map):
     st.header("Cluster Keywords by SERP Overlap")
     st.info("This module clusters keywords based on shared URLs in their search results. It ONLY uses data from the local cache.")
@@ -116,6 +201,13 @@ def render(db_manager, locations_map, languages_map):
             """
         )
 
+        use_sparse_backend = st.checkbox(
+            "Vectorized overlap computation (NumPy/SciPy)",
+            value=SPARSE_BACKEND_AVAILABLE,
+            disabled=not SPARSE_BACKEND_AVAILABLE,
+            help="Computes all pairwise URL overlaps in one sparse matrix product. Much faster for large keyword lists. Requires `numpy` and `scipy`."
+        )
+
     if st.button("🧩 Run SERP Clustering", type="primary"):
         keywords_to_cluster = []
         try:
@@ -126,50 +218,11 @@ def render(db_manager, locations_map, languages_map):
         if not keywords_to_cluster:
             st.warning("Please provide keywords to cluster.")
         else:
-            keyword_data_map = {}
-            missing_keywords = []
-            
             st.write("Verifying data in local cache...")
             with st.spinner("Checking cache for all required data..."):
-                # Use selected location and language
-                location_code = selected_location_code
-                language_code = selected_language_code
-                device = "desktop"
-                
-                for kw in keywords_to_cluster:
-                    keyword_data_map[kw] = {}
-                    serp_key = f"serp|{kw}|{location_code}|{language_code}|{device}"
-                    serp_data = db_manager.check_cache(serp_key)
-                    if serp_data and serp_data.get('tasks') and serp_data['tasks'][0].get('result'):
-                        serp_items = serp_data['tasks'][0]['result'][0].get('items', [])
-                        keyword_data_map[kw]['urls'] = [item['url'] for item in serp_items if 'url' in item][:urls_to_check]
-                    else:
-                        missing_keywords.append(f"{kw} (SERP)")
-                        continue
-                    
-                    vol_key = f"volume|{kw}|{location_code}|{language_code}"
-                    vol_data = db_manager.check_cache(vol_key)
-                    if vol_data and vol_data.get('tasks') and vol_data['tasks'][0].get('result'):
-                        if vol_data['tasks'][0]['result']:
-                            result = vol_data['tasks'][0]['result'][0]
-                            keyword_data_map[kw]['volume'] = result.get('search_volume')
-                            keyword_data_map[kw]['cpc'] = result.get('cpc')
-                    
-                    kd_key = f"kd|{kw}|{location_code}|{language_code}"
-                    kd_data = db_manager.check_cache(kd_key)
-                    if kd_data and kd_data.get('tasks') and kd_data['tasks'][0].get('result'):
-                        result_items = kd_data['tasks'][0]['result'][0].get('items', [])
-                        if result_items:
-                            keyword_data_map[kw]['kd'] = result_items[0].get('keyword_difficulty')
-                    
-                    intent_key = f"intent|{kw}|{location_code}|{language_code}"
-                    intent_data = db_manager.check_cache(intent_key)
-                    if intent_data and intent_data.get('tasks') and intent_data['tasks'][0].get('result'):
-                        result_items = intent_data['tasks'][0]['result'][0].get('items', [])
-                        if result_items:
-                             first_result_item = result_items[0]
-                             if first_result_item.get('keyword_intent'):
-                                 keyword_data_map[kw]['intent'] = first_result_item['keyword_intent'].get('label')
+                keyword_data_map, missing_keywords = load_cached_keyword_data(
+                    db_manager, keywords_to_cluster, selected_location_code, selected_language_code, "desktop", urls_to_check
+                )
 
             if missing_keywords:
                 st.error("Data not found in cache for the following. Please fetch them in the 'Data Fetcher' tab first:")
@@ -191,78 +244,151 @@ def render(db_manager, locations_map, languages_map):
                         'kd': data.get('kd', 101) or 101
                     }
 
-                clusters = perform_serp_clustering(
-                    keyword_serp_data_for_clustering,
-                    min_intersections,
-                    urls_to_check,
-                    algorithm=algorithm,
-                    cluster_strategy=strategy,
-                    keyword_metrics=keyword_metrics
-                )
+                # Stream clusters as the algorithm finalizes them: rows go straight into a CSV file on
+                # disk, and only the latest PREVIEW_ROWS are kept for the live preview.
+                cols_order = ["Cluster Main Keyword", "Keyword", "Intersections", "Volume", "CPC", "KD", "Search Intent"]
+                previous_csv_path = st.session_state.get('serp_clusters_csv_path')
+                if previous_csv_path and os.path.exists(previous_csv_path):
+                    os.remove(previous_csv_path)
+                remove_stale_exports()
+                os.makedirs(EXPORT_DIR, exist_ok=True)
+
+                table_placeholder = st.empty()
+                preview_rows = deque(maxlen=PREVIEW_ROWS)
+                row_count = 0
+                cluster_sizes = []
+                last_refresh = time.monotonic()
+
+                with tempfile.NamedTemporaryFile("w", newline="", suffix=".csv", prefix="serp_clusters_",
+                                                 dir=EXPORT_DIR, delete=False, encoding="utf-8") as csv_file:
+                    csv_writer = csv.DictWriter(csv_file, fieldnames=cols_order)
+                    csv_writer.writeheader()
+
+                    for result in iter_serp_clustering(
+                        keyword_serp_data_for_clustering,
+                        min_intersections,
+                        urls_to_check,
+                        algorithm=algorithm,
+                        cluster_strategy=strategy,
+                        keyword_metrics=keyword_metrics,
+                        backend="sparse" if use_sparse_backend else "python"
+                    ):
+                        main_keyword = result['main_keyword']
+                        cluster_sizes.append(len(result['cluster']))
+
+                        cluster_rows = []
+                        for keyword in result['cluster']:
+                            data = keyword_data_map.get(keyword, {})
+                            cluster_rows.append({
+                                "Cluster Main Keyword": main_keyword,
+                                "Keyword": keyword,
+                                "Intersections": result['intersections'][keyword],
+                                "Volume": data.get('volume', 0),
+                                "CPC": data.get('cpc', 0),
+                                "KD": data.get('kd', 101),
+                                "Search Intent": data.get('intent', 'N/A')
+                            })
+                        csv_writer.writerows(cluster_rows)
+                        preview_rows.extend(cluster_rows)
+                        row_count += len(cluster_rows)
+
+                        if time.monotonic() - last_refresh > 1:
+                            with table_placeholder.container():
+                                st.caption(f"{row_count:,} rows so far, showing the latest {len(preview_rows):,}.")
+                                st.dataframe(pd.DataFrame(preview_rows, columns=cols_order), use_container_width=True)
+                            last_refresh = time.monotonic()
+
+                st.session_state.serp_clusters_csv_path = csv_file.name
 
                 # Display clustering results info
-                st.info(f"Generated {len(clusters)} clusters using **{selected_algorithm}** algorithm with **{selected_strategy}** strategy.")
+                st.info(f"Generated {len(cluster_sizes)} clusters using **{selected_algorithm}** algorithm with **{selected_strategy}** strategy.")
 
                 # Show algorithm-specific insights
                 if algorithm == "strict":
-                    single_kw_clusters = sum(1 for cluster in clusters if len(cluster) == 1)
-                    if single_kw_clusters > len(clusters) * 0.5:
+                    single_kw_clusters = sum(1 for size in cluster_sizes if size == 1)
+                    if single_kw_clusters > len(cluster_sizes) * 0.5:
                         st.warning(f"⚠️ Strict algorithm created {single_kw_clusters} single-keyword clusters. Consider using 'Balanced Strict' or lowering minimum intersections.")
                 elif algorithm == "default":
-                    avg_cluster_size = sum(len(cluster) for cluster in clusters) / len(clusters) if clusters else 0
+                    avg_cluster_size = sum(cluster_sizes) / len(cluster_sizes) if cluster_sizes else 0
                     st.info(f"📊 Average cluster size: {avg_cluster_size:.1f} keywords. Default algorithm creates broader topic groups.")
                 elif algorithm == "balanced_strict":
-                    large_clusters = sum(1 for cluster in clusters if len(cluster) >= 6)
+                    large_clusters = sum(1 for size in cluster_sizes if size >= 6)
                     st.info(f"🎯 Balanced Strict created {large_clusters} clusters with 6+ keywords, using progressive thresholds for natural growth.")
-                
-                output_data = []
-                if clusters:
-                    for cluster in clusters:
-                        if not cluster: continue
-
-                        # Select main keyword based on chosen strategy
-                        if strategy == "cpc":
-                            main_keyword = sorted(
-                                cluster,
-                                key=lambda k: (
-                                    keyword_data_map.get(k, {}).get('cpc', 0) or 0,
-                                    keyword_data_map.get(k, {}).get('volume', 0) or 0  # Secondary sort by volume
-                                ),
-                                reverse=True
-                            )[0]
-                        else:  # volume strategy (default)
-                            main_keyword = sorted(
-                                cluster,
-                                key=lambda k: (
-                                    keyword_data_map.get(k, {}).get('volume', 0) or 0,
-                                    -1 * (keyword_data_map.get(k, {}).get('kd', 101) or 101)  # Secondary sort by lower KD
-                                ),
-                                reverse=True
-                            )[0]
-                        main_keyword_urls = set(keyword_data_map.get(main_keyword, {}).get('urls', []))
-
-                        for keyword in cluster:
-                            data = keyword_data_map.get(keyword, {})
-                            current_keyword_urls = set(data.get('urls', []))
-                            intersections = len(main_keyword_urls.intersection(current_keyword_urls))
 
-                            output_data.append({
-                                "Cluster Main Keyword": main_keyword,
-                                "Keyword": keyword,
-                                "Intersections": intersections,
-                                "Volume": data.get('volume', 0),
-                                "CPC": data.get('cpc', 0),
-                                "KD": data.get('kd', 101),
-                                "Search Intent": data.get('intent', 'N/A')
-                            })
-                
-                if output_data:
-                    df_detailed = pd.DataFrame(output_data)
-                    cols_order = ["Cluster Main Keyword", "Keyword", "Intersections", "Volume", "CPC", "KD", "Search Intent"]
-                    df_detailed = df_detailed[cols_order]
-                    st.dataframe(df_detailed, use_container_width=True)
-                    st.session_state.clustered_data_for_analysis = df_detailed 
+                if row_count:
+                    # The full table is read back from the CSV once, the only time it is held in memory.
+                    df_detailed = pd.read_csv(
+                        st.session_state.serp_clusters_csv_path, keep_default_na=False, na_values=[""],
+                        dtype={"Cluster Main Keyword": str, "Keyword": str, "Search Intent": str}
+                    )
+                    table_placeholder.dataframe(df_detailed, use_container_width=True)
+                    st.session_state.clustered_data_for_analysis = df_detailed
+                    with open(st.session_state.serp_clusters_csv_path, "rb") as csv_file:
+                        st.download_button(
+                            label="📥 Download Clusters CSV",
+                            data=csv_file,
+                            file_name=f"serp_clusters_{time.strftime('%Y%m%d')}.csv",
+                            mime="text/csv"
+                        )
                     st.success("Clustering complete! View and analyze the results in the 'Data Analysis' tab.")
                 else:
                     st.warning("Could not form any clusters based on the current settings.")
 
+    st.divider()
+
+    with st.expander("🔬 Parameter Sweep"):
+        st.write("Compare cluster counts and sizes for a grid of settings. URL overlaps are computed once per number of top URLs and reused across thresholds, so a grid is much cheaper than running each setting separately.")
+
+        s1, s2 = st.columns(2)
+        sweep_urls_to_check = s1.multiselect("Top URLs to Check:", options=list(range(5, 21)), default=[10])
+        sweep_min_intersections = s2.multiselect("Minimum Intersections:", options=list(range(2, 11)), default=[2, 3, 4])
+        sweep_algorithms = s1.multiselect("Algorithms:", options=list(algorithm_options.keys()), default=list(algorithm_options.keys()))
+        sweep_strategies = s2.multiselect("Strategies:", options=list(strategy_options.keys()), default=[list(strategy_options.keys())[0]])
+
+        if st.button("🔬 Run Parameter Sweep"):
+            keywords_to_cluster = get_keywords_from_input(cluster_kw_text, None)
+
+            if not keywords_to_cluster:
+                st.warning("Please provide keywords to cluster.")
+            elif not (sweep_urls_to_check and sweep_min_intersections and sweep_algorithms and sweep_strategies):
+                st.warning("Please select at least one value for every parameter.")
+            else:
+                with st.spinner("Checking cache for all required data..."):
+                    keyword_data_map, missing_keywords = load_cached_keyword_data(
+                        db_manager, keywords_to_cluster, selected_location_code, selected_language_code, "desktop",
+                        max(sweep_urls_to_check)
+                    )
+
+                if missing_keywords:
+                    st.error("Data not found in cache for the following. Please fetch them in the 'Data Fetcher' tab first:")
+                    st.json(list(set(missing_keywords)))
+                else:
+                    keyword_metrics = {
+                        kw: {'volume': data.get('volume', 0) or 0, 'cpc': data.get('cpc', 0) or 0}
+                        for kw, data in keyword_data_map.items()
+                    }
+                    algorithm_names = {value: name for name, value in algorithm_options.items()}
+                    strategy_names = {value: name for name, value in strategy_options.items()}
+
+                    with st.spinner("Running parameter sweep..."):
+                        sweep_results = sweep_serp_clustering(
+                            {kw: data['urls'] for kw, data in keyword_data_map.items()},
+                            min_intersections_values=sweep_min_intersections,
+                            urls_to_check_values=sweep_urls_to_check,
+                            algorithms=[algorithm_options[name] for name in sweep_algorithms],
+                            cluster_strategies=[strategy_options[name] for name in sweep_strategies],
+                            keyword_metrics=keyword_metrics
+                        )
+
+                    df_sweep = pd.DataFrame([{
+                        "Algorithm": algorithm_names[result['algorithm']],
+                        "Strategy": strategy_names[result['cluster_strategy']],
+                        "URLs Checked": result['urls_to_check'],
+                        "Min Intersections": result['min_intersections'],
+                        "Clusters": result['stats']['cluster_count'],
+                        "Single-Keyword Clusters": result['stats']['single_keyword_clusters'],
+                        "Clusters with 6+ Keywords": result['stats']['clusters_6_plus'],
+                        "Largest Cluster": result['stats']['largest_cluster'],
+                        "Average Cluster Size": round(result['stats']['average_cluster_size'], 2),
+                    } for result in sweep_results])
+                    st.dataframe(df_sweep, use_container_width=True)